@@ -1,6 +1,7 @@
 import tkinter as tk
 from tkinter import messagebox
 from services.database_service import DatabaseService
+from utils.future_callback_util import run_when_done
 
 class AddModuleController:
     """
@@ -56,8 +57,13 @@ class AddModuleController:
             module_name = module_name_entry.get().strip()
             if module_name:
                 try:
-                    self.db_service.add_module(module_name)  # Add module to DB
-                    self.parent_view.display_modules()  # Update module view
+                    result = self.db_service.add_module(module_name)  # Add module to DB
+                    run_when_done(
+                        self.main_window,
+                        result,
+                        lambda _: self.parent_view.display_modules(),  # Update module view once written
+                        lambda e: messagebox.showerror("Error", f"Error adding module: {e}")
+                    )
                     popup.destroy()  # Close the popup
                 except Exception as e:
                     messagebox.showerror("Error", f"Error adding module: {e}")
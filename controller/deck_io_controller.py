@@ -0,0 +1,145 @@
+import tkinter as tk
+from tkinter import filedialog, messagebox
+from tkinter import ttk
+import threading
+
+from services.deck_io_service import DeckIOService
+from utils.window_utils import center_window
+
+FILE_TYPES = [
+    ("CSV-Dateien", "*.csv"),
+    ("JSON Lines", "*.jsonl"),
+    ("Anki-Pakete", "*.apkg"),
+]
+
+
+class DeckIOController:
+    """
+    Controller for importing flashcards into a module from a file and exporting a module to a file.
+    Runs the transfer on a background thread and shows its progress in a popup.
+    """
+
+    def __init__(self, main_window, parent_view):
+        """
+        Initializes the controller with the main window and parent view.
+
+        Args:
+            main_window (tk.Tk): The main application window.
+            parent_view (tk.Frame): The view that displays the modules and their flashcard counts.
+        """
+        self.main_window = main_window
+        self.parent_view = parent_view
+        self.deck_io_service = DeckIOService(self.main_window.db_service)
+
+    def import_flashcards(self, module):
+        """
+        Asks for a file and imports its flashcards into the module.
+
+        Args:
+            module (object): The module that receives the flashcards.
+        """
+        path = filedialog.askopenfilename(
+            parent=self.main_window,
+            title=f"Karteikarten in '{module.name}' importieren",
+            filetypes=FILE_TYPES
+        )
+        if not path:
+            return
+
+        def on_done(imported):
+            messagebox.showinfo("Erfolg", f"{imported} Karteikarten wurden in das Modul '{module.name}' importiert.")
+            self.parent_view.display_modules()  # Refresh the flashcard counts
+
+        self.run_with_progress(
+            "Importiere Karteikarten...",
+            lambda progress: self.deck_io_service.import_module(module, path, progress),
+            on_done,
+            "Fehler beim Importieren der Karteikarten"
+        )
+
+    def export_flashcards(self, module):
+        """
+        Asks for a target file and exports all flashcards of the module to it.
+
+        Args:
+            module (object): The module to export.
+        """
+        path = filedialog.asksaveasfilename(
+            parent=self.main_window,
+            title=f"Modul '{module.name}' exportieren",
+            initialfile=f"{module.name}.csv",
+            defaultextension=".csv",
+            filetypes=FILE_TYPES
+        )
+        if not path:
+            return
+
+        def on_done(exported):
+            messagebox.showinfo("Erfolg", f"{exported} Karteikarten wurden nach '{path}' exportiert.")
+
+        self.run_with_progress(
+            "Exportiere Karteikarten...",
+            lambda progress: self.deck_io_service.export_module(module, path, progress),
+            on_done,
+            "Fehler beim Exportieren der Karteikarten"
+        )
+
+    def run_with_progress(self, title, task, on_done, error_message):
+        """
+        Runs a transfer on a background thread while a popup shows how many flashcards are done.
+
+        Args:
+            title (str): The title of the progress popup.
+            task (callable): Called with a progress callback; returns the number of transferred flashcards.
+            on_done (callable): Called on the Tk thread with the task's result.
+            error_message (str): Prefix of the error message shown if the task fails.
+        """
+        progress_popup = tk.Toplevel(self.main_window)
+        progress_popup.title(title)
+        progress_popup.transient(self.main_window)
+        progress_popup.grab_set()
+        progress_label = tk.Label(progress_popup, text="Bitte warten...", font=("Arial", 12))
+        progress_label.pack(padx=20, pady=10)
+        progress_bar = ttk.Progressbar(progress_popup, mode='indeterminate', length=300)
+        progress_bar.pack(padx=20, pady=10)
+        progress_bar.start()
+        center_window(self.main_window, progress_popup)
+
+        progress_state = [0, None]  # Transferred flashcards and total, written by the worker thread
+        result = [None]
+        error_result = [None]
+
+        def progress(done, total):
+            progress_state[0], progress_state[1] = done, total
+
+        def run():
+            try:
+                result[0] = task(progress)
+            except Exception as e:
+                error_result[0] = str(e)
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+
+        def check_thread():
+            done, total = progress_state
+            if total:
+                if str(progress_bar.cget("mode")) != "determinate":
+                    progress_bar.stop()
+                    progress_bar.configure(mode="determinate", maximum=total)
+                progress_bar["value"] = done
+                progress_label.config(text=f"{done} von {total} Karteikarten")
+            else:
+                progress_label.config(text=f"{done} Karteikarten")
+
+            if thread.is_alive():
+                self.main_window.after(100, check_thread)
+            else:
+                progress_bar.stop()
+                progress_popup.destroy()
+                if error_result[0]:
+                    messagebox.showerror("Fehler", f"{error_message}: {error_result[0]}")
+                else:
+                    on_done(result[0])
+
+        check_thread()
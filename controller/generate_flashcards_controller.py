@@ -1,11 +1,22 @@
 import tkinter as tk
-from tkinter import messagebox
+from tkinter import filedialog, messagebox
 from tkinter import ttk
+import os
+import queue
 import threading
 
+from services.generation_pipeline import GenerationPipeline
+from utils.future_callback_util import run_when_done
 from utils.mousewheel_scroll_util import bind_mousewheel
 from utils.window_utils import center_window
 
+TEXT_FILE_TYPES = [
+    ("Textdateien", "*.txt *.md"),
+    ("Alle Dateien", "*.*"),
+]
+
+JOB_TITLE_LENGTH = 60  # Characters of the first line used as the title of a queued text
+
 class GenerateFlashcardsController:
     """
     Controller to manage the generation of flashcards using ChatGPT.
@@ -38,7 +49,7 @@ class GenerateFlashcardsController:
 
         self.generate_flashcards_view = tk.Toplevel(self.main_window)
         self.generate_flashcards_view.title("Karteikarten mit ChatGPT generieren")
-        self.generate_flashcards_view.geometry("600x400")
+        self.generate_flashcards_view.geometry("600x430")
         self.generate_flashcards_view.transient(self.main_window)
         self.generate_flashcards_view.grab_set()
         center_window(self.main_window, self.generate_flashcards_view)
@@ -48,53 +59,89 @@ class GenerateFlashcardsController:
         text_section_entry = tk.Text(self.generate_flashcards_view, height=10, width=70, font=("Arial", 12))
         text_section_entry.pack(pady=5)
 
+        # Unchecked forces a new answer from ChatGPT instead of the cached one for the same text
+        use_cache_var = tk.BooleanVar(value=True)
+        use_cache_checkbox = tk.Checkbutton(
+            self.generate_flashcards_view,
+            text="Zwischengespeicherte Antwort verwenden",
+            variable=use_cache_var
+        )
+        use_cache_checkbox.pack(pady=5)
+
         def generate_flashcards():
             """
             Generates flashcards by passing the entered text to the ChatGPT service.
             Displays progress and handles any errors during the generation process.
             """
             text_section = text_section_entry.get("1.0", tk.END).strip()
+            use_cache = use_cache_var.get()
             if text_section:
-                loading_popup = tk.Toplevel(self.generate_flashcards_view)
-                loading_popup.title("Generiere Karteikarten...")
-                loading_label = tk.Label(loading_popup, text="Karteikarten werden generiert, bitte warten...")
-                loading_label.pack(pady=10)
-                progress_bar = ttk.Progressbar(loading_popup, mode='indeterminate')
-                progress_bar.pack(pady=10)
-                progress_bar.start()
+                card_queue = queue.Queue()  # Flashcards as they arrive, filled by the generation threads
+                cancelled = threading.Event()
+                generation_state = {'finished': 0, 'total': 0, 'failed': 0, 'error': None}
 
-                center_window(self.generate_flashcards_view, loading_popup)
-
-                flashcards_result = []
-                error_result = [None]
+                def report_progress(finished, total):
+                    generation_state['finished'], generation_state['total'] = finished, total
 
                 def generate():
                     try:
-                        flashcards = self.chatgpt_service.generate_flashcards(text_section)
-                        flashcards_result.extend(flashcards)
+                        pipeline = GenerationPipeline(self.chatgpt_service)
+                        result = pipeline.run(
+                            text_section, use_cache=use_cache, progress=report_progress,
+                            on_flashcard=card_queue.put, cancelled=cancelled
+                        )
+                        generation_state['failed'] = len(result.failed_chunks)
                     except Exception as e:
-                        error_result[0] = str(e)
+                        generation_state['error'] = str(e)
 
                 thread = threading.Thread(target=generate)
                 thread.start()
 
-                def check_thread():
-                    if thread.is_alive():
-                        self.generate_flashcards_view.after(100, check_thread)
-                    else:
-                        progress_bar.stop()
-                        loading_popup.destroy()
-                        if error_result[0]:
-                            messagebox.showerror("Fehler", f"Fehler beim Generieren der Karteikarten: {error_result[0]}")
-                        elif flashcards_result:
-                            self.show_flashcards_editor(flashcards_result)
-                        else:
-                            messagebox.showwarning("Warnung", "Keine Karteikarten generiert. Bitte versuchen Sie es erneut.")
-
-                check_thread()
+                # The editor opens right away and shows the flashcards while they are generated
+                self.show_flashcards_editor(
+                    [], card_queue=card_queue, generation_thread=thread,
+                    generation_state=generation_state, cancelled=cancelled
+                )
             else:
                 messagebox.showwarning("Warnung", "Bitte einen Textabschnitt eingeben.")
 
+        def queue_text():
+            """
+            Queues the entered text as a background job instead of generating it right away.
+            """
+            text_section = text_section_entry.get("1.0", tk.END).strip()
+            if not text_section:
+                messagebox.showwarning("Warnung", "Bitte einen Textabschnitt eingeben.")
+                return
+            title = text_section.splitlines()[0][:JOB_TITLE_LENGTH]
+            self.queue_generation_jobs([(title, text_section)], use_cache_var.get())
+
+        def queue_files():
+            """
+            Queues one background job per selected text file, e.g. all lecture notes of a semester.
+            """
+            paths = filedialog.askopenfilenames(
+                parent=self.generate_flashcards_view,
+                title="Texte in die Warteschlange einreihen",
+                filetypes=TEXT_FILE_TYPES
+            )
+            if not paths:
+                return
+            texts = []
+            try:
+                for path in paths:
+                    with open(path, encoding="utf-8", errors="replace") as file:
+                        text = file.read().strip()
+                    if text:
+                        texts.append((os.path.basename(path), text))
+            except OSError as e:
+                messagebox.showerror("Fehler", f"Fehler beim Lesen der Dateien: {e}")
+                return
+            if texts:
+                self.queue_generation_jobs(texts, use_cache_var.get())
+            else:
+                messagebox.showwarning("Warnung", "Die ausgewählten Dateien enthalten keinen Text.")
+
         button_frame = tk.Frame(self.generate_flashcards_view)
         button_frame.pack(pady=20)
 
@@ -108,6 +155,24 @@ class GenerateFlashcardsController:
         )
         generate_button.pack(side=tk.LEFT, padx=10)
 
+        queue_button = tk.Button(
+            button_frame,
+            text="Einreihen",
+            command=queue_text,
+            width=10,
+            fg="black"
+        )
+        queue_button.pack(side=tk.LEFT, padx=5)
+
+        queue_files_button = tk.Button(
+            button_frame,
+            text="Dateien einreihen...",
+            command=queue_files,
+            width=15,
+            fg="black"
+        )
+        queue_files_button.pack(side=tk.LEFT, padx=5)
+
         cancel_button = tk.Button(
             button_frame,
             text="Abbrechen",
@@ -118,14 +183,53 @@ class GenerateFlashcardsController:
         )
         cancel_button.pack(side=tk.RIGHT, padx=10)
 
-    def show_flashcards_editor(self, flashcards):
+    def queue_generation_jobs(self, texts, use_cache):
+        """
+        Queues texts as generation jobs for the module and closes the popup.
+
+        Args:
+            texts (list): (title, source text) pairs, one job each.
+            use_cache (bool): Whether cached API responses may be used.
+        """
+        def on_queued(job_ids):
+            messagebox.showinfo(
+                "Eingereiht",
+                f"{len(job_ids)} Text(e) wurden in die Warteschlange eingereiht. Die generierten Karteikarten "
+                f"erscheinen im Posteingang, auch nach einem Neustart der Anwendung."
+            )
+
+        try:
+            result = self.main_window.generation_jobs.submit(self.module.id, texts, use_cache)
+            self.generate_flashcards_view.destroy()
+            run_when_done(
+                self.main_window,
+                result,
+                on_queued,
+                lambda e: messagebox.showerror("Fehler", f"Fehler beim Einreihen der Texte: {e}")
+            )
+        except Exception as e:
+            messagebox.showerror("Fehler", f"Fehler beim Einreihen der Texte: {e}")
+
+    def show_flashcards_editor(self, flashcards, card_queue=None, generation_thread=None, generation_state=None,
+                               cancelled=None, after_save=None):
         """
         Displays a popup where the user can edit, delete, or save the generated flashcards.
 
+        While a generation is running, flashcards arriving in ``card_queue`` are added to the popup,
+        and saving is enabled once the generation thread has finished.
+
         Args:
             flashcards (list): List of generated flashcards to be displayed and edited.
+            card_queue (queue.Queue, optional): Flashcards that are still being generated.
+            generation_thread (threading.Thread, optional): The thread that fills ``card_queue``.
+            generation_state (dict, optional): The 'finished' and 'total' chunks, the number of
+                'failed' chunks and the 'error' of the generation, written by the generation thread.
+            cancelled (threading.Event, optional): Set when the popup is closed, to stop the generation.
+            after_save (callable, optional): Called with the IDs of the inserted flashcards once they
+                were saved, e.g. to remove a reviewed job from the inbox.
         """
-        self.generate_flashcards_view.destroy()
+        if self.generate_flashcards_view:
+            self.generate_flashcards_view.destroy()
         editor_view = tk.Toplevel(self.main_window)
         editor_view.title("Generierte Karteikarten")
         editor_view.geometry("600x500")
@@ -133,6 +237,26 @@ class GenerateFlashcardsController:
         editor_view.grab_set()
         center_window(self.main_window, editor_view)
 
+        def close_editor():
+            """
+            Closes the popup and stops a running generation.
+            """
+            if cancelled:
+                cancelled.set()
+            editor_view.destroy()
+
+        editor_view.protocol("WM_DELETE_WINDOW", close_editor)
+
+        status_frame = tk.Frame(editor_view)
+        if generation_thread:
+            status_frame.pack(fill="x", padx=10, pady=5)
+        status_label = tk.Label(status_frame, text="Karteikarten werden generiert, bitte warten...")
+        status_label.pack(side=tk.LEFT)
+        progress_bar = ttk.Progressbar(status_frame, mode='indeterminate')
+        progress_bar.pack(side=tk.RIGHT, fill="x", expand=True, padx=10)
+        if generation_thread:
+            progress_bar.start()
+
         main_frame = tk.Frame(editor_view)
         main_frame.pack(fill="both", expand=True)
 
@@ -156,8 +280,14 @@ class GenerateFlashcardsController:
 
         bind_mousewheel(scroll_frame, canvas)
 
-        for idx, fc in enumerate(flashcards):
-            frame = tk.LabelFrame(scroll_frame, text=f"Karteikarte {idx+1}", padx=10, pady=10)
+        card_count = [0]  # Number of flashcards added to the popup, for their titles
+
+        def add_flashcard_frame(fc):
+            """
+            Adds the input fields of a flashcard to the popup.
+            """
+            card_count[0] += 1
+            frame = tk.LabelFrame(scroll_frame, text=f"Karteikarte {card_count[0]}", padx=10, pady=10)
             frame.pack(fill="x", expand=True, padx=10, pady=5)
 
             question_label = tk.Label(frame, text="Frage:", font=("Arial", 10))
@@ -185,6 +315,9 @@ class GenerateFlashcardsController:
             fc['question_entry'] = question_entry
             fc['answer_entry'] = answer_entry
 
+        for fc in flashcards:
+            add_flashcard_frame(fc)
+
         bind_mousewheel(scroll_frame, canvas)
 
         button_frame = tk.Frame(editor_view)
@@ -195,13 +328,33 @@ class GenerateFlashcardsController:
             Saves all edited flashcards to the database.
             """
             try:
-                for fc in flashcards:
-                    question = fc['question_entry'].get("1.0", tk.END).strip()
-                    answer = fc['answer_entry'].get("1.0", tk.END).strip()
-                    self.db_service.add_flashcard(self.module.id, question, answer)
-                messagebox.showinfo("Erfolg", "Alle Karteikarten wurden erfolgreich gespeichert.")
+                edited_flashcards = [
+                    (fc['question_entry'].get("1.0", tk.END).strip(), fc['answer_entry'].get("1.0", tk.END).strip())
+                    for fc in flashcards
+                ]
+                result = self.db_service.add_flashcards(self.module.id, edited_flashcards)  # One transaction for all cards
                 editor_view.destroy()
-                self.main_window.refresh_module_view(self.module)
+
+                def on_saved(inserted_ids):
+                    skipped = len(edited_flashcards) - len(inserted_ids)
+                    if skipped:
+                        messagebox.showinfo(
+                            "Erfolg",
+                            f"{len(inserted_ids)} Karteikarten wurden gespeichert. "
+                            f"{skipped} bereits vorhandene Karteikarten wurden übersprungen."
+                        )
+                    else:
+                        messagebox.showinfo("Erfolg", "Alle Karteikarten wurden erfolgreich gespeichert.")
+                    self.main_window.refresh_module_view(self.module)
+                    if after_save:
+                        after_save(inserted_ids)
+
+                run_when_done(
+                    self.main_window,
+                    result,
+                    on_saved,
+                    lambda e: messagebox.showerror("Fehler", f"Fehler beim Speichern der Karteikarten: {e}")
+                )
             except Exception as e:
                 messagebox.showerror("Fehler", f"Fehler beim Speichern der Karteikarten: {e}")
 
@@ -218,9 +371,64 @@ class GenerateFlashcardsController:
         cancel_button = tk.Button(
             button_frame,
             text="Abbrechen",
-            command=editor_view.destroy,
+            command=close_editor,
             width=15,
             bg="#f44336",
             fg="black"
         )
         cancel_button.pack(side=tk.RIGHT, padx=10, pady=10)
+
+        if not generation_thread:
+            return
+        save_button.config(state=tk.DISABLED)  # Enabled once all flashcards have arrived
+
+        def poll_generation():
+            """
+            Adds the flashcards that arrived since the last call and finishes the popup once the
+            generation is done.
+            """
+            if not editor_view.winfo_exists():
+                return
+            while True:
+                try:
+                    fc = card_queue.get_nowait()
+                except queue.Empty:
+                    break
+                flashcards.append(fc)
+                add_flashcard_frame(fc)
+
+            finished, total = generation_state['finished'], generation_state['total']
+            if total > 1:
+                # Long texts are generated in several chunks, so real progress can be shown
+                if progress_bar.cget("mode") != "determinate":
+                    progress_bar.stop()
+                    progress_bar.config(mode="determinate", maximum=total)
+                progress_bar.config(value=finished)
+                status_label.config(text=f"Abschnitt {finished} von {total} verarbeitet...")
+
+            if generation_thread.is_alive() or not card_queue.empty():
+                editor_view.after(100, poll_generation)
+                return
+
+            progress_bar.stop()
+            status_frame.pack_forget()
+            if not card_count[0]:
+                editor_view.destroy()
+                if generation_state['error']:
+                    messagebox.showerror("Fehler", f"Fehler beim Generieren der Karteikarten: {generation_state['error']}")
+                else:
+                    messagebox.showwarning("Warnung", "Keine Karteikarten generiert. Bitte versuchen Sie es erneut.")
+                return
+            save_button.config(state=tk.NORMAL)
+            if generation_state['error']:
+                messagebox.showwarning(
+                    "Warnung",
+                    f"Die Generierung wurde wegen eines Fehlers abgebrochen: {generation_state['error']}"
+                )
+            elif generation_state['failed']:
+                messagebox.showwarning(
+                    "Warnung",
+                    f"{generation_state['failed']} von {total} Abschnitten konnten nicht verarbeitet werden."
+                )
+
+        poll_generation()
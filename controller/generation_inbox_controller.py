@@ -0,0 +1,220 @@
+import tkinter as tk
+from tkinter import messagebox
+from tkinter import ttk
+
+from controller.generate_flashcards_controller import GenerateFlashcardsController
+from services.database_service import JOB_DONE, JOB_FAILED, JOB_PENDING, JOB_RUNNING
+from utils.future_callback_util import run_when_done
+from utils.window_utils import center_window
+
+STATUS_LABELS = {
+    JOB_PENDING: "Wartend",
+    JOB_RUNNING: "Läuft",
+    JOB_DONE: "Fertig",
+    JOB_FAILED: "Fehlgeschlagen",
+}
+
+REFRESH_INTERVAL_MS = 2000  # How often the open inbox shows the progress of the workers
+
+
+class GenerationInboxController:
+    """
+    Controller for the review inbox of queued flashcard generations.
+    Lists all jobs with their status, opens the flashcards of finished jobs for review and lets
+    the user retry failed jobs or remove jobs.
+    """
+
+    def __init__(self, main_window):
+        """
+        Initializes the controller with the main window.
+
+        Args:
+            main_window (tk.Tk): The main application window.
+        """
+        self.main_window = main_window
+        self.db_service = self.main_window.db_service
+        self.inbox_view = None
+        self.job_list = None
+        self.poll_id = None  # The scheduled refresh while the inbox is open
+
+    def open_inbox(self):
+        """
+        Opens the inbox popup, or brings it to the front if it is already open.
+        """
+        if self.inbox_view and self.inbox_view.winfo_exists():
+            self.inbox_view.lift()
+            return
+
+        self.inbox_view = tk.Toplevel(self.main_window)
+        self.inbox_view.title("Posteingang der Generierungen")
+        self.inbox_view.geometry("700x400")
+        self.inbox_view.transient(self.main_window)
+        center_window(self.main_window, self.inbox_view)
+
+        list_frame = tk.Frame(self.inbox_view)
+        list_frame.pack(fill="both", expand=True, padx=10, pady=10)
+
+        self.job_list = ttk.Treeview(
+            list_frame, columns=("title", "module", "status", "details"), show="headings", selectmode="browse"
+        )
+        for column, heading, width in (
+                ("title", "Text", 220), ("module", "Modul", 130), ("status", "Status", 100), ("details", "Details", 230)):
+            self.job_list.heading(column, text=heading)
+            self.job_list.column(column, width=width, anchor="w")
+        self.job_list.pack(side="left", fill="both", expand=True)
+        self.job_list.bind("<Double-1>", lambda event: self.review_selected_job())
+
+        scrollbar = tk.Scrollbar(list_frame, orient="vertical", command=self.job_list.yview)
+        scrollbar.pack(side="right", fill="y")
+        self.job_list.configure(yscrollcommand=scrollbar.set)
+
+        button_frame = tk.Frame(self.inbox_view)
+        button_frame.pack(fill="x", pady=10)
+
+        review_button = tk.Button(
+            button_frame, text="Prüfen", command=self.review_selected_job, width=15, bg="#4CAF50", fg="black"
+        )
+        review_button.pack(side=tk.LEFT, padx=10)
+
+        retry_button = tk.Button(button_frame, text="Erneut versuchen", command=self.retry_selected_job, width=15)
+        retry_button.pack(side=tk.LEFT, padx=10)
+
+        remove_button = tk.Button(
+            button_frame, text="Entfernen", command=self.remove_selected_job, width=15, bg="#f44336", fg="black"
+        )
+        remove_button.pack(side=tk.LEFT, padx=10)
+
+        close_button = tk.Button(button_frame, text="Schließen", command=self.inbox_view.destroy, width=15)
+        close_button.pack(side=tk.RIGHT, padx=10)
+
+        self.inbox_view.bind("<Destroy>", self._on_destroy)
+        self._poll()
+
+    def _on_destroy(self, event):
+        """
+        Cancels the scheduled refresh when the inbox popup is closed.
+
+        Args:
+            event (tk.Event): The destroy event; also fired for every child widget.
+        """
+        if event.widget is self.inbox_view and self.poll_id is not None:
+            self.inbox_view.after_cancel(self.poll_id)
+            self.poll_id = None
+
+    def _poll(self):
+        """
+        Refreshes the list and schedules the next refresh, so the inbox shows the progress of the
+        workers. Only one refresh is scheduled at a time.
+        """
+        self.poll_id = None
+        if not self.inbox_view or not self.inbox_view.winfo_exists():
+            return
+        self._render_jobs()
+        self.poll_id = self.inbox_view.after(REFRESH_INTERVAL_MS, self._poll)
+
+    def _render_jobs(self):
+        """
+        Shows the current jobs in the list, keeping the selection.
+        """
+        if not self.inbox_view or not self.inbox_view.winfo_exists():
+            return
+
+        module_names = {module.id: module.name for module in self.db_service.get_all_modules()}
+        jobs = self.db_service.get_generation_jobs()
+        selection = self.job_list.selection()
+        self.job_list.delete(*self.job_list.get_children())
+        for job in jobs:
+            if job.status == JOB_DONE:
+                details = f"{job.flashcard_count} Karteikarten zu prüfen"
+            elif job.status == JOB_FAILED:
+                details = job.error or ""
+            else:
+                details = ""
+            self.job_list.insert(
+                "", tk.END, iid=str(job.id),
+                values=(job.title, module_names.get(job.module_id, ""), STATUS_LABELS.get(job.status, job.status), details)
+            )
+        existing = [iid for iid in selection if self.job_list.exists(iid)]
+        if existing:
+            self.job_list.selection_set(existing)
+
+    def get_selected_job(self):
+        """
+        Returns the job selected in the list.
+
+        Returns:
+            GenerationJob or None: The job, or None if nothing is selected or the job no longer exists.
+        """
+        selection = self.job_list.selection()
+        if not selection:
+            messagebox.showwarning("Warnung", "Bitte einen Eintrag auswählen.", parent=self.inbox_view)
+            return None
+        job_id = int(selection[0])
+        return next((job for job in self.db_service.get_generation_jobs() if job.id == job_id), None)
+
+    def review_selected_job(self):
+        """
+        Opens the flashcard editor with the flashcards of the selected finished job. The job is
+        removed from the inbox once its flashcards were saved.
+        """
+        job = self.get_selected_job()
+        if job is None:
+            return
+        if job.status != JOB_DONE:
+            messagebox.showinfo(
+                "Hinweis", "Nur fertige Generierungen können geprüft werden.", parent=self.inbox_view
+            )
+            return
+
+        module = next((module for module in self.db_service.get_all_modules() if module.id == job.module_id), None)
+        flashcards = self.db_service.get_generation_job_flashcards(job.id)
+        if module is None or not flashcards:
+            messagebox.showwarning("Warnung", "Keine Karteikarten zu prüfen.", parent=self.inbox_view)
+            return
+
+        def after_save(_):
+            run_when_done(
+                self.main_window,
+                self.db_service.delete_generation_job(job.id),
+                lambda _: self._render_jobs(),
+                lambda e: messagebox.showerror("Fehler", f"Fehler beim Entfernen des Eintrags: {e}")
+            )
+
+        controller = GenerateFlashcardsController(self.main_window, module, self.main_window.chatgpt_service)
+        controller.show_flashcards_editor(flashcards, after_save=after_save)
+
+    def retry_selected_job(self):
+        """
+        Queues the selected failed job again.
+        """
+        job = self.get_selected_job()
+        if job is None:
+            return
+        if job.status != JOB_FAILED:
+            messagebox.showinfo(
+                "Hinweis", "Nur fehlgeschlagene Generierungen können wiederholt werden.", parent=self.inbox_view
+            )
+            return
+        run_when_done(
+            self.main_window,
+            self.main_window.generation_jobs.retry([job.id]),
+            lambda _: self._render_jobs(),
+            lambda e: messagebox.showerror("Fehler", f"Fehler beim Einreihen: {e}")
+        )
+
+    def remove_selected_job(self):
+        """
+        Removes the selected job, discarding its generated flashcards, after a confirmation.
+        """
+        job = self.get_selected_job()
+        if job is None:
+            return
+        if not messagebox.askyesno(
+                "Entfernen", f"Soll '{job.title}' aus dem Posteingang entfernt werden?", parent=self.inbox_view):
+            return
+        run_when_done(
+            self.main_window,
+            self.db_service.delete_generation_job(job.id),
+            lambda _: self._render_jobs(),
+            lambda e: messagebox.showerror("Fehler", f"Fehler beim Entfernen des Eintrags: {e}")
+        )
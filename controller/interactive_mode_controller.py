@@ -1,3 +1,9 @@
+import time
+
+from services.flashcard_deck import FlashcardDeck
+from services.review_log_service import REVIEW_MODE_INTERACTIVE
+from services.review_scheduler import DueQueue, RATING_HARD, RELEARN_DELAY_SECONDS
+
 class InteractiveModeController:
     """
     Controller for interactive flashcard mode.
@@ -15,17 +21,61 @@ class InteractiveModeController:
         self.main_window = main_window
         self.module = module
         self.db_service = self.main_window.db_service  # Database service to fetch flashcards
-        self.all_flashcards = self.db_service.get_flashcards_by_module(module.id)  # Fetch all flashcards for the module
-        self.current_index = -1  # Index of the current flashcard
+        self.review_log = self.main_window.review_log  # Persists every answer
+        self.question_asked_at = None  # Monotonic time the current question was asked, for the answer latency
+        self.deck = FlashcardDeck(self.db_service, module.id)  # Pages through the module's flashcards lazily
+        self.due_queue = None  # Due flashcards of the session, None while walking the whole deck
         self.current_flashcard = None  # Currently displayed flashcard
+        self.reset_flashcards()
 
     def reset_flashcards(self):
         """
-        Resets the flashcard session, starting from the first flashcard.
+        Resets the flashcard session, starting with the flashcards that are due for review.
+        If no flashcard is due, the session walks through the whole deck without rescheduling.
         """
-        self.current_index = -1  # Reset the index
+        self.due_queue = DueQueue(self.db_service, self.module.id)
+        self.next_flashcard = self.due_queue.pop()  # One card of lookahead
+        if self.next_flashcard:
+            self.take_next_flashcard = self.due_queue.pop
+        else:
+            self.due_queue = None
+            remaining_flashcards = iter(self.deck)  # Restart the walk through the deck
+            self.take_next_flashcard = lambda: next(remaining_flashcards, None)
+            self.next_flashcard = self.take_next_flashcard()
         self.current_flashcard = None  # Reset the current flashcard
 
+    def log_answer(self, rating, attempt=1):
+        """
+        Writes an answer to the current flashcard to the review log without rescheduling it.
+        Used for attempts after which the user gets another try.
+
+        Args:
+            rating (int): The quality of the answer on the SM-2 scale from 0 to 5.
+            attempt (int): The number of the attempt at the current flashcard, starting at 1.
+        """
+        if not self.current_flashcard:
+            return
+        latency_ms = int((time.monotonic() - self.question_asked_at) * 1000)
+        self.review_log.log(self.current_flashcard, REVIEW_MODE_INTERACTIVE, rating, latency_ms, attempt)
+
+    def record_rating(self, rating, attempt=1):
+        """
+        Records how well the current flashcard was answered and reschedules it.
+        Forgotten flashcards are queued again and come back in the session once their relearn delay has passed.
+
+        Args:
+            rating (int): The quality of the answer on the SM-2 scale from 0 to 5.
+            attempt (int): The number of the attempt at the current flashcard, starting at 1.
+        """
+        self.log_answer(rating, attempt)
+        if not self.current_flashcard or not self.due_queue:
+            return
+        self.db_service.record_review(self.current_flashcard.id, rating)
+        if rating < RATING_HARD:
+            self.due_queue.push(self.current_flashcard, time.time() + RELEARN_DELAY_SECONDS)
+            if self.next_flashcard is None:
+                self.next_flashcard = self.take_next_flashcard()
+
     def get_next_flashcard(self):
         """
         Returns the next flashcard in the sequence.
@@ -33,9 +83,7 @@ class InteractiveModeController:
         Returns:
             Flashcard or None: The next flashcard if available, otherwise None.
         """
-        if self.all_flashcards and self.current_index + 1 < len(self.all_flashcards):
-            return self.all_flashcards[self.current_index + 1]
-        return None
+        return self.next_flashcard
 
     def move_to_next_flashcard(self):
         """
@@ -44,12 +92,19 @@ class InteractiveModeController:
         Returns:
             Flashcard or None: The next flashcard if available, otherwise None.
         """
-        if self.all_flashcards and self.current_index + 1 < len(self.all_flashcards):
-            self.current_index += 1  # Move to the next flashcard
-            self.current_flashcard = self.all_flashcards[self.current_index]  # Update current flashcard
+        if self.next_flashcard:
+            self.current_flashcard = self.next_flashcard  # Update current flashcard
+            self.question_asked_at = time.monotonic()
+            self.next_flashcard = self.take_next_flashcard()  # Move the lookahead forward
             return self.current_flashcard
         return None
 
+    def end_session(self):
+        """
+        Writes the buffered answers of the session to the review log.
+        """
+        self.review_log.flush()
+
     def get_current_flashcard_answer(self):
         """
         Returns the answer of the current flashcard.
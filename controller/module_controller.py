@@ -1,6 +1,12 @@
+import sqlite3
 import tkinter as tk
 from tkinter import messagebox, scrolledtext
 
+from services.database_service import ON_DUPLICATE_ERROR
+from utils.future_callback_util import run_when_done
+
+DUPLICATE_MESSAGE = "Diese Karteikarte ist in diesem Modul bereits vorhanden."
+
 class ModuleController:
     """
     Controller for managing the module view and handling flashcard interactions.
@@ -64,12 +70,23 @@ class ModuleController:
             question = question_text.get("1.0", tk.END).strip()
             answer = answer_text.get("1.0", tk.END).strip()
             if question and answer:
-                try:
-                    self.db_service.add_flashcard(self.module.id, question, answer)  # Add flashcard to DB
-                    self.module_view.display_flashcards()  # Update flashcard view
+                def on_saved(_):
                     popup.destroy()  # Close the popup
+                    self.module_view.refresh_flashcards()  # Apply only this change to the flashcard view
+
+                def on_error(e):
+                    if isinstance(e, sqlite3.IntegrityError):
+                        messagebox.showwarning("Warning", DUPLICATE_MESSAGE)  # Keep the popup open to change the texts
+                    else:
+                        messagebox.showerror("Error", f"Error adding flashcard: {e}")
+
+                try:
+                    # Duplicates raise instead of being skipped silently, so the user learns why nothing was added
+                    result = self.db_service.add_flashcard(self.module.id, question, answer, on_duplicate=ON_DUPLICATE_ERROR)
                 except Exception as e:
-                    messagebox.showerror("Error", f"Error adding flashcard: {e}")
+                    on_error(e)
+                    return
+                run_when_done(self.main_window, result, on_saved, on_error)
             else:
                 messagebox.showwarning("Warning", "Please fill in both question and answer.")
 
@@ -121,12 +138,22 @@ class ModuleController:
             new_question = question_text.get("1.0", tk.END).strip()
             new_answer = answer_text.get("1.0", tk.END).strip()
             if new_question and new_answer:
-                try:
-                    self.db_service.update_flashcard(flashcard.id, new_question, new_answer)  # Update flashcard in DB
-                    self.module_view.display_flashcards()  # Update flashcard view
+                def on_saved(_):
                     popup.destroy()  # Close the popup
+                    self.module_view.refresh_flashcards()  # Apply only this change to the flashcard view
+
+                def on_error(e):
+                    if isinstance(e, sqlite3.IntegrityError):
+                        messagebox.showwarning("Warning", DUPLICATE_MESSAGE)  # Keep the popup open to change the texts
+                    else:
+                        messagebox.showerror("Error", f"Error updating flashcard: {e}")
+
+                try:
+                    result = self.db_service.update_flashcard(flashcard.id, new_question, new_answer)  # Update flashcard in DB
                 except Exception as e:
-                    messagebox.showerror("Error", f"Error updating flashcard: {e}")
+                    on_error(e)
+                    return
+                run_when_done(self.main_window, result, on_saved, on_error)
             else:
                 messagebox.showwarning("Warning", "Please fill in both question and answer.")
 
@@ -1,7 +1,12 @@
+import random
+import time
 import tkinter as tk
 from tkinter import messagebox
-import random
 
+from services.flashcard_deck import FlashcardDeck
+from services.review_log_service import REVIEW_MODE_NORMAL
+from utils.future_callback_util import run_when_done
+from services.review_scheduler import DueQueue, RATING_AGAIN, RATING_GOOD, RELEARN_DELAY_SECONDS
 from views import normal_mode_view
 
 class NormalModeController:
@@ -21,15 +26,20 @@ class NormalModeController:
         self.main_window = main_window
         self.module = module
         self.db_service = self.main_window.db_service  # Database service for fetching flashcards
+        self.review_log = self.main_window.review_log  # Persists every answer
         self.normal_mode_view = normal_mode_view  # The view for displaying questions and results
 
-        self.flashcards = []
+        self.flashcards = iter(())  # Flashcards still to be shown in the current round
+        self.due_queue = None  # Due flashcards of a scheduled round, None while cramming
         self.current_flashcard = None  # Store the current flashcard
+        self.question_shown_at = None  # Monotonic time the current question was shown, for the answer latency
+        self.attempts = {}  # Flashcard ID -> number of times it was shown in the current round
+        self.round_flashcards = {}  # Flashcard ID -> flashcard shown in the current round, for repeating it
         self.round = 1  # Start at round 1
         self.correct_answers = []  # Store correct answers for each round
         self.incorrect_answers = []  # Store incorrect answers for each round
         self.results_per_round = []  # Store round results
-        self.all_flashcards = []  # List of all available flashcards
+        self.deck = FlashcardDeck(self.db_service, self.module.id)  # Pages through the module's flashcards lazily
         self.load_flashcards()  # Load flashcards from the database
 
     def load_flashcards(self):
@@ -39,22 +49,57 @@ class NormalModeController:
         Returns:
             bool: True if flashcards are loaded successfully, False if no flashcards are found.
         """
-        self.all_flashcards = self.db_service.get_flashcards_by_module(self.module.id)
-        if not self.all_flashcards:
+        if self.deck.is_empty():
             messagebox.showwarning("Warning", "No flashcards available in the module.")  # Show warning if no flashcards
             return False
         return True
 
     def start_round(self):
         """
-        Starts a new round by resetting the necessary variables and shuffling flashcards.
+        Starts a new round with the flashcards that are due for review.
+        If no flashcard is due, offers to practice the whole deck in random order instead.
+        """
+        self.reset_round()
+        self.due_queue = DueQueue(self.db_service, self.module.id)  # Reads only the due flashcards
+        first_flashcard = self.due_queue.pop()
+        if first_flashcard:
+            self.flashcards = self.iter_due_flashcards(first_flashcard)
+        elif messagebox.askyesno(
+                "Keine fälligen Karteikarten",
+                "Heute sind keine Karteikarten zur Wiederholung fällig. Möchten Sie alle Karteikarten üben?"):
+            self.due_queue = None  # Cramming does not change the review schedule
+            self.flashcards = self.deck.shuffled()  # Stream the deck in random order for this round
+        elif self.results_per_round:
+            self.finish_learning()
+            return
+        else:
+            self.normal_mode_view.on_closing()
+            return
+        self.show_question()  # Show the first question
+
+    def reset_round(self):
+        """
+        Clears the answers and the shown flashcards of the previous round.
         """
-        self.current_index = 0  # Reset the current index to 0
         self.correct_answers = []  # Reset correct answers
         self.incorrect_answers = []  # Reset incorrect answers
-        self.flashcards = self.all_flashcards.copy()  # Copy flashcards for this round
-        random.shuffle(self.flashcards)  # Shuffle the flashcards randomly
-        self.show_question()  # Show the first question
+        self.attempts = {}
+        self.round_flashcards = {}
+
+    def iter_due_flashcards(self, first_flashcard):
+        """
+        Iterates over the due flashcards, including forgotten ones that were queued again.
+
+        Args:
+            first_flashcard (Flashcard): The flashcard already taken from the due queue.
+
+        Yields:
+            Flashcard: The next flashcard in order of due time.
+        """
+        flashcard = first_flashcard
+        while flashcard:
+            yield flashcard
+            flashcard = self.due_queue.pop()
 
     def end_round(self):
         """
@@ -71,6 +116,7 @@ class NormalModeController:
             'success_rate': success_rate
         })
 
+        self.review_log.flush()  # Persist the answers of the round
         self.normal_mode_view.show_round_summary(self.correct_answers, self.incorrect_answers, success_rate)  # Show round summary
         self.round += 1  # Increment the round number
 
@@ -79,8 +125,11 @@ class NormalModeController:
         Displays the current flashcard question.
         If there are no more flashcards, ends the round.
         """
-        if self.current_index < len(self.flashcards):
-            self.current_flashcard = self.flashcards[self.current_index]  # Get the next flashcard
+        self.current_flashcard = next(self.flashcards, None)  # Get the next flashcard
+        if self.current_flashcard:
+            self.attempts[self.current_flashcard.id] = self.attempts.get(self.current_flashcard.id, 0) + 1
+            self.round_flashcards[self.current_flashcard.id] = self.current_flashcard
+            self.question_shown_at = time.monotonic()
             self.normal_mode_view.display_question(self.current_flashcard.question)  # Display the question
             self.normal_mode_view.update_idletasks()  # Update the view
         else:
@@ -104,17 +153,42 @@ class NormalModeController:
             self.correct_answers.append(self.current_flashcard)  # Add to correct answers if answered correctly
         else:
             self.incorrect_answers.append(self.current_flashcard)  # Add to incorrect answers if answered wrongly
-        self.current_index += 1  # Move to the next flashcard
+
+        rating = RATING_GOOD if correct else RATING_AGAIN
+        latency_ms = int((time.monotonic() - self.question_shown_at) * 1000)
+        self.review_log.log(
+            self.current_flashcard, REVIEW_MODE_NORMAL, rating, latency_ms, self.attempts[self.current_flashcard.id]
+        )
+        if self.due_queue:
+            self.db_service.record_review(self.current_flashcard.id, rating)
+            if not correct:
+                # Forgotten flashcards come back in the same round once their relearn delay has passed
+                self.due_queue.push(self.current_flashcard, time.time() + RELEARN_DELAY_SECONDS)
         self.show_question()  # Show the next question
 
     def repeat_round(self):
         """
-        Repeats the current round by restarting it.
+        Repeats the finished round with the same flashcards in a new random order.
+
+        The answers of the finished round already rescheduled its flashcards, so the repetition
+        is practice and does not change the review schedule again.
         """
-        self.start_round()  # Restart the round
+        flashcards = list(self.round_flashcards.values())
+        if not flashcards:
+            self.start_round()
+            return
+        random.shuffle(flashcards)
+        self.reset_round()
+        self.due_queue = None
+        self.flashcards = iter(flashcards)
+        self.show_question()
 
     def finish_learning(self):
         """
         Ends the learning session and shows the final results.
         """
-        self.normal_mode_view.show_final_results(self.results_per_round)  # Show the final results of the learning session
+        def show_results(_):
+            module_stats = self.db_service.get_module_review_stats(self.module.id)  # Precomputed totals of all sessions
+            self.normal_mode_view.show_final_results(self.results_per_round, module_stats)  # Show the final results of the learning session
+
+        run_when_done(self.normal_mode_view, self.review_log.flush(), show_results, show_results)
@@ -1,9 +1,16 @@
+import os
 import tkinter as tk
 from tkinter import messagebox
 
 from services.config_service import ConfigService
+from services.backup_service import BackupService
 from services.chatgpt_service import ChatGPTService
 from services.database_service import DatabaseService
+from services.generation_job_service import GenerationJobService
+from services.openai_client_factory import OpenAIClientFactory
+from services.response_cache_service import ResponseCacheService
+from services.review_log_service import ReviewLogService
+from controller.generation_inbox_controller import GenerationInboxController
 from views.main_view import MainView
 from views.module_view import ModuleView
 
@@ -31,13 +38,29 @@ class MainWindow(tk.Tk):
 
         self.config_service = ConfigService()
 
+        self.db_service = DatabaseService()
+        # Generated responses are kept in their own database next to the modules
+        db_dir = os.path.dirname(os.path.abspath(self.db_service.connections.db_name))
+        self.response_cache = ResponseCacheService(os.path.join(db_dir, "response_cache.db"))
+        self.openai_clients = OpenAIClientFactory()  # One connection pool for all API requests
+
         try:
-            self.chatgpt_service = ChatGPTService(config_service=self.config_service)
+            self.chatgpt_service = ChatGPTService(
+                config_service=self.config_service, response_cache=self.response_cache,
+                client_factory=self.openai_clients
+            )
         except ValueError as e:
             messagebox.showwarning("API-Schlüssel fehlt", str(e))
             self.chatgpt_service = None
 
-        self.db_service = DatabaseService()
+        # Queued generations run in the background and are resumed after a restart
+        self.generation_jobs = GenerationJobService(self.db_service, self.chatgpt_service)
+        self.generation_jobs.start()
+        self.generation_inbox = GenerationInboxController(self)
+
+        self.review_log = ReviewLogService(self.db_service)  # Buffers answers of study sessions
+        self.backup_service = BackupService(self.db_service)  # Hourly snapshots on a background thread
+        self.backup_service.start()
 
         container = tk.Frame(self)
         container.pack(side="top", fill="both", expand=True)
@@ -64,8 +87,7 @@ class MainWindow(tk.Tk):
             module (object): The module to be displayed in the module view.
         """
         frame = self.frames["ModuleView"]
-        frame.set_module(module)
-        frame.display_flashcards()
+        frame.set_module(module)  # Applies the changes if the module is already displayed
 
     def show_frame(self, frame_name):
         """
@@ -75,6 +97,8 @@ class MainWindow(tk.Tk):
             frame_name (str): The name of the frame to be displayed.
         """
         frame = self.frames[frame_name]
+        if frame_name == "MainView":
+            frame.display_modules()  # Flashcard counts may have changed in the module view
         frame.tkraise()
 
     def open_module_view(self, module):
@@ -86,14 +110,20 @@ class MainWindow(tk.Tk):
         """
         module_view = self.frames["ModuleView"]
         module_view.set_module(module)
-        module_view.display_flashcards()
         self.show_frame("ModuleView")
 
     def on_closing(self):
         """
-        Handles the closing of the main window, closing database connection and destroying the window.
+        Handles the closing of the main window, writing pending changes, closing database connection
+        and destroying the window.
         """
+        self.backup_service.stop()
+        self.generation_jobs.stop()  # Running jobs are resumed on the next start
+        self.review_log.flush()
+        self.db_service.flush(timeout=5.0)  # Bounded, so a stuck write cannot hang the window
         self.db_service.close_connection()
+        self.response_cache.close()
+        self.openai_clients.close()
         self.destroy()
 
     def create_api_key_button(self):
@@ -115,6 +145,15 @@ class MainWindow(tk.Tk):
         )
         api_key_button.pack(side="left", padx=5, pady=5)
 
+        inbox_button = tk.Button(
+            api_key_frame,
+            text="Posteingang",
+            command=self.generation_inbox.open_inbox,
+            bg="#4CAF50",
+            fg="black"
+        )
+        inbox_button.pack(side="left", padx=5, pady=5)
+
 
       # Powered By OpenAI Label
         powered_by_label = tk.Label(
@@ -167,7 +206,11 @@ class MainWindow(tk.Tk):
                     if self.chatgpt_service:
                         self.chatgpt_service.set_api_key(api_key)
                     else:
-                        self.chatgpt_service = ChatGPTService(config_service=self.config_service)
+                        self.chatgpt_service = ChatGPTService(
+                            config_service=self.config_service, response_cache=self.response_cache,
+                            client_factory=self.openai_clients
+                        )
+                    self.generation_jobs.chatgpt_service = self.chatgpt_service  # Starts waiting jobs
 
                     self.api_key_status_label.config(text=self.get_api_key_status())
                     messagebox.showinfo("Erfolg", "ChatGPT API Key wurde erfolgreich gespeichert.")
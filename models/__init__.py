@@ -1,2 +1,2 @@
 
-from .module_model import Module, Flashcard
+from .module_model import Module, Flashcard, FlashcardPreview, FlashcardChange, ReviewState, ReviewEvent, ReviewStats, FlashcardSearchResult, GenerationJob
@@ -1,9 +1,14 @@
+from typing import NamedTuple
+
+
 class Module:
     """
     Represents a module in the system.
     A module can have many flashcards associated with it.
     """
 
+    __slots__ = ("id", "name")
+
     def __init__(self, module_id, name):
         """
         Initializes the module with its ID and name.
@@ -15,6 +20,20 @@ class Module:
         self.id = module_id  # Module ID
         self.name = name  # Module name
 
+    @classmethod
+    def from_row(cls, cursor, row):
+        """
+        Builds a module directly from a database row; usable as a sqlite3 ``row_factory``.
+
+        Args:
+            cursor (sqlite3.Cursor): The cursor that produced the row.
+            row (tuple): The (id, name) row.
+
+        Returns:
+            Module: The module for the row.
+        """
+        return cls(*row)
+
 
 class Flashcard:
     """
@@ -22,6 +41,8 @@ class Flashcard:
     A flashcard contains a question and an answer, and is associated with a module.
     """
 
+    __slots__ = ("id", "module_id", "question", "answer")
+
     def __init__(self, flashcard_id, module_id, question, answer):
         """
         Initializes the flashcard with its ID, associated module ID, question, and answer.
@@ -36,3 +57,244 @@ class Flashcard:
         self.module_id = module_id  # Module ID this flashcard belongs to
         self.question = question  # The question of the flashcard
         self.answer = answer  # The answer to the flashcard's question
+
+    @classmethod
+    def from_row(cls, cursor, row):
+        """
+        Builds a flashcard directly from a database row; usable as a sqlite3 ``row_factory``.
+
+        Args:
+            cursor (sqlite3.Cursor): The cursor that produced the row.
+            row (tuple): The (id, module_id, question, answer) row.
+
+        Returns:
+            Flashcard: The flashcard for the row.
+        """
+        return cls(*row)
+
+
+class FlashcardPreview(NamedTuple):
+    """
+    A lightweight, tuple-backed projection of a flashcard for list views.
+    The question and answer are only the leading part of the full texts.
+    """
+
+    id: int  # Flashcard ID
+    question: str  # Beginning of the question
+    answer: str  # Beginning of the answer
+
+    @classmethod
+    def from_row(cls, cursor, row):
+        """
+        Builds a preview directly from a database row; usable as a sqlite3 ``row_factory``.
+
+        Args:
+            cursor (sqlite3.Cursor): The cursor that produced the row.
+            row (tuple): The (id, question prefix, answer prefix) row.
+
+        Returns:
+            FlashcardPreview: The preview for the row.
+        """
+        return cls._make(row)
+
+
+class FlashcardChange(NamedTuple):
+    """
+    The current state of a flashcard that changed since a given change-feed sequence number.
+    The question and answer are only the leading part of the full texts, like in a preview.
+    """
+
+    seq: int  # Sequence number of the flashcard's latest change
+    id: int  # Flashcard ID
+    question: str  # Beginning of the question, None if the flashcard was deleted
+    answer: str  # Beginning of the answer, None if the flashcard was deleted
+
+    @property
+    def deleted(self):
+        """
+        bool: True if the flashcard no longer exists in the module.
+        """
+        return self.question is None
+
+    @classmethod
+    def from_row(cls, cursor, row):
+        """
+        Builds a change directly from a database row; usable as a sqlite3 ``row_factory``.
+
+        Args:
+            cursor (sqlite3.Cursor): The cursor that produced the row.
+            row (tuple): The (seq, id, question prefix, answer prefix) row.
+
+        Returns:
+            FlashcardChange: The change for the row.
+        """
+        return cls._make(row)
+
+
+class ReviewState:
+    """
+    Represents the spaced-repetition state of a flashcard.
+    """
+
+    __slots__ = ("flashcard_id", "module_id", "due_at", "ease", "interval_days", "repetitions", "lapses", "last_reviewed_at")
+
+    def __init__(self, flashcard_id, module_id, due_at, ease=2.5, interval_days=0.0, repetitions=0, lapses=0,
+                 last_reviewed_at=None):
+        """
+        Initializes the review state of a flashcard.
+
+        Args:
+            flashcard_id (int): The ID of the flashcard.
+            module_id (int): The ID of the module the flashcard belongs to.
+            due_at (float): When the flashcard is due next, as a Unix timestamp.
+            ease (float): The SM-2 ease factor.
+            interval_days (float): The current review interval in days.
+            repetitions (int): The number of successful reviews in a row.
+            lapses (int): How often the flashcard was forgotten after it had been learned.
+            last_reviewed_at (float, optional): When the flashcard was last reviewed, as a Unix timestamp.
+        """
+        self.flashcard_id = flashcard_id  # Flashcard ID
+        self.module_id = module_id  # Module ID the flashcard belongs to
+        self.due_at = due_at  # Next due time
+        self.ease = ease  # SM-2 ease factor
+        self.interval_days = interval_days  # Current interval in days
+        self.repetitions = repetitions  # Successful reviews in a row
+        self.lapses = lapses  # Times forgotten after being learned
+        self.last_reviewed_at = last_reviewed_at  # Time of the last review
+
+    @classmethod
+    def from_row(cls, cursor, row):
+        """
+        Builds a review state directly from a database row; usable as a sqlite3 ``row_factory``.
+
+        Args:
+            cursor (sqlite3.Cursor): The cursor that produced the row.
+            row (tuple): The row with the columns in constructor order.
+
+        Returns:
+            ReviewState: The review state for the row.
+        """
+        return cls(*row)
+
+
+class GenerationJob(NamedTuple):
+    """
+    A queued flashcard generation, without its source text and generated flashcards.
+    """
+
+    id: int  # Job ID
+    module_id: int  # Module ID the flashcards are generated for
+    title: str  # Name shown in the review inbox, e.g. the source file name
+    status: str  # 'pending', 'running', 'done' or 'failed'
+    flashcard_count: int  # Number of generated flashcards awaiting review
+    error: str  # Error message of a failed job, None otherwise
+    created_at: float  # Time the job was queued as a Unix timestamp
+    updated_at: float  # Time of the last status change as a Unix timestamp
+
+    @classmethod
+    def from_row(cls, cursor, row):
+        """
+        Builds a job directly from a database row; usable as a sqlite3 ``row_factory``.
+
+        Args:
+            cursor (sqlite3.Cursor): The cursor that produced the row.
+            row (tuple): The row with the columns in field order.
+
+        Returns:
+            GenerationJob: The job for the row.
+        """
+        return cls._make(row)
+
+
+class ReviewEvent(NamedTuple):
+    """
+    One answer given during a study session, as written to the review log.
+    """
+
+    flashcard_id: int  # Flashcard ID
+    module_id: int  # Module ID the flashcard belongs to
+    mode: str  # Study mode the answer was given in
+    rating: int  # Quality of the answer on the SM-2 scale
+    latency_ms: int  # Time from showing the question to the answer, None if unknown
+    attempt: int  # Number of the attempt at this flashcard, starting at 1
+    reviewed_at: float  # Time of the answer as a Unix timestamp
+
+
+class ReviewStats(NamedTuple):
+    """
+    Precomputed review totals of a flashcard or a module.
+    """
+
+    reviews: int  # Number of answers
+    correct: int  # Number of answers rated as remembered
+    total_latency_ms: int  # Sum of all answer latencies
+    last_rating: int  # Rating of the latest answer, None without answers
+    last_reviewed_at: float  # Time of the latest answer, None without answers
+
+    @property
+    def success_rate(self):
+        """
+        float: The share of remembered answers in percent, 0 without answers.
+        """
+        return self.correct / self.reviews * 100 if self.reviews else 0.0
+
+    @property
+    def average_latency_ms(self):
+        """
+        float: The average answer latency in milliseconds, 0 without answers.
+        """
+        return self.total_latency_ms / self.reviews if self.reviews else 0.0
+
+    @classmethod
+    def from_row(cls, cursor, row):
+        """
+        Builds review stats directly from a database row; usable as a sqlite3 ``row_factory``.
+
+        Args:
+            cursor (sqlite3.Cursor): The cursor that produced the row.
+            row (tuple): The (reviews, correct, total_latency_ms, last_rating, last_reviewed_at) row.
+
+        Returns:
+            ReviewStats: The stats for the row.
+        """
+        return cls._make(row)
+
+
+class FlashcardSearchResult:
+    """
+    Represents a flashcard found by a full-text search.
+    The question and answer contain the matched terms wrapped in highlight markers.
+    """
+
+    __slots__ = ("id", "module_id", "question", "answer", "rank")
+
+    def __init__(self, flashcard_id, module_id, question, answer, rank):
+        """
+        Initializes the search result with the flashcard's IDs, highlighted texts and rank.
+
+        Args:
+            flashcard_id (int): The unique ID of the flashcard.
+            module_id (int): The ID of the module this flashcard belongs to.
+            question (str): The question with highlighted matches.
+            answer (str): A snippet of the answer with highlighted matches.
+            rank (float): The BM25 rank of the match; lower values are better matches.
+        """
+        self.id = flashcard_id  # Flashcard ID
+        self.module_id = module_id  # Module ID this flashcard belongs to
+        self.question = question  # Highlighted question
+        self.answer = answer  # Highlighted answer snippet
+        self.rank = rank  # BM25 rank, lower is better
+
+    @classmethod
+    def from_row(cls, cursor, row):
+        """
+        Builds a search result directly from a database row; usable as a sqlite3 ``row_factory``.
+
+        Args:
+            cursor (sqlite3.Cursor): The cursor that produced the row.
+            row (tuple): The (id, module_id, question, answer, rank) row.
+
+        Returns:
+            FlashcardSearchResult: The search result for the row.
+        """
+        return cls(*row)
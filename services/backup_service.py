@@ -0,0 +1,184 @@
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+
+class BackupCancelled(Exception):
+    """
+    Raised inside a running backup when the service is stopped.
+    """
+
+
+class BackupService:
+    """
+    Takes online snapshots of the flashcard database with the SQLite backup API.
+
+    A snapshot is copied page by page from a reader connection of ``DatabaseService``, with a short
+    sleep after every step, so writers are never locked out for long. The reader holds one read
+    transaction for the whole copy, which gives a consistent snapshot in WAL mode even while the
+    application keeps writing. Snapshots are written to a temporary file and renamed once complete,
+    so the backup directory only ever contains finished copies.
+
+    Scheduled snapshots run on a daemon thread; nothing here runs on the Tk thread.
+    """
+
+    FILE_PREFIX = "modules-"
+    FILE_SUFFIX = ".db"
+
+    def __init__(self, db_service, backup_dir=None, interval_seconds=3600, keep=10, pages_per_step=256, step_sleep=0.01):
+        """
+        Initializes the service without starting the schedule.
+
+        Args:
+            db_service (DatabaseService): The database service whose database is backed up.
+            backup_dir (str, optional): Where snapshots are stored. Defaults to a ``backups``
+                directory next to the database file.
+            interval_seconds (float): The time between two scheduled snapshots.
+            keep (int): How many snapshots are retained; older ones are deleted.
+            pages_per_step (int): The number of database pages copied per backup step.
+            step_sleep (float): Seconds to sleep between two backup steps.
+        """
+        self.db_service = db_service
+        db_path = os.path.abspath(db_service.connections.db_name)
+        self.backup_dir = backup_dir or os.path.join(os.path.dirname(db_path), "backups")
+        self.interval_seconds = interval_seconds
+        self.keep = keep
+        self.pages_per_step = pages_per_step
+        self.step_sleep = step_sleep
+        self._backup_lock = threading.Lock()  # Only one snapshot at a time
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """
+        Starts taking scheduled snapshots on a background thread.
+
+        The first snapshot is taken right away unless the latest one is younger than the interval.
+        """
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="database-backup", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5):
+        """
+        Stops the schedule and cancels a running snapshot.
+
+        Args:
+            timeout (float): How long to wait for the background thread to finish.
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def list_backups(self):
+        """
+        Returns the finished snapshots, oldest first.
+
+        Returns:
+            List[str]: The paths of the snapshot files.
+        """
+        if not os.path.isdir(self.backup_dir):
+            return []
+        names = sorted(
+            name for name in os.listdir(self.backup_dir)
+            if name.startswith(self.FILE_PREFIX) and name.endswith(self.FILE_SUFFIX)
+        )
+        return [os.path.join(self.backup_dir, name) for name in names]
+
+    def backup_now(self, progress=None):
+        """
+        Takes a snapshot of the database and applies the retention policy.
+
+        Blocks the calling thread until the copy is done, so it must not be called on the Tk thread.
+
+        Args:
+            progress (callable, optional): Called with (copied_pages, total_pages) after every step.
+
+        Returns:
+            str: The path of the new snapshot.
+
+        Raises:
+            BackupCancelled: If the service was stopped while the snapshot was being taken.
+        """
+        with self._backup_lock:
+            os.makedirs(self.backup_dir, exist_ok=True)
+            timestamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+            path = os.path.join(self.backup_dir, f"{self.FILE_PREFIX}{timestamp}{self.FILE_SUFFIX}")
+            temp_path = path + ".part"
+
+            def on_step(status, remaining, total):
+                if progress:
+                    progress(total - remaining, total)
+                if self._stop_event.is_set():
+                    raise BackupCancelled("Die Sicherung wurde abgebrochen.")
+                time.sleep(self.step_sleep)  # Give writers room between two steps
+
+            target = sqlite3.connect(temp_path)
+            try:
+                with self.db_service.connections.read() as source:
+                    # Pin one read snapshot, so concurrent writes do not restart the copy
+                    source.execute("BEGIN")
+                    try:
+                        source.execute("SELECT COUNT(*) FROM schema_version").fetchone()
+                        source.backup(target, pages=self.pages_per_step, progress=on_step)
+                    finally:
+                        source.execute("COMMIT")
+                # The snapshot is a standalone file; it does not need the WAL of the live database
+                target.execute("PRAGMA journal_mode=DELETE")
+                if target.execute("PRAGMA quick_check").fetchone()[0] != "ok":
+                    raise sqlite3.DatabaseError("Die Sicherung ist beschädigt.")
+            except BaseException:
+                target.close()
+                self._remove(temp_path)
+                raise
+            target.close()
+            os.replace(temp_path, path)
+
+            self.prune()
+            return path
+
+    def prune(self):
+        """
+        Deletes the oldest snapshots beyond the configured number to keep.
+        """
+        backups = self.list_backups()
+        for path in backups[:max(len(backups) - self.keep, 0)]:
+            self._remove(path)
+
+    def _run(self):
+        """
+        The schedule loop of the background thread.
+        """
+        backups = self.list_backups()
+        if backups:
+            age = time.time() - os.path.getmtime(backups[-1])
+            wait = max(self.interval_seconds - age, 0)
+        else:
+            wait = 0
+
+        while not self._stop_event.wait(wait):
+            try:
+                self.backup_now()
+            except BackupCancelled:
+                break
+            except Exception as e:
+                print(f"Fehler bei der Datenbanksicherung: {e}")
+            wait = self.interval_seconds
+
+    @staticmethod
+    def _remove(path):
+        """
+        Deletes a file if it exists.
+
+        Args:
+            path (str): The file to delete.
+        """
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
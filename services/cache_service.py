@@ -0,0 +1,328 @@
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+
+from models.module_model import FlashcardPreview
+
+
+class _PreviewList:
+    """
+    The cached leading part of one module's flashcard previews, ordered by ID.
+    """
+
+    __slots__ = ("ids", "previews", "complete")
+
+    def __init__(self):
+        self.ids = []  # Flashcard IDs, kept parallel to previews for bisecting
+        self.previews = []
+        self.complete = False  # True once the list reaches the module's last flashcard
+
+
+class CacheService:
+    """
+    Write-through, in-memory cache for the module list and the per-module flashcard lists.
+
+    ``DatabaseService`` consults the cache before querying SQLite and reports every committed
+    mutation to it, so the cached lists are patched in place instead of being dropped. The
+    number of modules whose flashcard lists are kept is bounded by an LRU policy.
+
+    Every mutation bumps a generation counter. Results read from the database are only stored if
+    no mutation was reported while they were being read, so a stale read can never overwrite a
+    newer write.
+    """
+
+    def __init__(self, max_modules=16):
+        """
+        Initializes an empty cache.
+
+        Args:
+            max_modules (int): How many modules' flashcard lists are kept; least recently used first out.
+        """
+        self.max_modules = max_modules
+        self._lock = threading.RLock()
+        self._modules = None  # List of all modules, None until loaded
+        self._flashcard_counts = None  # Module ID -> number of flashcards, None until loaded
+        self._previews = OrderedDict()  # (module_id, question_length, answer_length) -> _PreviewList
+        self.generation = 0
+
+    # Reads
+
+    def get_modules(self):
+        """
+        Returns the cached module list.
+
+        Returns:
+            List[Module] or None: A copy of the module list, or None if it is not cached.
+        """
+        with self._lock:
+            return list(self._modules) if self._modules is not None else None
+
+    def put_modules(self, modules, generation):
+        """
+        Stores the module list read from the database.
+
+        Args:
+            modules (List[Module]): All modules.
+            generation (int): The value of ``generation`` read before the query.
+        """
+        with self._lock:
+            if generation == self.generation:
+                self._modules = list(modules)
+
+    def get_flashcard_counts(self):
+        """
+        Returns the cached flashcard count per module.
+
+        Returns:
+            dict[int, int] or None: A copy of the counts, or None if they are not cached.
+        """
+        with self._lock:
+            return dict(self._flashcard_counts) if self._flashcard_counts is not None else None
+
+    def put_flashcard_counts(self, counts, generation):
+        """
+        Stores the flashcard counts read from the database.
+
+        Args:
+            counts (dict[int, int]): The number of flashcards per module ID.
+            generation (int): The value of ``generation`` read before the query.
+        """
+        with self._lock:
+            if generation == self.generation:
+                self._flashcard_counts = dict(counts)
+
+    def get_previews(self, module_id, after_id, page_size, question_length, answer_length):
+        """
+        Returns a page of flashcard previews if the cache covers it.
+
+        Args:
+            module_id (int): The ID of the module.
+            after_id (int): Only previews with a larger ID are returned.
+            page_size (int): The maximum number of previews.
+            question_length (int): The question prefix length of the requested previews.
+            answer_length (int): The answer prefix length of the requested previews.
+
+        Returns:
+            List[FlashcardPreview] or None: The page, or None if it is not fully cached.
+        """
+        key = (module_id, question_length, answer_length)
+        with self._lock:
+            entry = self._previews.get(key)
+            if entry is None:
+                return None
+            start = bisect_right(entry.ids, after_id)
+            if start + page_size > len(entry.ids) and not entry.complete:
+                return None
+            self._previews.move_to_end(key)
+            return entry.previews[start:start + page_size]
+
+    def put_previews(self, module_id, after_id, page_size, question_length, answer_length, previews, generation):
+        """
+        Merges a page of previews read from the database into the module's cached list.
+
+        Pages are only cached if they continue the cached list without a gap.
+
+        Args:
+            module_id (int): The ID of the module.
+            after_id (int): The keyset the page was read with.
+            page_size (int): The page size the page was read with.
+            question_length (int): The question prefix length of the previews.
+            answer_length (int): The answer prefix length of the previews.
+            previews (List[FlashcardPreview]): The page read from the database.
+            generation (int): The value of ``generation`` read before the query.
+        """
+        key = (module_id, question_length, answer_length)
+        with self._lock:
+            if generation != self.generation:
+                return
+            entry = self._previews.get(key)
+            if entry is None:
+                if after_id != 0:
+                    return
+                entry = self._previews[key] = _PreviewList()
+            elif (entry.ids and after_id > entry.ids[-1]) or (not entry.ids and after_id != 0):
+                return  # Would leave a gap between the cached list and this page
+
+            start = bisect_right(entry.ids, after_id)
+            entry.ids[start:] = [preview.id for preview in previews]
+            entry.previews[start:] = previews
+            entry.complete = len(previews) < page_size
+            self._previews.move_to_end(key)
+            while len(self._previews) > self.max_modules:
+                self._previews.popitem(last=False)
+
+    # Write-through updates, called by DatabaseService after a mutation has been committed
+
+    def module_added(self, module):
+        """
+        Adds a new, empty module to the cached module list.
+
+        Args:
+            module (Module): The new module.
+        """
+        with self._lock:
+            self.generation += 1
+            if self._modules is not None:
+                self._modules.append(module)
+            if self._flashcard_counts is not None:
+                self._flashcard_counts[module.id] = 0
+
+    def module_deleted(self, module_id):
+        """
+        Removes a module and its flashcard list from the cache.
+
+        Args:
+            module_id (int): The ID of the deleted module.
+        """
+        with self._lock:
+            self.generation += 1
+            if self._modules is not None:
+                self._modules = [module for module in self._modules if module.id != module_id]
+            if self._flashcard_counts is not None:
+                self._flashcard_counts.pop(module_id, None)
+            self._drop_previews(module_id)
+
+    def flashcards_added(self, module_id, flashcards):
+        """
+        Appends new flashcards to the module's cached list, if the list is complete.
+
+        New flashcards always have the highest IDs, so an incomplete cached prefix stays valid.
+
+        Args:
+            module_id (int): The ID of the module.
+            flashcards (list): (id, question, answer) tuples of the new flashcards.
+        """
+        with self._lock:
+            self.generation += 1
+            if self._flashcard_counts is not None and module_id in self._flashcard_counts:
+                self._flashcard_counts[module_id] += len(flashcards)
+            for (entry_module_id, question_length, answer_length), entry in self._previews.items():
+                if entry_module_id != module_id or not entry.complete:
+                    continue
+                for flashcard_id, question, answer in flashcards:
+                    entry.ids.append(flashcard_id)
+                    entry.previews.append(FlashcardPreview(flashcard_id, question[:question_length], answer[:answer_length]))
+
+    def module_flashcards_changed(self, module_id, added=None):
+        """
+        Drops the module's cached flashcard list after a change whose rows are not known here.
+
+        Args:
+            module_id (int): The ID of the module.
+            added (int, optional): The number of added flashcards, to keep the count up to date.
+        """
+        with self._lock:
+            self.generation += 1
+            if self._flashcard_counts is not None and module_id in self._flashcard_counts:
+                if added is None:
+                    self._flashcard_counts = None
+                else:
+                    self._flashcard_counts[module_id] += added
+            self._drop_previews(module_id)
+
+    def flashcard_updated(self, flashcard_id, question, answer):
+        """
+        Replaces the cached preview of an edited flashcard.
+
+        Args:
+            flashcard_id (int): The ID of the flashcard.
+            question (str): The new question.
+            answer (str): The new answer.
+        """
+        with self._lock:
+            self.generation += 1
+            for (module_id, question_length, answer_length), entry in self._previews.items():
+                index = self._index_of(entry, flashcard_id)
+                if index is not None:
+                    entry.previews[index] = FlashcardPreview(flashcard_id, question[:question_length], answer[:answer_length])
+
+    def flashcards_deleted(self, flashcard_ids):
+        """
+        Removes deleted flashcards from the cached lists and counts.
+
+        Args:
+            flashcard_ids (Iterable[int]): The IDs of the deleted flashcards.
+        """
+        with self._lock:
+            self.generation += 1
+            deleted = set(flashcard_ids)
+            deleted_modules = {}  # Flashcard ID -> module ID, for the flashcards found in the cache
+            for (module_id, question_length, answer_length), entry in self._previews.items():
+                if len(deleted) <= 64:
+                    # Few IDs: locate each one by bisection
+                    for flashcard_id in deleted:
+                        index = self._index_of(entry, flashcard_id)
+                        if index is not None:
+                            del entry.ids[index]
+                            del entry.previews[index]
+                            deleted_modules[flashcard_id] = module_id
+                else:
+                    # Many IDs: rebuild the list in a single pass
+                    kept = [(flashcard_id, preview) for flashcard_id, preview in zip(entry.ids, entry.previews)
+                            if flashcard_id not in deleted]
+                    if len(kept) != len(entry.ids):
+                        deleted_modules.update(dict.fromkeys(set(entry.ids) & deleted, module_id))
+                        entry.ids = [flashcard_id for flashcard_id, _ in kept]
+                        entry.previews = [preview for _, preview in kept]
+
+            if self._flashcard_counts is None:
+                return
+            if len(deleted_modules) < len(deleted):
+                # Some flashcards were not cached, so their modules are unknown here
+                self._flashcard_counts = None
+                return
+            for module_id in deleted_modules.values():
+                if module_id in self._flashcard_counts:
+                    self._flashcard_counts[module_id] -= 1
+
+    def module_flashcards_deleted(self, module_id):
+        """
+        Empties the module's cached flashcard list after all its flashcards were deleted.
+
+        Args:
+            module_id (int): The ID of the module.
+        """
+        with self._lock:
+            self.generation += 1
+            if self._flashcard_counts is not None and module_id in self._flashcard_counts:
+                self._flashcard_counts[module_id] = 0
+            for (entry_module_id, question_length, answer_length), entry in self._previews.items():
+                if entry_module_id == module_id:
+                    entry.ids, entry.previews, entry.complete = [], [], True
+
+    def clear(self):
+        """
+        Drops everything from the cache.
+        """
+        with self._lock:
+            self.generation += 1
+            self._modules = None
+            self._flashcard_counts = None
+            self._previews.clear()
+
+    @staticmethod
+    def _index_of(entry, flashcard_id):
+        """
+        Finds the position of a flashcard in a cached list.
+
+        Args:
+            entry (_PreviewList): The cached list.
+            flashcard_id (int): The ID of the flashcard.
+
+        Returns:
+            int or None: The index, or None if the flashcard is not in the list.
+        """
+        index = bisect_right(entry.ids, flashcard_id) - 1
+        if index >= 0 and entry.ids[index] == flashcard_id:
+            return index
+        return None
+
+    def _drop_previews(self, module_id):
+        """
+        Removes all cached flashcard lists of a module.
+
+        Args:
+            module_id (int): The ID of the module.
+        """
+        for key in [key for key in self._previews if key[0] == module_id]:
+            del self._previews[key]
@@ -1,5 +1,240 @@
-import openai
+import json
+
 from services.config_service import ConfigService
+from services.openai_client_factory import OpenAIClientFactory
+from utils.token_estimation import estimate_message_tokens, estimate_tokens
+
+MODEL = "gpt-4o-mini"
+TEMPERATURE = 0.7
+MAX_INPUT_TOKENS = 6000  # Prompt budget of a request; longer texts are split into chunks by GenerationPipeline
+MAX_OUTPUT_TOKENS = 16384  # Output limit of the model
+CONTEXT_WINDOW_TOKENS = 128000  # Prompt and output together
+OUTPUT_TOKENS_BASE = 60  # JSON wrapper of the response
+OUTPUT_TOKENS_PER_CARD = 180  # A question, up to 10 bullet points and an example
+# Bump whenever the prompt or system message changes, so cached responses of the old prompt are not reused
+PROMPT_VERSION = 1
+
+# Strict schema of the structured output mode; the API guarantees responses that match it
+FLASHCARDS_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "flashcards",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "flashcards": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "question": {"type": "string"},
+                            "answer": {"type": "string"},
+                            "example": {"type": "string"},
+                        },
+                        "required": ["question", "answer", "example"],
+                        "additionalProperties": False,
+                    },
+                },
+            },
+            "required": ["flashcards"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+
+def flashcard_from_json(item):
+    """
+    Converts an item of a structured response into a flashcard.
+
+    The example is appended to the answer, where the text format puts it as well.
+
+    Args:
+        item (object): A decoded item of the "flashcards" array.
+
+    Returns:
+        dict or None: The flashcard with 'question' and 'answer', or None if the item is invalid.
+    """
+    if not isinstance(item, dict):
+        return None
+    question, answer, example = item.get('question'), item.get('answer'), item.get('example', "")
+    if not isinstance(question, str) or not isinstance(answer, str) or not isinstance(example, str):
+        return None
+    question, answer, example = question.strip(), answer.strip(), example.strip()
+    if not question or not answer:
+        return None
+    if example:
+        answer = f"{answer}\nBeispiel: {example}"
+    return {'question': question, 'answer': answer}
+
+
+def parse_json_flashcards(generated_text):
+    """
+    Parses a structured response into flashcards.
+
+    Args:
+        generated_text (str): The JSON text returned in the structured output mode.
+
+    Returns:
+        list or None: The valid flashcards, or None if the text is not a response of the schema.
+    """
+    try:
+        data = json.loads(generated_text)
+    except ValueError:
+        return None
+    if not isinstance(data, dict) or not isinstance(data.get('flashcards'), list):
+        return None
+    flashcards = [flashcard_from_json(item) for item in data['flashcards']]
+    return [flashcard for flashcard in flashcards if flashcard]
+
+
+class JsonFlashcardStreamParser:
+    """
+    Parses a structured response into flashcards while it is still arriving.
+
+    The parser tracks string literals and nesting depth of the JSON text, and decodes every object
+    of the "flashcards" array as soon as its closing brace arrives. Text before the current object
+    is discarded, so memory stays bounded by the size of one flashcard.
+    """
+
+    ITEM_DEPTH = 3  # Root object, "flashcards" array, flashcard object
+
+    def __init__(self):
+        """
+        Initializes the parser at the start of the response.
+        """
+        self._text = ""
+        self._position = 0  # Index of the next character to scan in _text
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._item_start = None  # Index of the opening brace of the current flashcard object
+
+    def feed(self, text):
+        """
+        Adds generated text and returns the flashcards it completed.
+
+        Args:
+            text (str): The next piece of the generated text.
+
+        Returns:
+            list: The flashcards whose objects were closed by this piece.
+        """
+        self._text += text
+        flashcards = []
+        for index in range(self._position, len(self._text)):
+            char = self._text[index]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in '{[':
+                self._depth += 1
+                if char == '{' and self._depth == self.ITEM_DEPTH:
+                    self._item_start = index
+            elif char in '}]':
+                if char == '}' and self._depth == self.ITEM_DEPTH and self._item_start is not None:
+                    try:
+                        flashcard = flashcard_from_json(json.loads(self._text[self._item_start:index + 1]))
+                    except ValueError:
+                        flashcard = None
+                    if flashcard:
+                        flashcards.append(flashcard)
+                    self._item_start = None
+                self._depth -= 1
+
+        # Keep only the unfinished flashcard object
+        keep_from = self._item_start if self._item_start is not None else len(self._text)
+        self._text = self._text[keep_from:]
+        self._position = len(self._text)
+        if self._item_start is not None:
+            self._item_start = 0
+        return flashcards
+
+    def close(self):
+        """
+        Ends the text. An unfinished object at the end of a truncated response is dropped.
+
+        Returns:
+            list: Always empty; every complete flashcard was returned by ``feed``.
+        """
+        self._text = ""
+        self._item_start = None
+        return []
+
+
+class FlashcardStreamParser:
+    """
+    Parses generated text into flashcards while it is still arriving.
+
+    Entries are separated by blank lines, like in ``ChatGPTService.parse_flashcards``. An entry is
+    complete as soon as the blank line after it arrives, so its flashcard can be shown before the
+    rest of the response is generated. Feeding a whole text and closing the parser yields exactly
+    the flashcards of ``parse_flashcards``.
+    """
+
+    def __init__(self):
+        """
+        Initializes the parser with an empty buffer.
+        """
+        self._buffer = ""
+
+    @staticmethod
+    def _parse_entry(entry):
+        """
+        Parses a single entry.
+
+        Args:
+            entry (str): The text between two blank lines.
+
+        Returns:
+            dict or None: The flashcard with 'question' and 'answer', or None if the entry is not one.
+        """
+        if "Frage:" in entry and "Antwort:" in entry:
+            parts = entry.split('Antwort:')
+            question = parts[0].replace('Frage:', '').strip()  # Extract the question
+            answer = parts[1].strip()  # Extract the answer
+            return {'question': question, 'answer': answer}
+        return None
+
+    def feed(self, text):
+        """
+        Adds generated text and returns the flashcards it completed.
+
+        Args:
+            text (str): The next piece of the generated text.
+
+        Returns:
+            list: The flashcards whose entries were closed by this piece.
+        """
+        self._buffer += text
+        flashcards = []
+        while True:
+            end = self._buffer.find('\n\n')
+            if end == -1:
+                return flashcards
+            entry, self._buffer = self._buffer[:end], self._buffer[end + 2:]
+            flashcard = self._parse_entry(entry)
+            if flashcard:
+                flashcards.append(flashcard)
+
+    def close(self):
+        """
+        Ends the text and returns the flashcard of the last entry, if any.
+
+        Returns:
+            list: The flashcards of the remaining buffer.
+        """
+        entry, self._buffer = self._buffer, ""
+        flashcard = self._parse_entry(entry)
+        return [flashcard] if flashcard else []
+
 
 class ChatGPTService:
     """
@@ -7,14 +242,24 @@ class ChatGPTService:
     This service allows setting the API key and generating flashcards based on a text section.
     """
 
-    def __init__(self, config_service=None, api_key=None):
+    def __init__(self, config_service=None, api_key=None, response_cache=None, client_factory=None,
+                 structured_output=True):
         """
         Initializes the ChatGPTService with a config service and an API key.
 
         Args:
             config_service (ConfigService, optional): The configuration service for API key management.
             api_key (str, optional): The API key for OpenAI. If not provided, it is fetched from the config service.
+            response_cache (ResponseCacheService, optional): Cache for generated responses. If not provided,
+                every call goes to the API.
+            client_factory (OpenAIClientFactory, optional): The factory of the pooled API clients. If not
+                provided, the service gets a connection pool of its own.
+            structured_output (bool): Whether to request flashcards as JSON of a strict schema instead of
+                free text. Responses that are not valid JSON are still parsed as text.
         """
+        self.structured_output = structured_output
+        self.response_cache = response_cache
+        self.client_factory = client_factory or OpenAIClientFactory()
         self.config_service = config_service or ConfigService()  # Use provided config service or create a new one
         self.api_key = api_key or self.config_service.get_api_key()  # Get API key from service or provided
         if not self.api_key:
@@ -22,7 +267,6 @@ class ChatGPTService:
                 "API-Key für OpenAI nicht gefunden. Bitte setzen Sie die Umgebungsvariable 'OPENAI_API_KEY' "
                 "oder fügen Sie ihn über die Anwendung hinzu."
             )
-        openai.api_key = self.api_key  # Set the OpenAI API key
 
     def set_api_key(self, api_key):
         """
@@ -31,26 +275,38 @@ class ChatGPTService:
         Args:
             api_key (str): The new API key for OpenAI.
         """
-        self.api_key = api_key
-        openai.api_key = self.api_key  # Update OpenAI API key
+        self.api_key = api_key  # Later requests use the pooled client of the new key
         if self.config_service:
             self.config_service.set_api_key(api_key)  # Save the API key in the config service
 
-    def generate_flashcards(self, text_section):
+    def build_prompt(self, text_section, card_count=10):
         """
-        Generates flashcards based on the provided text section using OpenAI's GPT model.
+        Builds the prompt that asks for flashcards on a text section.
 
         Args:
             text_section (str): The text section from which flashcards will be generated.
+            card_count (int): The number of flashcards to ask for.
 
         Returns:
-            list: A list of generated flashcards, each containing a question and an answer.
+            list: The chat messages of the request.
         """
-        client = openai
+        if self.structured_output:
+            # The structure is enforced by the response format, so the prompt only describes the content
+            prompt = (
+                f"Erstelle {card_count} kurze und einfache Karteikarten basierend auf dem folgenden Textabschnitt:\n\n"
+                f"\"{text_section}\"\n\n"
+                f"Für jede Karteikarte gib eine Frage, eine Antwort und ein explizites Beispiel an.\n"
+                f"Verwende in der Antwort maximal 10 Stichpunkte.\n"
+                f"Nutze Stichpunkte oder kurze Texterklärungen, je nachdem, was für das jeweilige Thema sinnvoller ist."
+            )
+            return [
+                {"role": "system", "content": "Du bist ein Prof."},
+                {"role": "user", "content": prompt}
+            ]
 
         # Prompt for generating flashcards (content remains in German as requested)
         prompt = (
-            f"Erstelle 10 kurze und einfache Karteikarten basierend auf dem folgenden Textabschnitt:\n\n"
+            f"Erstelle {card_count} kurze und einfache Karteikarten basierend auf dem folgenden Textabschnitt:\n\n"
             f"\"{text_section}\"\n\n"
             f"Für jede Karteikarte gib eine Frage und eine Antwort an.\n"
             f"Die Karteikarten müssen nicht nummeriert werden, sondern nur Frage und Antwort enthalten.\n"
@@ -62,24 +318,216 @@ class ChatGPTService:
             f"Nutze Stichpunkte oder kurze Texterklärungen, je nachdem, was für das jeweilige Thema sinnvoller ist.\n"
             f"Füge am Ende jeder Karteikarte immer ein explizites Beispiel hinzu."
         )
+        return [
+            {"role": "system", "content": "Du bist ein Prof."},
+            {"role": "user", "content": prompt}
+        ]
+
+    def cache_key(self, text_section, card_count=10):
+        """
+        Returns the response cache key of a request, or None if no cache is configured.
+
+        Args:
+            text_section (str): The text section from which flashcards will be generated.
+            card_count (int): The number of flashcards to ask for.
+
+        Returns:
+            str or None: The cache key.
+        """
+        if not self.response_cache:
+            return None
+        return self.response_cache.make_key(
+            model=MODEL, prompt_version=PROMPT_VERSION, temperature=TEMPERATURE,
+            max_tokens=self.max_output_tokens(card_count), card_count=card_count, text=text_section,
+            output_format="json" if self.structured_output else "text"
+        )
+
+    @staticmethod
+    def max_output_tokens(card_count):
+        """
+        Returns the output limit of a request, sized for the number of flashcards asked for, so
+        long answers are not truncated and short requests do not reserve more than they need.
+
+        Args:
+            card_count (int): The number of flashcards to ask for.
+
+        Returns:
+            int: The value for ``max_tokens``.
+        """
+        return min(MAX_OUTPUT_TOKENS, OUTPUT_TOKENS_BASE + OUTPUT_TOKENS_PER_CARD * card_count)
+
+    def check_request_size(self, messages, card_count=10):
+        """
+        Rejects a request that is too large before anything is sent.
+
+        The whole prompt is counted: the system message, the instructions around the text section
+        and, in the structured output mode, the response schema. Together with the output limit it
+        has to fit the context window of the model.
+
+        Args:
+            messages (list): The chat messages of the request, as returned by ``build_prompt``.
+            card_count (int): The number of flashcards to ask for.
+
+        Raises:
+            ValueError: If the estimated prompt exceeds ``MAX_INPUT_TOKENS`` or the prompt and the
+                output limit exceed ``CONTEXT_WINDOW_TOKENS``.
+        """
+        tokens = estimate_message_tokens(messages)
+        if self.structured_output:
+            tokens += estimate_tokens(json.dumps(FLASHCARDS_RESPONSE_FORMAT))
+        if tokens > MAX_INPUT_TOKENS or tokens + self.max_output_tokens(card_count) > CONTEXT_WINDOW_TOKENS:
+            raise ValueError(
+                f"Der Textabschnitt ist zu lang (ca. {tokens} Tokens, höchstens {MAX_INPUT_TOKENS}). "
+                f"Bitte teilen Sie ihn in kleinere Abschnitte auf."
+            )
+
+    def request_options(self):
+        """
+        Returns the options of a generation request that depend on the output mode.
+
+        Returns:
+            dict: Keyword arguments for ``chat.completions.create``.
+        """
+        if self.structured_output:
+            return {"response_format": FLASHCARDS_RESPONSE_FORMAT}
+        return {}
+
+    def parse_response(self, generated_text):
+        """
+        Parses a complete response of the current output mode into flashcards.
+
+        In the structured output mode the response is decoded as JSON. The complete flashcards of a
+        truncated response are still recovered, and a response that contains no JSON flashcards at
+        all, e.g. an older cached one, is parsed with the text parser as the fallback.
+
+        Args:
+            generated_text (str): The text returned by the OpenAI API.
+
+        Returns:
+            list: A list of flashcards where each flashcard is a dictionary with 'question' and 'answer'.
+        """
+        if self.structured_output:
+            flashcards = parse_json_flashcards(generated_text)
+            if flashcards is not None:
+                return flashcards
+            flashcards = JsonFlashcardStreamParser().feed(generated_text)
+            if flashcards:
+                return flashcards
+        return self.parse_flashcards(generated_text)
+
+    def generate_flashcards(self, text_section, use_cache=True, card_count=10):
+        """
+        Generates flashcards based on the provided text section using OpenAI's GPT model.
+
+        Identical requests are answered from the response cache if one is configured. With
+        ``use_cache=False`` the API is always called and the fresh response replaces the cached one.
+
+        Args:
+            text_section (str): The text section from which flashcards will be generated.
+            use_cache (bool): Whether a cached response may be returned.
+            card_count (int): The number of flashcards to ask for.
+
+        Returns:
+            list: A list of generated flashcards, each containing a question and an answer.
+
+        Raises:
+            ValueError: If the text section is too long for a single request.
+        """
+        messages = self.build_prompt(text_section, card_count)
+        self.check_request_size(messages, card_count)
+        client = self.client_factory.get_client(self.api_key)
+
+        cache_key = self.cache_key(text_section, card_count)
+        cached_text = self.response_cache.get(cache_key) if cache_key and use_cache else None
+        if cached_text is not None:
+            return self.parse_response(cached_text)
 
         try:
             # Request flashcard generation from OpenAI API
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "Du bist ein Prof."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=1500,
+            response = self.client_factory.retry_policy.call(
+                client.chat.completions.create,
+                model=MODEL,
+                messages=messages,
+                temperature=TEMPERATURE,
+                max_tokens=self.max_output_tokens(card_count),
+                timeout=self.client_factory.timeout("chat"),
+                **self.request_options(),
             )
             generated_text = response.choices[0].message.content  # Get the generated content
-            flashcards = self.parse_flashcards(generated_text)  # Parse the generated text into flashcards
+            if cache_key and generated_text:
+                self.response_cache.put(cache_key, generated_text)  # Cache the raw text, so parser fixes apply to it
+            flashcards = self.parse_response(generated_text)  # Parse the generated text into flashcards
             return flashcards
         except Exception as e:
             raise e  # Raise an exception if something goes wrong
 
+    def stream_flashcards(self, text_section, use_cache=True, card_count=10):
+        """
+        Generates flashcards like ``generate_flashcards``, but yields each one as soon as the model
+        has finished writing it.
+
+        The response is requested with ``stream=True`` and parsed incrementally. If a structured
+        response yields no flashcard, the complete text is parsed with the fallback of
+        ``parse_response`` at the end. The complete text is cached only if the stream was read to
+        the end. Closing the generator early closes the HTTP stream.
+
+        Args:
+            text_section (str): The text section from which flashcards will be generated.
+            use_cache (bool): Whether a cached response may be returned.
+            card_count (int): The number of flashcards to ask for.
+
+        Yields:
+            dict: The generated flashcards, each containing a question and an answer.
+
+        Raises:
+            ValueError: If the text section is too long for a single request.
+        """
+        messages = self.build_prompt(text_section, card_count)
+        self.check_request_size(messages, card_count)
+        client = self.client_factory.get_client(self.api_key)
+
+        cache_key = self.cache_key(text_section, card_count)
+        cached_text = self.response_cache.get(cache_key) if cache_key and use_cache else None
+        if cached_text is not None:
+            yield from self.parse_response(cached_text)
+            return
+
+        # Only opening the stream is retried; cards that were already shown cannot be taken back
+        stream = self.client_factory.retry_policy.call(
+            client.chat.completions.create,
+            model=MODEL,
+            messages=messages,
+            temperature=TEMPERATURE,
+            max_tokens=self.max_output_tokens(card_count),
+            stream=True,
+            timeout=self.client_factory.timeout("chat_stream"),
+            **self.request_options(),
+        )
+        parser = JsonFlashcardStreamParser() if self.structured_output else FlashcardStreamParser()
+        pieces = []
+        emitted = 0
+        try:
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                piece = chunk.choices[0].delta.content
+                if piece:
+                    pieces.append(piece)
+                    for flashcard in parser.feed(piece):
+                        emitted += 1
+                        yield flashcard
+        finally:
+            stream.close()  # Also ends the request if the consumer stopped early
+        for flashcard in parser.close():
+            emitted += 1
+            yield flashcard
+
+        generated_text = "".join(pieces)
+        if self.structured_output and not emitted:
+            yield from self.parse_response(generated_text)
+        if cache_key and generated_text:
+            self.response_cache.put(cache_key, generated_text)  # Cache the raw text, so parser fixes apply to it
+
     def parse_flashcards(self, generated_text):
         """
         Parses the generated text into a list of flashcards.
@@ -90,12 +538,5 @@ class ChatGPTService:
         Returns:
             list: A list of flashcards where each flashcard is a dictionary with 'question' and 'answer'.
         """
-        flashcards = []
-        entries = generated_text.strip().split('\n\n')  # Split the text into separate entries
-        for entry in entries:
-            if "Frage:" in entry and "Antwort:" in entry:
-                parts = entry.split('Antwort:')
-                question = parts[0].replace('Frage:', '').strip()  # Extract the question
-                answer = parts[1].strip()  # Extract the answer
-                flashcards.append({'question': question, 'answer': answer})
-        return flashcards
+        parser = FlashcardStreamParser()
+        return parser.feed(generated_text) + parser.close()
@@ -0,0 +1,135 @@
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+
+class ConnectionManager:
+    """
+    Hands out SQLite connections that are safe to use from any thread.
+
+    Reads use a pool of reader connections: a thread checks one out for the duration of a
+    ``read()`` block, so no two threads ever share a connection or a cursor. All writes go
+    through a single writer connection that is serialized by a lock. Combined with WAL mode,
+    readers never wait for the writer and workers can touch the database off the Tk thread.
+    """
+
+    def __init__(self, db_name, configure=None, max_idle_readers=4):
+        """
+        Initializes the manager and opens the writer connection.
+
+        Args:
+            db_name (str): The database file name.
+            configure (callable, optional): Called with every new connection to apply pragmas.
+            max_idle_readers (int): How many unused reader connections are kept open for reuse.
+        """
+        self.db_name = db_name
+        self.configure = configure
+        self.max_idle_readers = max_idle_readers
+        self._idle_readers = queue.LifoQueue()
+        self._local = threading.local()  # Per-thread checkout state for reentrant use
+        self._write_lock = threading.RLock()
+        self._transaction_depth = 0
+        self._closed = False
+        self._writer = self._connect()
+
+    def _connect(self):
+        """
+        Opens a new connection in autocommit mode; transactions are started explicitly.
+
+        Returns:
+            sqlite3.Connection: The new connection.
+        """
+        connection = sqlite3.connect(self.db_name, check_same_thread=False, isolation_level=None)
+        if self.configure:
+            self.configure(connection)
+        return connection
+
+    @contextmanager
+    def read(self):
+        """
+        Provides a reader connection owned by the calling thread for the duration of the block.
+
+        Nested ``read()`` blocks on the same thread reuse the same connection.
+
+        Yields:
+            sqlite3.Connection: A connection for SELECT statements.
+        """
+        connection = getattr(self._local, "reader", None)
+        if connection is not None:
+            yield connection
+            return
+
+        try:
+            connection = self._idle_readers.get_nowait()
+        except queue.Empty:
+            connection = self._connect()
+
+        self._local.reader = connection
+        try:
+            yield connection
+        finally:
+            self._local.reader = None
+            if self._closed or self._idle_readers.qsize() >= self.max_idle_readers:
+                connection.close()
+            else:
+                self._idle_readers.put(connection)
+
+    @contextmanager
+    def writer(self):
+        """
+        Provides exclusive access to the writer connection without starting a transaction.
+
+        Used for work that manages its own transactions, such as schema migrations.
+
+        Yields:
+            sqlite3.Connection: The writer connection.
+        """
+        with self._write_lock:
+            yield self._writer
+
+    @contextmanager
+    def transaction(self):
+        """
+        Runs the block inside a write transaction on the serialized writer connection.
+
+        The transaction is committed when the block finishes and rolled back if it raises.
+        Nested blocks on the same thread join the outer transaction.
+
+        Yields:
+            sqlite3.Connection: The writer connection.
+        """
+        with self._write_lock:
+            if self._transaction_depth:
+                self._transaction_depth += 1
+                try:
+                    yield self._writer
+                finally:
+                    self._transaction_depth -= 1
+                return
+
+            self._writer.execute("BEGIN IMMEDIATE")
+            self._transaction_depth = 1
+            try:
+                yield self._writer
+                self._writer.execute("COMMIT")
+            except BaseException:
+                self._writer.execute("ROLLBACK")
+                raise
+            finally:
+                self._transaction_depth = 0
+
+    def close(self):
+        """
+        Closes the writer and all idle reader connections.
+
+        Reader connections that are checked out are closed when their ``read()`` block ends.
+        """
+        self._closed = True
+        with self._write_lock:
+            self._writer.close()
+        while True:
+            try:
+                self._idle_readers.get_nowait().close()
+            except queue.Empty:
+                break
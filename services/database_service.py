@@ -1,49 +1,176 @@
-import sqlite3
-from models.module_model import Module, Flashcard
+import json
+import threading
+import time
+from functools import partial
+
+from models.module_model import (
+    Module, Flashcard, FlashcardPreview, FlashcardChange, ReviewState, ReviewStats, FlashcardSearchResult, GenerationJob
+)
+from services.cache_service import CacheService
+from services.connection_manager import ConnectionManager
+from services.identity_map import IdentityMap
+from services.migrations import apply_migrations
+from services.review_scheduler import schedule_review, RATING_HARD
+from services.write_behind_queue import WriteBehindQueue
+from utils.text_normalization import flashcard_content_hash
+
+# Explicit column lists, so the row factories keep working when columns are added to the tables
+MODULE_COLUMNS = "id, name"
+FLASHCARD_COLUMNS = "id, module_id, question, answer"
+REVIEW_STATE_COLUMNS = "flashcard_id, module_id, due_at, ease, interval_days, repetitions, lapses, last_reviewed_at"
+REVIEW_STATS_COLUMNS = "reviews, correct, total_latency_ms, last_rating, last_reviewed_at"
+GENERATION_JOB_COLUMNS = "id, module_id, title, status, flashcard_count, error, created_at, updated_at"
+
+# Stays well below SQLITE_MAX_VARIABLE_NUMBER, which is only 999 on older SQLite builds
+MAX_IN_CLAUSE_VARIABLES = 500
+
+# What the insert methods do with a flashcard whose content already exists in the module
+ON_DUPLICATE_SKIP = "skip"  # Keep the existing flashcard
+ON_DUPLICATE_UPDATE = "update"  # Overwrite the existing flashcard's texts
+ON_DUPLICATE_ERROR = "error"  # Raise sqlite3.IntegrityError
+
+_INSERT_FLASHCARD_SQL = {
+    ON_DUPLICATE_SKIP: "INSERT INTO flashcards (module_id, question, answer, content_hash) VALUES (?, ?, ?, ?) "
+                       "ON CONFLICT (module_id, content_hash) DO NOTHING",
+    ON_DUPLICATE_UPDATE: "INSERT INTO flashcards (module_id, question, answer, content_hash) VALUES (?, ?, ?, ?) "
+                         "ON CONFLICT (module_id, content_hash) DO UPDATE SET question = excluded.question, "
+                         "answer = excluded.answer",
+    ON_DUPLICATE_ERROR: "INSERT INTO flashcards (module_id, question, answer, content_hash) VALUES (?, ?, ?, ?)",
+}
+
+# Status of a flashcard generation job
+JOB_PENDING = "pending"  # Waiting for a worker
+JOB_RUNNING = "running"  # Claimed by a worker
+JOB_DONE = "done"  # Flashcards generated and waiting for review
+JOB_FAILED = "failed"  # Generation failed; can be queued again
+
+# Number of most recent change-feed entries kept when the feed is pruned at startup
+CHANGE_FEED_RETENTION = 10000
 
 class DatabaseService:
     """
     Provides database operations for modules and flashcards.
+
+    All methods are safe to call from any thread: reads run on a reader connection owned by the
+    calling thread and writes are serialized on a single writer connection.
+
+    In write-behind mode the mutating methods do not block: they queue the change for a
+    dedicated writer thread and return a ``Future`` instead of the result.
     """
 
-    def __init__(self, db_name="modules.db"):
+    def __init__(self, db_name="modules.db", busy_timeout_ms=5000, write_behind=False, cache_max_modules=16):
         """
-        Initializes the database connection and tables.
+        Initializes the connection manager, applies the connection pragmas and migrates the schema.
 
         Args:
             db_name (str): The database file name.
+            busy_timeout_ms (int): How long to wait for a lock held by another connection.
+            write_behind (bool): If True, mutations are applied asynchronously in batched transactions.
+            cache_max_modules (int): How many modules' flashcard lists the in-memory cache keeps.
         """
-        self.connection = sqlite3.connect(db_name)
-        self.cursor = self.connection.cursor()
-        self.create_modules_table()
-        self.create_flashcards_table()
+        self.connections = ConnectionManager(
+            db_name,
+            configure=partial(self.configure_connection, busy_timeout_ms=busy_timeout_ms)
+        )
+        with self.connections.writer() as connection:
+            apply_migrations(connection)
+            self._change_seq = self._read_change_seq(connection)  # Latest committed change-feed entry
+        self._change_seq_lock = threading.Lock()
+        self.prune_flashcard_changes()
+        self.write_queue = WriteBehindQueue(self.connections) if write_behind else None
+        self.flashcard_identity_map = IdentityMap()  # Recently looked-up flashcards by ID
+        self.cache = CacheService(max_modules=cache_max_modules)  # Module list and per-module flashcard lists
 
-    def create_modules_table(self):
+    @staticmethod
+    def configure_connection(connection, busy_timeout_ms=5000):
         """
-        Creates the modules table if it does not exist.
+        Applies the pragmas every connection to the database needs.
+
+        WAL lets readers run alongside the writer, ``synchronous=NORMAL`` is durable in WAL
+        mode without an fsync per commit, and ``foreign_keys=ON`` makes the
+        ``ON DELETE CASCADE`` of the flashcards table actually take effect.
+
+        Args:
+            connection (sqlite3.Connection): The connection to configure.
+            busy_timeout_ms (int): How long to wait for a lock held by another connection.
         """
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS modules (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL
-            )
-        ''')
-        self.connection.commit()
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("PRAGMA synchronous = NORMAL")
+        connection.execute("PRAGMA foreign_keys = ON")
+        connection.execute(f"PRAGMA busy_timeout = {int(busy_timeout_ms)}")
 
-    def create_flashcards_table(self):
+    def _write(self, operation, on_written=None):
         """
-        Creates the flashcards table if it does not exist.
+        Runs a mutation either immediately in its own transaction or through the write-behind queue.
+
+        The change-feed sequence number is read inside the same transaction and kept in memory once
+        the mutation is committed, so ``get_change_seq`` never has to query the database.
+
+        Args:
+            operation (callable): Called with the writer connection inside a transaction.
+            on_written (callable, optional): Called with the operation's result once it has been
+                committed, to bring the caches up to date.
+
+        Returns:
+            The operation's result, or a ``Future`` resolving to it in write-behind mode.
         """
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS flashcards (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                module_id INTEGER NOT NULL,
-                question TEXT NOT NULL,
-                answer TEXT NOT NULL,
-                FOREIGN KEY (module_id) REFERENCES modules(id) ON DELETE CASCADE
-            )
-        ''')
-        self.connection.commit()
+        change_seq = 0
+
+        def run(connection):
+            nonlocal change_seq
+            result = operation(connection)
+            change_seq = self._read_change_seq(connection)
+            return result
+
+        def written(result):
+            with self._change_seq_lock:
+                self._change_seq = max(self._change_seq, change_seq)
+            if on_written:
+                on_written(result)
+
+        if self.write_queue:
+            def callback(future):
+                if future.exception() is None:
+                    written(future.result())
+
+            return self.write_queue.submit(run, callback=callback)
+
+        with self.connections.transaction() as connection:
+            result = run(connection)
+        written(result)
+        return result
+
+    def flush(self, timeout=None):
+        """
+        Waits until all queued mutations have been written. Does nothing without write-behind mode.
+
+        Args:
+            timeout (float, optional): The maximum time to wait in seconds; waits indefinitely if None.
+
+        Returns:
+            bool: True if all mutations were written, False if the timeout expired first.
+        """
+        if self.write_queue:
+            return self.write_queue.flush(timeout)
+        return True
+
+    def _select(self, row_factory, sql, parameters=()):
+        """
+        Runs a query on the calling thread's reader connection and builds the model objects
+        directly in the cursor's ``row_factory``.
+
+        Args:
+            row_factory (callable): Called by sqlite3 with (cursor, row) for every row.
+            sql (str): The SELECT statement.
+            parameters (tuple): The statement parameters.
+
+        Returns:
+            list: One object per row, as built by ``row_factory``.
+        """
+        with self.connections.read() as connection:
+            cursor = connection.cursor()
+            cursor.row_factory = row_factory
+            return cursor.execute(sql, parameters).fetchall()
 
     def get_all_modules(self):
         """
@@ -52,9 +179,12 @@ class DatabaseService:
         Returns:
             List[Module]: A list of Module objects.
         """
-        self.cursor.execute("SELECT * FROM modules")
-        rows = self.cursor.fetchall()
-        return [Module(*row) for row in rows]
+        modules = self.cache.get_modules()
+        if modules is None:
+            generation = self.cache.generation
+            modules = self._select(Module.from_row, f"SELECT {MODULE_COLUMNS} FROM modules")
+            self.cache.put_modules(modules, generation)
+        return modules
 
     def add_module(self, module_name):
         """
@@ -62,24 +192,132 @@ class DatabaseService:
 
         Args:
             module_name (str): The name of the module.
+
+        Returns:
+            int: The ID of the new module (a ``Future`` of it in write-behind mode).
+        """
+        def insert(connection):
+            return connection.execute("INSERT INTO modules (name) VALUES (?)", (module_name,)).lastrowid
+
+        return self._write(insert, lambda module_id: self.cache.module_added(Module(module_id, module_name)))
+
+    @staticmethod
+    def _insert_flashcards(connection, module_id, flashcards, on_duplicate):
         """
-        self.cursor.execute("INSERT INTO modules (name) VALUES (?)", (module_name,))
-        self.connection.commit()
+        Inserts flashcards, resolving duplicates within the module by their content hash.
 
-    def add_flashcard(self, module_id, question, answer):
+        Args:
+            connection (sqlite3.Connection): The writer connection inside a transaction.
+            module_id (int): The ID of the module.
+            flashcards (Iterable[tuple[str, str]]): (question, answer) pairs to insert.
+            on_duplicate (str): ``ON_DUPLICATE_SKIP``, ``ON_DUPLICATE_UPDATE`` or ``ON_DUPLICATE_ERROR``.
+
+        Returns:
+            List[int]: The IDs of the inserted flashcards in insertion order.
+        """
+        # AUTOINCREMENT IDs are always larger than sqlite_sequence, and the write lock keeps other
+        # writers out, so every flashcard above the current sequence value is one of ours
+        row = connection.execute("SELECT seq FROM sqlite_sequence WHERE name = 'flashcards'").fetchone()
+        last_existing_id = row[0] if row else 0
+        connection.executemany(
+            _INSERT_FLASHCARD_SQL[on_duplicate],
+            ((module_id, question, answer, flashcard_content_hash(question, answer)) for question, answer in flashcards)
+        )
+        return [row[0] for row in connection.execute(
+            "SELECT id FROM flashcards WHERE id > ? ORDER BY id", (last_existing_id,)
+        )]
+
+    def add_flashcard(self, module_id, question, answer, on_duplicate=ON_DUPLICATE_SKIP):
         """
         Adds a flashcard to a specific module.
 
+        A flashcard whose normalized question and answer already exist in the module is a
+        duplicate; ``on_duplicate`` decides whether it is skipped, overwrites the existing
+        flashcard or raises ``sqlite3.IntegrityError``.
+
         Args:
             module_id (int): The ID of the module.
             question (str): The question text.
             answer (str): The answer text.
+            on_duplicate (str): ``ON_DUPLICATE_SKIP`` (default), ``ON_DUPLICATE_UPDATE`` or ``ON_DUPLICATE_ERROR``.
+
+        Returns:
+            int: The ID of the new flashcard, or of the existing one for a duplicate (a ``Future``
+            of it in write-behind mode).
         """
-        self.cursor.execute(
-            "INSERT INTO flashcards (module_id, question, answer) VALUES (?, ?, ?)",
-            (module_id, question, answer)
-        )
-        self.connection.commit()
+        inserted = []  # Set by the insert, read once it is committed
+
+        def insert(connection):
+            inserted_ids = self._insert_flashcards(connection, module_id, [(question, answer)], on_duplicate)
+            if inserted_ids:
+                inserted.extend(inserted_ids)
+                return inserted_ids[0]
+            return connection.execute(
+                "SELECT id FROM flashcards WHERE module_id = ? AND content_hash = ?",
+                (module_id, flashcard_content_hash(question, answer))
+            ).fetchone()[0]
+
+        def on_written(flashcard_id):
+            if inserted:
+                self.cache.flashcards_added(module_id, [(flashcard_id, question, answer)])
+            elif on_duplicate == ON_DUPLICATE_UPDATE:
+                self.flashcard_identity_map.discard(flashcard_id)
+                self.cache.flashcard_updated(flashcard_id, question, answer)
+
+        return self._write(insert, on_written)
+
+    def add_flashcards(self, module_id, flashcards, on_duplicate=ON_DUPLICATE_SKIP):
+        """
+        Adds many flashcards to a specific module in a single transaction.
+
+        The rows are streamed into ``executemany``, so the whole batch costs one commit
+        instead of one per flashcard and the iterable is never materialized. Duplicates of
+        flashcards already in the module, or earlier in the batch, are handled as in ``add_flashcard``.
+
+        Args:
+            module_id (int): The ID of the module.
+            flashcards (Iterable[tuple[str, str]]): (question, answer) pairs to insert.
+            on_duplicate (str): ``ON_DUPLICATE_SKIP`` (default), ``ON_DUPLICATE_UPDATE`` or ``ON_DUPLICATE_ERROR``.
+
+        Returns:
+            List[int]: The IDs of the newly inserted flashcards in insertion order; duplicates are
+            not included (a ``Future`` of them in write-behind mode).
+        """
+        def insert(connection):
+            return self._insert_flashcards(connection, module_id, flashcards, on_duplicate)
+
+        def on_written(ids):
+            if on_duplicate == ON_DUPLICATE_UPDATE:
+                self._discard_module_flashcards(module_id)  # Which existing flashcards were overwritten is not known
+            # The rows were streamed, so the cache drops the module's list instead of patching it
+            self.cache.module_flashcards_changed(module_id, added=len(ids))
+
+        return self._write(insert, on_written)
+
+    def get_flashcard(self, flashcard_id):
+        """
+        Retrieves a single flashcard by its primary key.
+
+        Repeated lookups of the same flashcard are served from a small identity map that is
+        invalidated by every mutation touching the flashcard.
+
+        Args:
+            flashcard_id (int): The ID of the flashcard.
+
+        Returns:
+            Flashcard or None: The flashcard, or None if it does not exist.
+        """
+        flashcard = self.flashcard_identity_map.get(flashcard_id)
+        if flashcard is not None:
+            return flashcard
+
+        generation = self.flashcard_identity_map.generation
+        rows = self._select(Flashcard.from_row, f"SELECT {FLASHCARD_COLUMNS} FROM flashcards WHERE id = ?", (flashcard_id,))
+        if not rows:
+            return None
+        flashcard = rows[0]
+        self.flashcard_identity_map.put(flashcard_id, flashcard, generation)
+        return flashcard
 
     def get_flashcards_by_module(self, module_id):
         """
@@ -91,27 +329,676 @@ class DatabaseService:
         Returns:
             List[Flashcard]: A list of Flashcard objects.
         """
-        self.cursor.execute(
-            "SELECT * FROM flashcards WHERE module_id = ?",
+        return self._select(
+            Flashcard.from_row,
+            f"SELECT {FLASHCARD_COLUMNS} FROM flashcards WHERE module_id = ?",
             (module_id,)
         )
-        rows = self.cursor.fetchall()
-        return [Flashcard(*row) for row in rows]
+
+    def get_flashcard_page(self, module_id, after_id=0, page_size=500):
+        """
+        Retrieves one page of a module's flashcards using keyset pagination.
+
+        Seeking past ``after_id`` on the module index costs the same for the first and the last
+        page, unlike ``OFFSET`` which rescans all skipped rows.
+
+        Args:
+            module_id (int): The ID of the module.
+            after_id (int): Only flashcards with a larger ID are returned. Defaults to 0.
+            page_size (int): The maximum number of flashcards to return.
+
+        Returns:
+            List[Flashcard]: Up to ``page_size`` flashcards ordered by ID.
+        """
+        return self._select(
+            Flashcard.from_row,
+            f"SELECT {FLASHCARD_COLUMNS} FROM flashcards WHERE module_id = ? AND id > ? ORDER BY id LIMIT ?",
+            (module_id, after_id, page_size)
+        )
+
+    def get_flashcard_previews(self, module_id, after_id=0, page_size=200, question_length=100, answer_length=200):
+        """
+        Retrieves one keyset page of flashcard previews for list views.
+
+        Only the ID and the leading characters of question and answer are read, so long answer
+        texts are never copied out of SQLite for rows that only show a truncated line.
+
+        Args:
+            module_id (int): The ID of the module.
+            after_id (int): Only flashcards with a larger ID are returned. Defaults to 0.
+            page_size (int): The maximum number of previews to return.
+            question_length (int): The number of leading question characters to fetch.
+            answer_length (int): The number of leading answer characters to fetch.
+
+        Returns:
+            List[FlashcardPreview]: Up to ``page_size`` previews ordered by ID.
+        """
+        previews = self.cache.get_previews(module_id, after_id, page_size, question_length, answer_length)
+        if previews is not None:
+            return previews
+
+        generation = self.cache.generation
+        previews = self._select(
+            FlashcardPreview.from_row,
+            "SELECT id, substr(question, 1, ?), substr(answer, 1, ?) FROM flashcards "
+            "WHERE module_id = ? AND id > ? ORDER BY id LIMIT ?",
+            (question_length, answer_length, module_id, after_id, page_size)
+        )
+        self.cache.put_previews(module_id, after_id, page_size, question_length, answer_length, previews, generation)
+        return previews
+
+    def iter_flashcards(self, module_id, after_id=0, page_size=500):
+        """
+        Lazily iterates over a module's flashcards, holding at most one page in memory.
+
+        Args:
+            module_id (int): The ID of the module.
+            after_id (int): Iteration starts after this flashcard ID. Defaults to 0.
+            page_size (int): The number of flashcards fetched per query.
+
+        Yields:
+            Flashcard: The module's flashcards ordered by ID.
+        """
+        while True:
+            page = self.get_flashcard_page(module_id, after_id, page_size)
+            yield from page
+            if len(page) < page_size:
+                return
+            after_id = page[-1].id
+
+    def get_change_seq(self):
+        """
+        Returns the sequence number of the latest committed change in the flashcard change feed.
+
+        The number is tracked in memory by the write paths, so this does not touch the database.
+
+        Returns:
+            int: The latest sequence number, 0 if no flashcard was ever changed.
+        """
+        with self._change_seq_lock:
+            return self._change_seq
+
+    @staticmethod
+    def _read_change_seq(connection):
+        """
+        Reads the sequence number of the latest change in the flashcard change feed.
+
+        Args:
+            connection (sqlite3.Connection): The connection to read with.
+
+        Returns:
+            int: The latest sequence number, 0 if no flashcard was ever changed.
+        """
+        row = connection.execute("SELECT seq FROM sqlite_sequence WHERE name = 'flashcard_changes'").fetchone()
+        return row[0] if row else 0
+
+    def get_flashcard_changes(self, module_id, since_seq, limit=500, question_length=100, answer_length=200):
+        """
+        Retrieves the flashcards of a module that changed after a change-feed sequence number.
+
+        Several changes of the same flashcard are collapsed into its current state, so the result
+        can be applied to a list view as inserts, updates and deletes.
+
+        Args:
+            module_id (int): The ID of the module.
+            since_seq (int): The last sequence number the caller has seen.
+            limit (int): The maximum number of changed flashcards; beyond it a full reload is cheaper.
+            question_length (int): The number of leading question characters to fetch.
+            answer_length (int): The number of leading answer characters to fetch.
+
+        Returns:
+            tuple[int, List[FlashcardChange]] or None: The latest sequence number and the changed
+            flashcards ordered by ID, or None if the feed no longer reaches back to ``since_seq``
+            or more than ``limit`` flashcards changed.
+        """
+        with self.connections.read() as connection:
+            connection.execute("BEGIN")  # Read the sequence number and the changes from one snapshot
+            try:
+                latest_seq = self._read_change_seq(connection)
+                if latest_seq <= since_seq:
+                    return latest_seq, []
+
+                # Sequence numbers have no gaps, so the feed is complete if it reaches since_seq + 1
+                oldest_seq = connection.execute("SELECT MIN(seq) FROM flashcard_changes").fetchone()[0]
+                if oldest_seq is None or oldest_seq > since_seq + 1:
+                    return None
+
+                cursor = connection.cursor()
+                cursor.row_factory = FlashcardChange.from_row
+                changes = cursor.execute('''
+                    SELECT MAX(changes.seq), changes.flashcard_id,
+                           substr(flashcards.question, 1, ?), substr(flashcards.answer, 1, ?)
+                    FROM flashcard_changes AS changes
+                    LEFT JOIN flashcards ON flashcards.id = changes.flashcard_id AND flashcards.module_id = changes.module_id
+                    WHERE changes.module_id = ? AND changes.seq > ?
+                    GROUP BY changes.flashcard_id
+                    ORDER BY changes.flashcard_id
+                    LIMIT ?
+                ''', (question_length, answer_length, module_id, since_seq, limit + 1)).fetchall()
+            finally:
+                connection.execute("COMMIT")
+
+        if len(changes) > limit:
+            return None
+        return latest_seq, changes
+
+    def prune_flashcard_changes(self, keep=CHANGE_FEED_RETENTION):
+        """
+        Deletes all but the most recent entries of the flashcard change feed.
+
+        Views that last synchronized before the pruned entries have to reload completely.
+
+        Args:
+            keep (int): The number of most recent entries to keep.
+        """
+        with self.connections.transaction() as connection:
+            connection.execute('''
+                DELETE FROM flashcard_changes
+                WHERE seq <= (SELECT seq FROM sqlite_sequence WHERE name = 'flashcard_changes') - ?
+            ''', (keep,))
+
+    def has_flashcards(self, module_id):
+        """
+        Checks whether a module has at least one flashcard.
+
+        Args:
+            module_id (int): The ID of the module.
+
+        Returns:
+            bool: True if the module has flashcards, otherwise False.
+        """
+        with self.connections.read() as connection:
+            row = connection.execute(
+                "SELECT EXISTS (SELECT 1 FROM flashcards WHERE module_id = ? LIMIT 1)",
+                (module_id,)
+            ).fetchone()
+        return bool(row[0])
+
+    def count_flashcards(self, module_id):
+        """
+        Counts the flashcards of a module using the module index.
+
+        Args:
+            module_id (int): The ID of the module.
+
+        Returns:
+            int: The number of flashcards in the module.
+        """
+        with self.connections.read() as connection:
+            row = connection.execute(
+                "SELECT COUNT(*) FROM flashcards WHERE module_id = ?",
+                (module_id,)
+            ).fetchone()
+        return row[0]
+
+    def module_stats(self):
+        """
+        Retrieves the flashcard count of every module in one grouped query.
+
+        Returns:
+            dict[int, int]: Maps each module ID to its number of flashcards (0 for empty modules).
+        """
+        counts = self.cache.get_flashcard_counts()
+        if counts is not None:
+            return counts
+
+        generation = self.cache.generation
+        with self.connections.read() as connection:
+            rows = connection.execute('''
+                SELECT modules.id, COUNT(flashcards.id)
+                FROM modules
+                LEFT JOIN flashcards ON flashcards.module_id = modules.id
+                GROUP BY modules.id
+            ''').fetchall()
+        counts = dict(rows)
+        self.cache.put_flashcard_counts(counts, generation)
+        return counts
+
+    @staticmethod
+    def build_search_query(query):
+        """
+        Turns free text typed by the user into a safe FTS5 query.
+
+        Every word is quoted, so characters with a meaning in the FTS5 syntax are matched
+        literally, and becomes a prefix search, so results appear while the user is still typing.
+
+        Args:
+            query (str): The text typed by the user.
+
+        Returns:
+            str: The FTS5 MATCH expression, or an empty string if the text contains no words.
+        """
+        return " ".join('"' + term.replace('"', '""') + '"*' for term in query.split())
+
+    def search(self, query, module_id=None, limit=50):
+        """
+        Searches the questions and answers of all flashcards with the full-text index.
+
+        Args:
+            query (str): The search text; every word must match, as a prefix.
+            module_id (int, optional): Restricts the search to one module. Defaults to all modules.
+            limit (int): The maximum number of results.
+
+        Returns:
+            List[FlashcardSearchResult]: The best matches first, with the matched terms wrapped in
+            ``[`` and ``]``.
+        """
+        match = self.build_search_query(query)
+        if not match:
+            return []
+        return self._select(FlashcardSearchResult.from_row, '''
+                SELECT flashcards.id,
+                       flashcards.module_id,
+                       highlight(flashcards_fts, 0, '[', ']'),
+                       snippet(flashcards_fts, 1, '[', ']', '...', 16),
+                       bm25(flashcards_fts)
+                FROM flashcards_fts
+                JOIN flashcards ON flashcards.id = flashcards_fts.rowid
+                WHERE flashcards_fts MATCH ?
+                  AND (? IS NULL OR flashcards.module_id = ?)
+                ORDER BY bm25(flashcards_fts)
+                LIMIT ?
+            ''', (match, module_id, module_id, limit))
+
+    def get_due_flashcards(self, module_id, due_before, after_due_at=float("-inf"), after_id=0, limit=100):
+        """
+        Retrieves one keyset page of a module's due flashcards, ordered by due time.
+
+        The query walks the ``(module_id, due_at)`` index of ``review_state`` and stops after
+        ``limit`` rows, so the cost does not depend on the size of the module.
+
+        Args:
+            module_id (int): The ID of the module.
+            due_before (float): Only flashcards due up to this Unix timestamp are returned.
+            after_due_at (float): The due time of the last row of the previous page.
+            after_id (int): The flashcard ID of the last row of the previous page.
+            limit (int): The maximum number of flashcards to return.
+
+        Returns:
+            list[tuple[float, Flashcard]]: (due_at, flashcard) pairs ordered by due time and ID.
+        """
+        return self._select(
+            lambda cursor, row: (row[0], Flashcard(*row[1:])),
+            '''
+                SELECT review_state.due_at, flashcards.id, flashcards.module_id, flashcards.question, flashcards.answer
+                FROM review_state
+                JOIN flashcards ON flashcards.id = review_state.flashcard_id
+                WHERE review_state.module_id = ? AND review_state.due_at <= ?
+                  AND (review_state.due_at, review_state.flashcard_id) > (?, ?)
+                ORDER BY review_state.due_at, review_state.flashcard_id
+                LIMIT ?
+            ''',
+            (module_id, due_before, after_due_at, after_id, limit)
+        )
+
+    def count_due_flashcards(self, module_id, due_before):
+        """
+        Counts a module's flashcards that are due.
+
+        Args:
+            module_id (int): The ID of the module.
+            due_before (float): Flashcards due up to this Unix timestamp are counted.
+
+        Returns:
+            int: The number of due flashcards.
+        """
+        with self.connections.read() as connection:
+            return connection.execute(
+                "SELECT COUNT(*) FROM review_state WHERE module_id = ? AND due_at <= ?",
+                (module_id, due_before)
+            ).fetchone()[0]
+
+    def get_review_state(self, flashcard_id):
+        """
+        Retrieves the spaced-repetition state of a flashcard.
+
+        Args:
+            flashcard_id (int): The ID of the flashcard.
+
+        Returns:
+            ReviewState or None: The state, or None if the flashcard does not exist.
+        """
+        rows = self._select(
+            ReviewState.from_row,
+            f"SELECT {REVIEW_STATE_COLUMNS} FROM review_state WHERE flashcard_id = ?",
+            (flashcard_id,)
+        )
+        return rows[0] if rows else None
+
+    def record_review(self, flashcard_id, rating, reviewed_at=None):
+        """
+        Updates the spaced-repetition state of a flashcard after a review.
+
+        Args:
+            flashcard_id (int): The ID of the reviewed flashcard.
+            rating (int): The quality of the answer on the SM-2 scale from 0 to 5.
+            reviewed_at (float, optional): The time of the review as a Unix timestamp. Defaults to now.
+
+        Returns:
+            ReviewState or None: The new state (a ``Future`` of it in write-behind mode), or None
+            if the flashcard no longer exists.
+        """
+        def review(connection):
+            cursor = connection.cursor()
+            cursor.row_factory = ReviewState.from_row
+            state = cursor.execute(
+                f"SELECT {REVIEW_STATE_COLUMNS} FROM review_state WHERE flashcard_id = ?", (flashcard_id,)
+            ).fetchone()
+            if state is None:
+                return None
+            state = schedule_review(state, rating, reviewed_at)
+            connection.execute(
+                "UPDATE review_state SET due_at = ?, ease = ?, interval_days = ?, repetitions = ?, lapses = ?, "
+                "last_reviewed_at = ? WHERE flashcard_id = ?",
+                (state.due_at, state.ease, state.interval_days, state.repetitions, state.lapses,
+                 state.last_reviewed_at, flashcard_id)
+            )
+            return state
+
+        return self._write(review)
+
+    def add_review_events(self, events):
+        """
+        Appends answers to the review log and adds them to the review statistics in one transaction.
+
+        The events are summed up per flashcard and per module first, so the statistics tables get
+        one upsert per flashcard and module instead of one per event. Answers whose module was
+        deleted since they were given are dropped, so they cannot fail the batch on the foreign key.
+
+        Args:
+            events (List[ReviewEvent]): The answers to record.
+
+        Returns:
+            int: The number of logged events (a ``Future`` of it in write-behind mode).
+        """
+        events = list(events)
+        card_totals = self._sum_review_events(events, lambda event: event.flashcard_id)
+        module_totals = self._sum_review_events(events, lambda event: event.module_id)
+
+        def append(connection):
+            # Flashcards and modules deleted since the answer are skipped by the SELECT
+            logged = connection.executemany(
+                "INSERT INTO review_log (flashcard_id, module_id, mode, rating, latency_ms, attempt, reviewed_at) "
+                "SELECT ?, id, ?, ?, ?, ?, ? FROM modules WHERE id = ?",
+                [(event.flashcard_id, event.mode, event.rating, event.latency_ms, event.attempt, event.reviewed_at,
+                  event.module_id) for event in events]
+            ).rowcount
+            for table, key, parent, totals in (
+                    ("card_review_stats", "flashcard_id", "flashcards", card_totals),
+                    ("module_review_stats", "module_id", "modules", module_totals)):
+                connection.executemany(f'''
+                    INSERT INTO {table} ({key}, {REVIEW_STATS_COLUMNS})
+                    SELECT id, ?, ?, ?, ?, ? FROM {parent} WHERE id = ?
+                    ON CONFLICT ({key}) DO UPDATE SET
+                        reviews = reviews + excluded.reviews,
+                        correct = correct + excluded.correct,
+                        total_latency_ms = total_latency_ms + excluded.total_latency_ms,
+                        last_rating = CASE WHEN excluded.last_reviewed_at >= last_reviewed_at
+                                           THEN excluded.last_rating ELSE last_rating END,
+                        last_reviewed_at = max(last_reviewed_at, excluded.last_reviewed_at)
+                ''', [(*stats, key_id) for key_id, stats in totals.items()])
+            return logged
+
+        return self._write(append)
+
+    @staticmethod
+    def _sum_review_events(events, key):
+        """
+        Sums up review events per key.
+
+        Args:
+            events (List[ReviewEvent]): The events to sum up.
+            key (callable): Returns the grouping key of an event.
+
+        Returns:
+            dict: Key -> ReviewStats of the events with that key.
+        """
+        totals = {}
+        for event in events:
+            current = totals.get(key(event), ReviewStats(0, 0, 0, None, None))
+            is_latest = current.last_reviewed_at is None or event.reviewed_at >= current.last_reviewed_at
+            totals[key(event)] = ReviewStats(
+                current.reviews + 1,
+                current.correct + (event.rating >= RATING_HARD),
+                current.total_latency_ms + (event.latency_ms or 0),
+                event.rating if is_latest else current.last_rating,
+                event.reviewed_at if is_latest else current.last_reviewed_at
+            )
+        return totals
+
+    def get_card_review_stats(self, flashcard_id):
+        """
+        Retrieves the precomputed review statistics of a flashcard.
+
+        Args:
+            flashcard_id (int): The ID of the flashcard.
+
+        Returns:
+            ReviewStats: The statistics; all zero if the flashcard was never reviewed.
+        """
+        rows = self._select(
+            ReviewStats.from_row,
+            f"SELECT {REVIEW_STATS_COLUMNS} FROM card_review_stats WHERE flashcard_id = ?",
+            (flashcard_id,)
+        )
+        return rows[0] if rows else ReviewStats(0, 0, 0, None, None)
+
+    def get_module_review_stats(self, module_id):
+        """
+        Retrieves the precomputed review statistics of a module.
+
+        Args:
+            module_id (int): The ID of the module.
+
+        Returns:
+            ReviewStats: The statistics; all zero if the module was never studied.
+        """
+        rows = self._select(
+            ReviewStats.from_row,
+            f"SELECT {REVIEW_STATS_COLUMNS} FROM module_review_stats WHERE module_id = ?",
+            (module_id,)
+        )
+        return rows[0] if rows else ReviewStats(0, 0, 0, None, None)
+
+    def add_generation_jobs(self, module_id, texts, use_cache=True):
+        """
+        Queues flashcard generations for a module in a single transaction.
+
+        Args:
+            module_id (int): The ID of the module the flashcards are generated for.
+            texts (Iterable[tuple[str, str]]): (title, source text) pairs, one job each.
+            use_cache (bool): Whether cached API responses may be used for the jobs.
+
+        Returns:
+            List[int]: The IDs of the new jobs (a ``Future`` of them in write-behind mode).
+        """
+        now = time.time()
+        rows = [(module_id, title, source_text, int(use_cache), now, now) for title, source_text in texts]
+
+        def insert(connection):
+            return [
+                connection.execute(
+                    "INSERT INTO generation_jobs (module_id, title, source_text, use_cache, created_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)", row
+                ).lastrowid
+                for row in rows
+            ]
+
+        return self._write(insert)
+
+    def claim_generation_job(self):
+        """
+        Marks the oldest pending generation job as running and returns what is needed to run it.
+
+        The job is read and updated in the same write transaction, so two workers never claim the
+        same job.
+
+        Returns:
+            tuple or None: (job ID, module ID, source text, use cache) of the claimed job, or None
+            if no job is pending (a ``Future`` of it in write-behind mode).
+        """
+        def claim(connection):
+            row = connection.execute(
+                "SELECT id, module_id, source_text, use_cache FROM generation_jobs WHERE status = ? ORDER BY id LIMIT 1",
+                (JOB_PENDING,)
+            ).fetchone()
+            if row is None:
+                return None
+            connection.execute(
+                "UPDATE generation_jobs SET status = ?, updated_at = ? WHERE id = ?", (JOB_RUNNING, time.time(), row[0])
+            )
+            return row[0], row[1], row[2], bool(row[3])
+
+        return self._write(claim)
+
+    def complete_generation_job(self, job_id, flashcards):
+        """
+        Stores the generated flashcards of a running job for review.
+
+        Args:
+            job_id (int): The ID of the job.
+            flashcards (list): The generated flashcards, each a dictionary with 'question' and 'answer'.
+
+        Returns:
+            bool: False if the job no longer exists (a ``Future`` of it in write-behind mode).
+        """
+        data = json.dumps(
+            [{'question': flashcard['question'], 'answer': flashcard['answer']} for flashcard in flashcards],
+            ensure_ascii=False
+        )
+
+        def complete(connection):
+            return connection.execute(
+                "UPDATE generation_jobs SET status = ?, flashcards = ?, flashcard_count = ?, error = NULL, "
+                "updated_at = ? WHERE id = ? AND status = ?",
+                (JOB_DONE, data, len(flashcards), time.time(), job_id, JOB_RUNNING)
+            ).rowcount > 0
+
+        return self._write(complete)
+
+    def fail_generation_job(self, job_id, error):
+        """
+        Marks a running job as failed.
+
+        Args:
+            job_id (int): The ID of the job.
+            error (str): The error message shown in the review inbox.
+
+        Returns:
+            bool: False if the job no longer exists (a ``Future`` of it in write-behind mode).
+        """
+        def fail(connection):
+            return connection.execute(
+                "UPDATE generation_jobs SET status = ?, error = ?, updated_at = ? WHERE id = ? AND status = ?",
+                (JOB_FAILED, error, time.time(), job_id, JOB_RUNNING)
+            ).rowcount > 0
+
+        return self._write(fail)
+
+    def requeue_generation_jobs(self, job_ids=None):
+        """
+        Puts running or failed jobs back into the queue.
+
+        Without IDs every running job is requeued, which resumes the jobs that were interrupted
+        when the application was closed.
+
+        Args:
+            job_ids (list, optional): The IDs of the jobs to requeue.
+
+        Returns:
+            int: The number of requeued jobs (a ``Future`` of it in write-behind mode).
+        """
+        def requeue(connection):
+            now = time.time()
+            if job_ids is None:
+                return connection.execute(
+                    "UPDATE generation_jobs SET status = ?, updated_at = ? WHERE status = ?",
+                    (JOB_PENDING, now, JOB_RUNNING)
+                ).rowcount
+            return connection.executemany(
+                "UPDATE generation_jobs SET status = ?, error = NULL, updated_at = ? WHERE id = ? AND status IN (?, ?)",
+                [(JOB_PENDING, now, job_id, JOB_RUNNING, JOB_FAILED) for job_id in job_ids]
+            ).rowcount
+
+        return self._write(requeue)
+
+    def get_generation_jobs(self):
+        """
+        Retrieves all generation jobs in the order they were queued.
+
+        Returns:
+            List[GenerationJob]: The jobs, without source texts and generated flashcards.
+        """
+        return self._select(
+            GenerationJob.from_row, f"SELECT {GENERATION_JOB_COLUMNS} FROM generation_jobs ORDER BY id"
+        )
+
+    def count_generation_jobs(self):
+        """
+        Counts the generation jobs per status.
+
+        Returns:
+            dict: The number of jobs per status; statuses without jobs are missing.
+        """
+        with self.connections.read() as connection:
+            return dict(connection.execute("SELECT status, COUNT(*) FROM generation_jobs GROUP BY status"))
+
+    def get_generation_job_flashcards(self, job_id):
+        """
+        Retrieves the generated flashcards of a finished job.
+
+        Args:
+            job_id (int): The ID of the job.
+
+        Returns:
+            list: The flashcards, each a dictionary with 'question' and 'answer'; empty if the job
+            does not exist or is not finished.
+        """
+        with self.connections.read() as connection:
+            row = connection.execute("SELECT flashcards FROM generation_jobs WHERE id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row and row[0] else []
+
+    def delete_generation_job(self, job_id):
+        """
+        Deletes a generation job, e.g. after its flashcards were reviewed.
+
+        Args:
+            job_id (int): The ID of the job.
+
+        Returns:
+            Future or None: A ``Future`` in write-behind mode, otherwise None.
+        """
+        def delete(connection):
+            connection.execute("DELETE FROM generation_jobs WHERE id = ?", (job_id,))
+
+        return self._write(delete)
 
     def update_flashcard(self, flashcard_id, question, answer):
         """
         Updates a specific flashcard.
 
+        The update fails with ``sqlite3.IntegrityError`` if the new texts duplicate another
+        flashcard of the same module.
+
         Args:
             flashcard_id (int): The ID of the flashcard to update.
             question (str): The updated question text.
             answer (str): The updated answer text.
+
+        Returns:
+            Future or None: A ``Future`` in write-behind mode, otherwise None.
         """
-        self.cursor.execute(
-            "UPDATE flashcards SET question = ?, answer = ? WHERE id = ?",
-            (question, answer, flashcard_id)
-        )
-        self.connection.commit()
+        def update(connection):
+            connection.execute(
+                "UPDATE flashcards SET question = ?, answer = ?, content_hash = ? WHERE id = ?",
+                (question, answer, flashcard_content_hash(question, answer), flashcard_id)
+            )
+
+        def on_written(_):
+            self.flashcard_identity_map.discard(flashcard_id)
+            self.cache.flashcard_updated(flashcard_id, question, answer)
+
+        return self._write(update, on_written)
 
     def delete_module_with_flashcards(self, module_id):
         """
@@ -119,10 +1006,19 @@ class DatabaseService:
 
         Args:
             module_id (int): The ID of the module to delete.
+
+        Returns:
+            Future or None: A ``Future`` in write-behind mode, otherwise None.
         """
-        self.cursor.execute("DELETE FROM flashcards WHERE module_id = ?", (module_id,))
-        self.cursor.execute("DELETE FROM modules WHERE id = ?", (module_id,))
-        self.connection.commit()
+        def delete(connection):
+            connection.execute("DELETE FROM flashcards WHERE module_id = ?", (module_id,))
+            connection.execute("DELETE FROM modules WHERE id = ?", (module_id,))
+
+        def on_written(_):
+            self._discard_module_flashcards(module_id)
+            self.cache.module_deleted(module_id)
+
+        return self._write(delete, on_written)
 
     def delete_flashcards_by_module(self, module_id):
         """
@@ -130,9 +1026,18 @@ class DatabaseService:
 
         Args:
             module_id (int): The ID of the module.
+
+        Returns:
+            Future or None: A ``Future`` in write-behind mode, otherwise None.
         """
-        self.cursor.execute("DELETE FROM flashcards WHERE module_id = ?", (module_id,))
-        self.connection.commit()
+        def delete(connection):
+            connection.execute("DELETE FROM flashcards WHERE module_id = ?", (module_id,))
+
+        def on_written(_):
+            self._discard_module_flashcards(module_id)
+            self.cache.module_flashcards_deleted(module_id)
+
+        return self._write(delete, on_written)
 
     def delete_flashcard(self, flashcard_id):
         """
@@ -140,12 +1045,61 @@ class DatabaseService:
 
         Args:
             flashcard_id (int): The ID of the flashcard to delete.
+
+        Returns:
+            Future or None: A ``Future`` in write-behind mode, otherwise None.
+        """
+        def delete(connection):
+            connection.execute("DELETE FROM flashcards WHERE id = ?", (flashcard_id,))
+
+        def on_written(_):
+            self.flashcard_identity_map.discard(flashcard_id)
+            self.cache.flashcards_deleted([flashcard_id])
+
+        return self._write(delete, on_written)
+
+    def delete_flashcards(self, flashcard_ids):
+        """
+        Deletes many flashcards in a single transaction.
+
+        The IDs are deleted with ``DELETE ... WHERE id IN (...)`` in chunks that stay below
+        SQLite's limit on bound variables.
+
+        Args:
+            flashcard_ids (Iterable[int]): The IDs of the flashcards to delete.
+
+        Returns:
+            int: The number of deleted flashcards (a ``Future`` of it in write-behind mode).
+        """
+        flashcard_ids = list(flashcard_ids)
+
+        def delete(connection):
+            deleted = 0
+            for start in range(0, len(flashcard_ids), MAX_IN_CLAUSE_VARIABLES):
+                chunk = flashcard_ids[start:start + MAX_IN_CLAUSE_VARIABLES]
+                placeholders = ", ".join("?" * len(chunk))
+                deleted += connection.execute(f"DELETE FROM flashcards WHERE id IN ({placeholders})", chunk).rowcount
+            return deleted
+
+        def on_written(_):
+            self.flashcard_identity_map.discard(*flashcard_ids)
+            self.cache.flashcards_deleted(flashcard_ids)
+
+        return self._write(delete, on_written)
+
+    def _discard_module_flashcards(self, module_id):
+        """
+        Drops all flashcards of a module from the identity map.
+
+        Args:
+            module_id (int): The ID of the module.
         """
-        self.cursor.execute("DELETE FROM flashcards WHERE id = ?", (flashcard_id,))
-        self.connection.commit()
+        self.flashcard_identity_map.discard_where(lambda flashcard: flashcard.module_id == module_id)
 
     def close_connection(self):
         """
-        Closes the database connection.
+        Closes all database connections after writing any queued mutations.
         """
-        self.connection.close()
+        if self.write_queue:
+            self.write_queue.close()
+        self.connections.close()
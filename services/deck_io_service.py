@@ -0,0 +1,414 @@
+import csv
+import hashlib
+import html
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import time
+import zipfile
+from concurrent.futures import Future
+from itertools import islice
+
+
+class DeckIOService:
+    """
+    Streams flashcards of a module to and from files.
+
+    Supported formats are CSV, JSON Lines and Anki packages (``.apkg``). Every format is read
+    and written row by row: exports page through the module with keyset pagination and imports
+    insert in batched transactions, so memory use does not grow with the size of the deck.
+    """
+
+    FORMATS = ("csv", "jsonl", "apkg")
+
+    def __init__(self, db_service, batch_size=1000):
+        """
+        Initializes the service.
+
+        Args:
+            db_service (DatabaseService): The database service to read from and write to.
+            batch_size (int): The number of flashcards inserted per transaction during imports.
+        """
+        self.db_service = db_service
+        self.batch_size = batch_size
+
+    @classmethod
+    def detect_format(cls, path):
+        """
+        Determines the file format from the file extension.
+
+        Args:
+            path (str): The file path.
+
+        Returns:
+            str: One of ``FORMATS``.
+
+        Raises:
+            ValueError: If the extension does not belong to a supported format.
+        """
+        file_format = os.path.splitext(path)[1].lower().lstrip(".")
+        if file_format not in cls.FORMATS:
+            raise ValueError(f"Nicht unterstütztes Dateiformat: '{file_format}'. Erlaubt sind CSV, JSONL und APKG.")
+        return file_format
+
+    def export_module(self, module, path, progress=None):
+        """
+        Writes all flashcards of a module to a file.
+
+        Args:
+            module (Module): The module to export.
+            path (str): The target file; its extension selects the format.
+            progress (callable, optional): Called with (exported, total) after every page.
+
+        Returns:
+            int: The number of exported flashcards.
+        """
+        file_format = self.detect_format(path)
+        total = self.db_service.count_flashcards(module.id)
+        exported = 0
+
+        def flashcards():
+            nonlocal exported
+            for flashcard in self.db_service.iter_flashcards(module.id):
+                yield flashcard.question, flashcard.answer
+                exported += 1
+                if progress and exported % self.batch_size == 0:
+                    progress(exported, total)
+
+        if file_format == "csv":
+            self._write_csv(path, flashcards())
+        elif file_format == "jsonl":
+            self._write_jsonl(path, flashcards())
+        else:
+            self._write_apkg(path, module.name, flashcards())
+
+        if progress:
+            progress(exported, total)
+        return exported
+
+    def import_module(self, module, path, progress=None):
+        """
+        Reads flashcards from a file and adds them to a module in batched transactions.
+        Flashcards that already exist in the module are skipped.
+
+        Args:
+            module (Module): The module that receives the flashcards.
+            path (str): The source file; its extension selects the format.
+            progress (callable, optional): Called with (read, None) after every batch.
+
+        Returns:
+            int: The number of imported flashcards, without skipped duplicates.
+        """
+        file_format = self.detect_format(path)
+        if file_format == "csv":
+            flashcards = self._read_csv(path)
+        elif file_format == "jsonl":
+            flashcards = self._read_jsonl(path)
+        else:
+            flashcards = self._read_apkg(path)
+
+        read = imported = 0
+        while True:
+            batch = list(islice(flashcards, self.batch_size))
+            if not batch:
+                break
+            inserted_ids = self.db_service.add_flashcards(module.id, batch)
+            if isinstance(inserted_ids, Future):
+                inserted_ids = inserted_ids.result()  # Wait for the batch, so the write-behind queue stays bounded
+            read += len(batch)
+            imported += len(inserted_ids)
+            if progress:
+                progress(read, None)
+        return imported
+
+    # CSV: a header row "question,answer" followed by one flashcard per row
+
+    @staticmethod
+    def _write_csv(path, flashcards):
+        """
+        Writes flashcards to a CSV file with a header row.
+
+        Args:
+            path (str): The target file.
+            flashcards (Iterable[tuple[str, str]]): (question, answer) pairs to write.
+        """
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(("question", "answer"))
+            writer.writerows(flashcards)
+
+    @staticmethod
+    def _read_csv(path):
+        """
+        Reads flashcards from a CSV file. An English or German header row and rows with an empty
+        question or answer are skipped.
+
+        Args:
+            path (str): The source file.
+
+        Yields:
+            tuple[str, str]: The (question, answer) pair of each row.
+        """
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            reader = csv.reader(f)
+            for row in reader:
+                if len(row) < 2:
+                    continue
+                question, answer = row[0].strip(), row[1].strip()
+                if reader.line_num == 1 and (question.lower(), answer.lower()) in (("question", "answer"), ("frage", "antwort")):
+                    continue  # Header row
+                if question and answer:
+                    yield question, answer
+
+    # JSON Lines: one {"question": ..., "answer": ...} object per line
+
+    @staticmethod
+    def _write_jsonl(path, flashcards):
+        """
+        Writes flashcards to a JSON Lines file, one object per line.
+
+        Args:
+            path (str): The target file.
+            flashcards (Iterable[tuple[str, str]]): (question, answer) pairs to write.
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            for question, answer in flashcards:
+                f.write(json.dumps({"question": question, "answer": answer}, ensure_ascii=False))
+                f.write("\n")
+
+    @staticmethod
+    def _read_jsonl(path):
+        """
+        Reads flashcards from a JSON Lines file. Blank lines and entries with an empty question or
+        answer are skipped.
+
+        Args:
+            path (str): The source file.
+
+        Yields:
+            tuple[str, str]: The (question, answer) pair of each line.
+
+        Raises:
+            ValueError: If a line is not valid JSON.
+        """
+        with open(path, encoding="utf-8") as f:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"Ungültiges JSON in Zeile {line_number}: {e}") from e
+                question = str(entry.get("question", "")).strip()
+                answer = str(entry.get("answer", "")).strip()
+                if question and answer:
+                    yield question, answer
+
+    # Anki package: a zip archive with a collection.anki2 SQLite database and a media index
+
+    def _write_apkg(self, path, deck_name, flashcards):
+        """
+        Writes flashcards to an Anki package with one deck. The notes are inserted into a temporary
+        collection in batches, which is then zipped together with an empty media index.
+
+        Args:
+            path (str): The target file.
+            deck_name (str): The name of the exported deck.
+            flashcards (Iterable[tuple[str, str]]): (question, answer) pairs to write.
+        """
+        with tempfile.TemporaryDirectory(prefix="anki_export_") as temp_dir:
+            collection_path = os.path.join(temp_dir, "collection.anki2")
+            connection = sqlite3.connect(collection_path)
+            try:
+                model_id, deck_id = self._create_anki_collection(connection, deck_name)
+                now = int(time.time())
+                id_base = int(time.time() * 1000)
+
+                def notes():
+                    for index, (question, answer) in enumerate(flashcards):
+                        front = self._to_anki_field(question)
+                        fields = front + "\x1f" + self._to_anki_field(answer)
+                        checksum = int(hashlib.sha1(front.encode("utf-8")).hexdigest()[:8], 16)
+                        guid = hashlib.sha1(fields.encode("utf-8")).hexdigest()[:10]
+                        yield id_base + index, guid, model_id, now, fields, front, checksum
+
+                rows = notes()
+                position = 0
+                while True:
+                    batch = list(islice(rows, self.batch_size))
+                    if not batch:
+                        break
+                    connection.executemany(
+                        "INSERT INTO notes (id, guid, mid, mod, usn, tags, flds, sfld, csum, flags, data) "
+                        "VALUES (?, ?, ?, ?, -1, '', ?, ?, ?, 0, '')",
+                        batch
+                    )
+                    connection.executemany(
+                        "INSERT INTO cards (id, nid, did, ord, mod, usn, type, queue, due, ivl, factor, reps, lapses, "
+                        "left, odue, odid, flags, data) VALUES (?, ?, ?, 0, ?, -1, 0, 0, ?, 0, 0, 0, 0, 0, 0, 0, 0, '')",
+                        [(note_id, note_id, deck_id, mod, position + offset + 1)
+                         for offset, (note_id, _, _, mod, _, _, _) in enumerate(batch)]
+                    )
+                    connection.commit()
+                    position += len(batch)
+            finally:
+                connection.close()
+
+            with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+                archive.write(collection_path, "collection.anki2")
+                archive.writestr("media", "{}")
+
+    def _read_apkg(self, path):
+        """
+        Reads flashcards from the notes of an Anki package. The first field of a note becomes the
+        question and the second the answer; notes with fewer fields are skipped.
+
+        Args:
+            path (str): The source file.
+
+        Yields:
+            tuple[str, str]: The (question, answer) pair of each note.
+
+        Raises:
+            ValueError: If the archive contains no Anki collection.
+        """
+        with tempfile.TemporaryDirectory(prefix="anki_import_") as temp_dir:
+            with zipfile.ZipFile(path) as archive:
+                names = archive.namelist()
+                collection_name = next((name for name in ("collection.anki21", "collection.anki2") if name in names), None)
+                if collection_name is None:
+                    raise ValueError("Die Datei enthält keine Anki-Sammlung (collection.anki2).")
+                collection_path = archive.extract(collection_name, temp_dir)
+
+            connection = sqlite3.connect(collection_path)
+            try:
+                for (fields,) in connection.execute("SELECT flds FROM notes ORDER BY id"):
+                    parts = fields.split("\x1f")
+                    if len(parts) < 2:
+                        continue
+                    question, answer = self._from_anki_field(parts[0]), self._from_anki_field(parts[1])
+                    if question and answer:
+                        yield question, answer
+            finally:
+                connection.close()
+
+    @staticmethod
+    def _to_anki_field(text):
+        """
+        Converts plain text into an Anki field, which Anki renders as HTML.
+
+        Args:
+            text (str): The plain text.
+
+        Returns:
+            str: The escaped field with line breaks as ``<br>``.
+        """
+        return html.escape(text).replace("\n", "<br>")
+
+    @staticmethod
+    def _from_anki_field(field):
+        """
+        Converts an Anki HTML field back into plain text.
+
+        Args:
+            field (str): The HTML field.
+
+        Returns:
+            str: The text without tags, with line breaks for ``<br>`` and ``</div>``.
+        """
+        text = re.sub(r"<br\s*/?>|</div>", "\n", field, flags=re.IGNORECASE)
+        text = re.sub(r"<[^>]+>", "", text)
+        return html.unescape(text).strip()
+
+    @staticmethod
+    def _create_anki_collection(connection, deck_name):
+        """
+        Creates an empty Anki 2.1 (schema 11) collection with one deck and a basic note type.
+
+        Args:
+            connection (sqlite3.Connection): A connection to the empty collection file.
+            deck_name (str): The name of the exported deck.
+
+        Returns:
+            tuple[int, int]: The note type ID and the deck ID.
+        """
+        connection.executescript('''
+            CREATE TABLE col (id integer PRIMARY KEY, crt integer NOT NULL, mod integer NOT NULL,
+                scm integer NOT NULL, ver integer NOT NULL, dty integer NOT NULL, usn integer NOT NULL,
+                ls integer NOT NULL, conf text NOT NULL, models text NOT NULL, decks text NOT NULL,
+                dconf text NOT NULL, tags text NOT NULL);
+            CREATE TABLE notes (id integer PRIMARY KEY, guid text NOT NULL, mid integer NOT NULL,
+                mod integer NOT NULL, usn integer NOT NULL, tags text NOT NULL, flds text NOT NULL,
+                sfld integer NOT NULL, csum integer NOT NULL, flags integer NOT NULL, data text NOT NULL);
+            CREATE TABLE cards (id integer PRIMARY KEY, nid integer NOT NULL, did integer NOT NULL,
+                ord integer NOT NULL, mod integer NOT NULL, usn integer NOT NULL, type integer NOT NULL,
+                queue integer NOT NULL, due integer NOT NULL, ivl integer NOT NULL, factor integer NOT NULL,
+                reps integer NOT NULL, lapses integer NOT NULL, left integer NOT NULL, odue integer NOT NULL,
+                odid integer NOT NULL, flags integer NOT NULL, data text NOT NULL);
+            CREATE TABLE revlog (id integer PRIMARY KEY, cid integer NOT NULL, usn integer NOT NULL,
+                ease integer NOT NULL, ivl integer NOT NULL, lastIvl integer NOT NULL, factor integer NOT NULL,
+                time integer NOT NULL, type integer NOT NULL);
+            CREATE TABLE graves (usn integer NOT NULL, oid integer NOT NULL, type integer NOT NULL);
+            CREATE INDEX ix_notes_usn ON notes (usn);
+            CREATE INDEX ix_cards_usn ON cards (usn);
+            CREATE INDEX ix_revlog_usn ON revlog (usn);
+            CREATE INDEX ix_cards_nid ON cards (nid);
+            CREATE INDEX ix_cards_sched ON cards (did, queue, due);
+            CREATE INDEX ix_revlog_cid ON revlog (cid);
+            CREATE INDEX ix_notes_csum ON notes (csum);
+        ''')
+
+        now = int(time.time())
+        model_id = now * 1000
+        deck_id = now * 1000 + 1
+        models = {
+            str(model_id): {
+                "id": model_id, "name": "TalkFlashcard-AI Basic", "type": 0, "mod": now, "usn": -1,
+                "sortf": 0, "did": deck_id, "tags": [], "vers": [], "req": [[0, "all", [0]]],
+                "latexPre": "\\documentclass[12pt]{article}\n\\special{papersize=3in,5in}\n\\begin{document}\n",
+                "latexPost": "\\end{document}",
+                "css": ".card { font-family: arial; font-size: 20px; text-align: center; }",
+                "flds": [
+                    {"name": "Front", "ord": 0, "sticky": False, "rtl": False, "font": "Arial", "size": 20, "media": []},
+                    {"name": "Back", "ord": 1, "sticky": False, "rtl": False, "font": "Arial", "size": 20, "media": []},
+                ],
+                "tmpls": [{
+                    "name": "Card 1", "ord": 0, "did": None, "bqfmt": "", "bafmt": "",
+                    "qfmt": "{{Front}}", "afmt": "{{FrontSide}}<hr id=answer>{{Back}}",
+                }],
+            }
+        }
+        deck_template = {
+            "mod": now, "usn": -1, "lrnToday": [0, 0], "revToday": [0, 0], "newToday": [0, 0],
+            "timeToday": [0, 0], "collapsed": False, "desc": "", "dyn": 0, "conf": 1,
+            "extendNew": 10, "extendRev": 50,
+        }
+        decks = {
+            "1": dict(deck_template, id=1, name="Default"),
+            str(deck_id): dict(deck_template, id=deck_id, name=deck_name),
+        }
+        deck_config = {
+            "1": {
+                "id": 1, "name": "Default", "mod": 0, "usn": 0, "maxTaken": 60, "autoplay": True,
+                "timer": 0, "replayq": True, "dyn": False,
+                "new": {"delays": [1, 10], "ints": [1, 4, 7], "initialFactor": 2500, "order": 1,
+                        "perDay": 20, "bury": True, "separate": True},
+                "rev": {"perDay": 200, "ease4": 1.3, "fuzz": 0.05, "maxIvl": 36500, "bury": True,
+                        "minSpace": 1, "ivlFct": 1},
+                "lapse": {"delays": [10], "mult": 0, "minInt": 1, "leechFails": 8, "leechAction": 0},
+            }
+        }
+        collection_config = {
+            "activeDecks": [1], "curDeck": 1, "newSpread": 0, "collapseTime": 1200, "timeLim": 0,
+            "estTimes": True, "dueCounts": True, "curModel": str(model_id), "nextPos": 1,
+            "sortType": "noteFld", "sortBackwards": False, "addToCur": True,
+        }
+        connection.execute(
+            "INSERT INTO col VALUES (1, ?, ?, ?, 11, 0, 0, 0, ?, ?, ?, ?, '{}')",
+            (now - now % 86400, now * 1000, now * 1000, json.dumps(collection_config),
+             json.dumps(models), json.dumps(decks), json.dumps(deck_config))
+        )
+        connection.commit()
+        return model_id, deck_id
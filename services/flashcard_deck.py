@@ -0,0 +1,102 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+# Shared by all decks; prefetching is I/O bound and only ever one page ahead per deck
+_prefetch_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="deck-prefetch")
+
+
+class FlashcardDeck:
+    """
+    A module's flashcards, walked one page at a time.
+
+    While the caller works through the current page, the next page is already being fetched on
+    a background thread. Memory use stays at roughly two pages no matter how large the module is.
+    """
+
+    def __init__(self, db_service, module_id, page_size=500, prefetch=True):
+        """
+        Initializes the deck for a module.
+
+        Args:
+            db_service (DatabaseService): The database service used to fetch pages.
+            module_id (int): The ID of the module.
+            page_size (int): The number of flashcards fetched per page.
+            prefetch (bool): Whether to fetch the next page in the background.
+        """
+        self.db_service = db_service
+        self.module_id = module_id
+        self.page_size = page_size
+        self.prefetch = prefetch
+
+    def _fetch_page(self, after_id):
+        """
+        Fetches the page after the given flashcard ID, in the background if prefetching is enabled.
+
+        Args:
+            after_id (int): The ID of the last flashcard of the previous page.
+
+        Returns:
+            Future or list: The pending page, or the page itself without prefetching.
+        """
+        if self.prefetch:
+            return _prefetch_executor.submit(self.db_service.get_flashcard_page, self.module_id, after_id, self.page_size)
+        return self.db_service.get_flashcard_page(self.module_id, after_id, self.page_size)
+
+    def pages(self):
+        """
+        Iterates over the deck page by page.
+
+        Yields:
+            List[Flashcard]: Consecutive pages of flashcards ordered by ID.
+        """
+        pending = self._fetch_page(0)
+        while pending is not None:
+            page = pending.result() if self.prefetch else pending
+            if not page:
+                return
+            # Start loading the next page before handing out the current one
+            pending = self._fetch_page(page[-1].id) if len(page) == self.page_size else None
+            yield page
+
+    def __iter__(self):
+        """
+        Iterates over all flashcards of the deck in ID order.
+
+        Yields:
+            Flashcard: The next flashcard.
+        """
+        for page in self.pages():
+            yield from page
+
+    def is_empty(self):
+        """
+        Checks whether the module has no flashcards.
+
+        Returns:
+            bool: True if the deck is empty.
+        """
+        return not self.db_service.has_flashcards(self.module_id)
+
+    def shuffled(self, buffer_size=1000):
+        """
+        Iterates over the deck in random order using a bounded shuffle buffer.
+
+        Each flashcard is swapped into a buffer of ``buffer_size`` cards and a random card from
+        the buffer is emitted, so memory stays bounded while the order is still well mixed.
+
+        Args:
+            buffer_size (int): The number of flashcards held for shuffling.
+
+        Yields:
+            Flashcard: The next flashcard in shuffled order.
+        """
+        buffer = []
+        for flashcard in self:
+            if len(buffer) < buffer_size:
+                buffer.append(flashcard)
+                continue
+            index = random.randrange(buffer_size)
+            yield buffer[index]
+            buffer[index] = flashcard
+        random.shuffle(buffer)
+        yield from buffer
@@ -0,0 +1,166 @@
+import threading
+from concurrent.futures import Future
+
+from services.generation_pipeline import GenerationPipeline
+from services.retry_policy import CircuitOpenError
+
+
+def _wait(result):
+    """
+    Returns the result of a database write, waiting for it in write-behind mode.
+
+    Args:
+        result: The return value of a ``DatabaseService`` mutation.
+
+    Returns:
+        The result of the write.
+    """
+    return result.result() if isinstance(result, Future) else result
+
+
+class GenerationJobService:
+    """
+    Runs queued flashcard generations on a pool of background workers.
+
+    Jobs live in the ``generation_jobs`` table, so they survive closing the application: jobs
+    that were running are put back into the queue by ``start()``. Chunks a job had already
+    finished are answered from the response cache when it runs again. Generated flashcards stay
+    in the table until the user reviews them in the inbox.
+    """
+
+    def __init__(self, db_service, chatgpt_service=None, max_workers=2, poll_interval=5.0):
+        """
+        Initializes the service without starting the workers.
+
+        Args:
+            db_service (DatabaseService): The database service that stores the jobs.
+            chatgpt_service (ChatGPTService, optional): The service that generates the flashcards.
+                Jobs wait in the queue while it is None; it can be set later, e.g. once an API key
+                was entered.
+            max_workers (int): The maximum number of jobs that run at the same time.
+            poll_interval (float): How often (in seconds) idle workers look for new jobs.
+        """
+        self.db_service = db_service
+        self.chatgpt_service = chatgpt_service
+        self.max_workers = max_workers
+        self.poll_interval = poll_interval
+        self._pipeline = None
+        self._pipeline_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        """
+        Requeues interrupted jobs and starts the workers.
+        """
+        _wait(self.db_service.requeue_generation_jobs())
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._run, name=f"generation-worker-{number}", daemon=True)
+            for number in range(self.max_workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout=2.0):
+        """
+        Stops the workers. A job that is still running stays marked as running and is resumed by
+        the next ``start()``.
+
+        Args:
+            timeout (float): How long (in seconds) to wait for each worker.
+        """
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def submit(self, module_id, texts, use_cache=True):
+        """
+        Queues flashcard generations and wakes the workers.
+
+        Args:
+            module_id (int): The ID of the module the flashcards are generated for.
+            texts (Iterable[tuple[str, str]]): (title, source text) pairs, one job each.
+            use_cache (bool): Whether cached API responses may be used.
+
+        Returns:
+            List[int]: The IDs of the new jobs (a ``Future`` of them in write-behind mode).
+        """
+        result = self.db_service.add_generation_jobs(module_id, texts, use_cache)
+        if isinstance(result, Future):
+            result.add_done_callback(lambda _: self._wake.set())
+        else:
+            self._wake.set()
+        return result
+
+    def retry(self, job_ids):
+        """
+        Queues failed jobs again and wakes the workers.
+
+        Args:
+            job_ids (list): The IDs of the jobs.
+
+        Returns:
+            int: The number of requeued jobs (a ``Future`` of it in write-behind mode).
+        """
+        result = self.db_service.requeue_generation_jobs(job_ids)
+        if isinstance(result, Future):
+            result.add_done_callback(lambda _: self._wake.set())
+        else:
+            self._wake.set()
+        return result
+
+    def _get_pipeline(self):
+        """
+        Returns the pipeline shared by all workers, so its rate limit covers all jobs together.
+
+        Returns:
+            GenerationPipeline or None: The pipeline, or None while no ChatGPT service is set.
+        """
+        with self._pipeline_lock:
+            if self.chatgpt_service is None:
+                return None
+            if self._pipeline is None or self._pipeline.chatgpt_service is not self.chatgpt_service:
+                self._pipeline = GenerationPipeline(self.chatgpt_service)
+            return self._pipeline
+
+    def _run(self):
+        """
+        Claims and runs jobs until the service is stopped.
+        """
+        while not self._stop.is_set():
+            pipeline = self._get_pipeline()
+            claimed = _wait(self.db_service.claim_generation_job()) if pipeline else None
+            if claimed is None:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+                continue
+
+            job_id, _, source_text, use_cache = claimed
+            try:
+                result = pipeline.run(source_text, use_cache=use_cache, cancelled=self._stop)
+                errors = [error for _, error in result.failed_chunks]
+            except Exception as e:
+                result, errors = None, [e]
+
+            if self._stop.is_set():
+                continue  # Chunks were skipped; the job stays running and is resumed on the next start
+            outage = next((error for error in errors if isinstance(error, CircuitOpenError)), None)
+            if outage:
+                # The API is down; keep the job queued and pause this worker until the breaker resets
+                _wait(self.db_service.requeue_generation_jobs([job_id]))
+                self._stop.wait(max(outage.retry_in, 1.0))  # At least a second while a trial call is running
+            elif result is None:
+                _wait(self.db_service.fail_generation_job(job_id, str(errors[0])))
+            elif result.failed_chunks:
+                # Partial results are not stored; the finished chunks come from the cache on retry
+                index, error = result.failed_chunks[0]
+                _wait(self.db_service.fail_generation_job(
+                    job_id,
+                    f"{len(result.failed_chunks)} von {result.chunk_count} Abschnitten fehlgeschlagen "
+                    f"(Abschnitt {index + 1}: {error})"
+                ))
+            else:
+                _wait(self.db_service.complete_generation_job(job_id, result.flashcards))
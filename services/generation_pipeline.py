@@ -0,0 +1,189 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import NamedTuple
+
+from utils.text_chunking import split_text
+from utils.text_normalization import flashcard_content_hash
+from utils.token_estimation import estimate_tokens
+
+TOKENS_PER_CARD = 150  # One flashcard is asked for per this many tokens of source text
+MIN_CARDS_PER_CHUNK = 3
+MAX_CARDS_PER_CHUNK = 10
+
+
+class RateLimiter:
+    """
+    Spaces out calls so that no more than ``requests_per_minute`` start within a minute.
+
+    Threads that call ``acquire()`` reserve the next free slot under a lock and sleep outside of
+    it, so waiting threads never hold up each other's reservations.
+    """
+
+    def __init__(self, requests_per_minute):
+        """
+        Initializes the limiter.
+
+        Args:
+            requests_per_minute (float): The maximum request rate.
+        """
+        self.interval = 60.0 / requests_per_minute
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Blocks until the calling thread may start its request.
+        """
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class GenerationResult(NamedTuple):
+    """
+    The outcome of a chunked generation run.
+    """
+    flashcards: list  # Merged, deduplicated flashcards in the order of the source text
+    chunk_count: int
+    failed_chunks: list  # (chunk index, exception) of the chunks whose request failed
+
+
+class GenerationPipeline:
+    """
+    Generates flashcards for texts of any length.
+
+    The text is split on paragraph and sentence boundaries into chunks of at most
+    ``chunk_tokens`` tokens. The chunks are sent to ``ChatGPTService.generate_flashcards`` on a
+    bounded worker pool behind a rate limiter, and their flashcards are merged in text order with
+    duplicates removed.
+    """
+
+    def __init__(self, chatgpt_service, chunk_tokens=1500, max_workers=4, requests_per_minute=60, max_chunks=200):
+        """
+        Initializes the pipeline.
+
+        Args:
+            chatgpt_service (ChatGPTService): The service that generates the flashcards of one chunk.
+            chunk_tokens (int): The token budget of the source text of one request.
+            max_workers (int): The maximum number of concurrent requests.
+            requests_per_minute (float): The maximum rate at which requests are started.
+            max_chunks (int): The maximum number of chunks of one text; longer texts are rejected
+                before any request is sent.
+        """
+        self.chatgpt_service = chatgpt_service
+        self.chunk_tokens = chunk_tokens
+        self.max_workers = max_workers
+        self.rate_limiter = RateLimiter(requests_per_minute)
+        self.max_chunks = max_chunks
+
+    @staticmethod
+    def cards_for_chunk(chunk):
+        """
+        Returns how many flashcards to ask for, proportional to the length of the chunk.
+
+        Args:
+            chunk (str): The source text of the chunk.
+
+        Returns:
+            int: The number of flashcards.
+        """
+        return max(MIN_CARDS_PER_CHUNK, min(MAX_CARDS_PER_CHUNK, estimate_tokens(chunk) // TOKENS_PER_CARD))
+
+    def run(self, text, use_cache=True, progress=None, on_flashcard=None, cancelled=None):
+        """
+        Generates the flashcards of a text.
+
+        A text that fits into a single chunk is sent as one request for ten flashcards, like
+        before. A failing chunk does not stop the others; it is reported in the result, and the
+        first error is raised only if every chunk failed.
+
+        With ``on_flashcard`` the responses are streamed, and every new flashcard is passed on as
+        soon as it is complete, in the order in which they arrive.
+
+        Args:
+            text (str): The source text.
+            use_cache (bool): Whether cached responses may be returned.
+            progress (callable, optional): Called on the calling thread with
+                (finished chunks, total chunks) after every chunk.
+            on_flashcard (callable, optional): Called from the worker threads with every flashcard
+                that is not a duplicate of an earlier one.
+            cancelled (threading.Event, optional): Once set, running streams are closed and the
+                remaining chunks are skipped.
+
+        Returns:
+            GenerationResult: The merged flashcards and the failed chunks.
+
+        Raises:
+            ValueError: If the text has more than ``max_chunks`` chunks.
+        """
+        chunks = split_text(text, self.chunk_tokens)
+        if not chunks:
+            return GenerationResult([], 0, [])
+        if len(chunks) > self.max_chunks:
+            raise ValueError(
+                f"Der Text ist zu lang ({len(chunks)} Abschnitte, höchstens {self.max_chunks}). "
+                f"Bitte teilen Sie ihn auf mehrere Generierungen auf."
+            )
+        if progress:
+            progress(0, len(chunks))
+
+        emitted = set()  # Content hashes of the flashcards passed to on_flashcard
+        emitted_lock = threading.Lock()
+
+        def generate(chunk):
+            card_count = MAX_CARDS_PER_CHUNK if len(chunks) == 1 else self.cards_for_chunk(chunk)
+            if cancelled and cancelled.is_set():
+                return []
+            self.rate_limiter.acquire()
+            if not on_flashcard:
+                return self.chatgpt_service.generate_flashcards(chunk, use_cache=use_cache, card_count=card_count)
+
+            flashcards = []
+            stream = self.chatgpt_service.stream_flashcards(chunk, use_cache=use_cache, card_count=card_count)
+            try:
+                for flashcard in stream:
+                    if cancelled and cancelled.is_set():
+                        break
+                    flashcards.append(flashcard)
+                    content_hash = flashcard_content_hash(flashcard['question'], flashcard['answer'])
+                    with emitted_lock:
+                        is_new = content_hash not in emitted
+                        emitted.add(content_hash)
+                    if is_new:
+                        on_flashcard(flashcard)
+            finally:
+                stream.close()
+            return flashcards
+
+        results = [None] * len(chunks)
+        failed_chunks = []
+        finished = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="flashcard-generation") as executor:
+            futures = {executor.submit(generate, chunk): index for index, chunk in enumerate(chunks)}
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    results[index] = future.result()
+                except Exception as e:
+                    failed_chunks.append((index, e))
+                finished += 1
+                if progress:
+                    progress(finished, len(chunks))
+
+        failed_chunks.sort(key=lambda failure: failure[0])
+        if len(failed_chunks) == len(chunks):
+            raise failed_chunks[0][1]
+
+        flashcards = []
+        seen = set()
+        for chunk_flashcards in results:
+            for flashcard in chunk_flashcards or ():
+                content_hash = flashcard_content_hash(flashcard['question'], flashcard['answer'])
+                if content_hash not in seen:
+                    seen.add(content_hash)
+                    flashcards.append(flashcard)
+        return GenerationResult(flashcards, len(chunks), failed_chunks)
@@ -0,0 +1,81 @@
+import threading
+from collections import OrderedDict
+
+
+class IdentityMap:
+    """
+    A small, thread-safe LRU map from primary keys to loaded model objects.
+
+    Every invalidation bumps a generation counter. A reader that loaded an object from the
+    database only stores it if no invalidation happened while it was reading, so a write that
+    commits in the meantime can never be shadowed by the stale copy.
+    """
+
+    def __init__(self, max_size=256):
+        """
+        Initializes an empty identity map.
+
+        Args:
+            max_size (int): The maximum number of objects kept; the least recently used are dropped.
+        """
+        self.max_size = max_size
+        self._objects = OrderedDict()
+        self._lock = threading.Lock()
+        self.generation = 0
+
+    def get(self, key):
+        """
+        Returns the object stored for a key and marks it as recently used.
+
+        Args:
+            key (int): The primary key.
+
+        Returns:
+            object or None: The stored object, or None if it is not loaded.
+        """
+        with self._lock:
+            obj = self._objects.get(key)
+            if obj is not None:
+                self._objects.move_to_end(key)
+            return obj
+
+    def put(self, key, obj, generation):
+        """
+        Stores a freshly loaded object unless the map was invalidated while it was loaded.
+
+        Args:
+            key (int): The primary key.
+            obj (object): The loaded object.
+            generation (int): The value of ``generation`` read before the object was loaded.
+        """
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._objects[key] = obj
+            self._objects.move_to_end(key)
+            while len(self._objects) > self.max_size:
+                self._objects.popitem(last=False)
+
+    def discard(self, *keys):
+        """
+        Removes the objects stored for the given keys.
+
+        Args:
+            *keys (int): The primary keys to invalidate.
+        """
+        with self._lock:
+            self.generation += 1
+            for key in keys:
+                self._objects.pop(key, None)
+
+    def discard_where(self, predicate):
+        """
+        Removes every stored object for which the predicate returns True.
+
+        Args:
+            predicate (callable): Called with each stored object.
+        """
+        with self._lock:
+            self.generation += 1
+            for key in [key for key, obj in self._objects.items() if predicate(obj)]:
+                del self._objects[key]
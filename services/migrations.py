@@ -0,0 +1,355 @@
+"""
+Versioned schema migrations for the flashcard database.
+
+Every migration is an ordered step with a unique version number. The versions that have
+already been applied are recorded in the ``schema_version`` table, so each step runs exactly
+once per database file, no matter how often the application is started.
+"""
+
+from utils.text_normalization import flashcard_content_hash
+
+# Rows read or deleted per statement by data migrations; below the 999-variable limit of older SQLite builds
+MIGRATION_BATCH_SIZE = 500
+
+
+def _create_base_tables(connection):
+    """
+    Creates the modules and flashcards tables.
+
+    Uses ``IF NOT EXISTS`` so that databases created before the migration subsystem existed
+    are adopted without changes.
+
+    Args:
+        connection (sqlite3.Connection): The connection to migrate.
+    """
+    connection.execute('''
+        CREATE TABLE IF NOT EXISTS modules (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL
+        )
+    ''')
+    connection.execute('''
+        CREATE TABLE IF NOT EXISTS flashcards (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            module_id INTEGER NOT NULL,
+            question TEXT NOT NULL,
+            answer TEXT NOT NULL,
+            FOREIGN KEY (module_id) REFERENCES modules(id) ON DELETE CASCADE
+        )
+    ''')
+
+
+def _add_flashcard_indexes(connection):
+    """
+    Adds the index on ``flashcards.module_id``.
+
+    Module loads, module deletes and the ``ON DELETE CASCADE`` of the foreign key all look up
+    flashcards by their module, which is a full table scan without this index.
+
+    Args:
+        connection (sqlite3.Connection): The connection to migrate.
+    """
+    connection.execute("CREATE INDEX IF NOT EXISTS idx_flashcards_module_id ON flashcards (module_id)")
+
+
+def _create_flashcard_search_index(connection):
+    """
+    Adds an FTS5 full-text index over the questions and answers of all flashcards.
+
+    The index is an external-content table: it stores only the search terms and reads the
+    texts from ``flashcards``. Triggers keep it in sync with every insert, update and delete.
+
+    Args:
+        connection (sqlite3.Connection): The connection to migrate.
+    """
+    connection.execute('''
+        CREATE VIRTUAL TABLE flashcards_fts USING fts5(
+            question,
+            answer,
+            content='flashcards',
+            content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+    ''')
+    connection.execute('''
+        CREATE TRIGGER flashcards_fts_after_insert AFTER INSERT ON flashcards BEGIN
+            INSERT INTO flashcards_fts (rowid, question, answer) VALUES (new.id, new.question, new.answer);
+        END
+    ''')
+    connection.execute('''
+        CREATE TRIGGER flashcards_fts_after_delete AFTER DELETE ON flashcards BEGIN
+            INSERT INTO flashcards_fts (flashcards_fts, rowid, question, answer)
+            VALUES ('delete', old.id, old.question, old.answer);
+        END
+    ''')
+    connection.execute('''
+        CREATE TRIGGER flashcards_fts_after_update AFTER UPDATE OF question, answer ON flashcards BEGIN
+            INSERT INTO flashcards_fts (flashcards_fts, rowid, question, answer)
+            VALUES ('delete', old.id, old.question, old.answer);
+            INSERT INTO flashcards_fts (rowid, question, answer) VALUES (new.id, new.question, new.answer);
+        END
+    ''')
+    # Index the flashcards that existed before this migration
+    connection.execute("INSERT INTO flashcards_fts (flashcards_fts) VALUES ('rebuild')")
+
+
+def _create_flashcard_change_feed(connection):
+    """
+    Adds a change feed that records every insert, update and delete of a flashcard.
+
+    Each change gets a monotonically increasing sequence number, so a view that remembers the
+    last number it has seen can fetch exactly the flashcards that changed since then. Triggers
+    write the feed, which also covers deletes cascaded from a deleted module.
+
+    Args:
+        connection (sqlite3.Connection): The connection to migrate.
+    """
+    connection.execute('''
+        CREATE TABLE flashcard_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            operation TEXT NOT NULL CHECK (operation IN ('insert', 'update', 'delete')),
+            flashcard_id INTEGER NOT NULL,
+            module_id INTEGER NOT NULL
+        )
+    ''')
+    connection.execute("CREATE INDEX idx_flashcard_changes_module_seq ON flashcard_changes (module_id, seq)")
+    connection.execute('''
+        CREATE TRIGGER flashcard_changes_after_insert AFTER INSERT ON flashcards BEGIN
+            INSERT INTO flashcard_changes (operation, flashcard_id, module_id) VALUES ('insert', new.id, new.module_id);
+        END
+    ''')
+    connection.execute('''
+        CREATE TRIGGER flashcard_changes_after_update AFTER UPDATE OF module_id, question, answer ON flashcards BEGIN
+            INSERT INTO flashcard_changes (operation, flashcard_id, module_id)
+            SELECT 'delete', old.id, old.module_id WHERE old.module_id != new.module_id;
+            INSERT INTO flashcard_changes (operation, flashcard_id, module_id) VALUES ('update', new.id, new.module_id);
+        END
+    ''')
+    connection.execute('''
+        CREATE TRIGGER flashcard_changes_after_delete AFTER DELETE ON flashcards BEGIN
+            INSERT INTO flashcard_changes (operation, flashcard_id, module_id) VALUES ('delete', old.id, old.module_id);
+        END
+    ''')
+
+
+def _create_review_state(connection):
+    """
+    Adds the spaced-repetition state of every flashcard.
+
+    One row per flashcard holds the SM-2 parameters and the time the flashcard is due next. The
+    index on ``(module_id, due_at)`` lets a study session read just the due flashcards of a
+    module in due order. A trigger creates the state of new flashcards, and existing flashcards
+    are backfilled as due right away.
+
+    Args:
+        connection (sqlite3.Connection): The connection to migrate.
+    """
+    connection.execute('''
+        CREATE TABLE review_state (
+            flashcard_id INTEGER PRIMARY KEY,
+            module_id INTEGER NOT NULL,
+            due_at REAL NOT NULL,
+            ease REAL NOT NULL DEFAULT 2.5,
+            interval_days REAL NOT NULL DEFAULT 0,
+            repetitions INTEGER NOT NULL DEFAULT 0,
+            lapses INTEGER NOT NULL DEFAULT 0,
+            last_reviewed_at REAL,
+            FOREIGN KEY (flashcard_id) REFERENCES flashcards(id) ON DELETE CASCADE
+        )
+    ''')
+    connection.execute("CREATE INDEX idx_review_state_module_due ON review_state (module_id, due_at)")
+    connection.execute('''
+        CREATE TRIGGER review_state_after_insert AFTER INSERT ON flashcards BEGIN
+            INSERT INTO review_state (flashcard_id, module_id, due_at)
+            VALUES (new.id, new.module_id, CAST(strftime('%s', 'now') AS REAL));
+        END
+    ''')
+    connection.execute('''
+        CREATE TRIGGER review_state_after_move AFTER UPDATE OF module_id ON flashcards BEGIN
+            UPDATE review_state SET module_id = new.module_id WHERE flashcard_id = new.id;
+        END
+    ''')
+    connection.execute('''
+        INSERT INTO review_state (flashcard_id, module_id, due_at)
+        SELECT id, module_id, CAST(strftime('%s', 'now') AS REAL) FROM flashcards
+    ''')
+
+
+def _create_review_history(connection):
+    """
+    Adds the append-only review log and the aggregate tables derived from it.
+
+    Every answer is appended to ``review_log``. The per-flashcard and per-module totals are kept
+    in ``card_review_stats`` and ``module_review_stats``, which are updated in the same
+    transaction as the log, so statistics never have to scan the log.
+
+    Args:
+        connection (sqlite3.Connection): The connection to migrate.
+    """
+    connection.execute('''
+        CREATE TABLE review_log (
+            id INTEGER PRIMARY KEY,
+            flashcard_id INTEGER NOT NULL,
+            module_id INTEGER NOT NULL,
+            mode TEXT NOT NULL,
+            rating INTEGER NOT NULL,
+            latency_ms INTEGER,
+            attempt INTEGER NOT NULL DEFAULT 1,
+            reviewed_at REAL NOT NULL,
+            FOREIGN KEY (module_id) REFERENCES modules(id) ON DELETE CASCADE
+        )
+    ''')
+    connection.execute("CREATE INDEX idx_review_log_module_reviewed_at ON review_log (module_id, reviewed_at)")
+    connection.execute("CREATE INDEX idx_review_log_flashcard_id ON review_log (flashcard_id)")
+    for table, key, parent in (("card_review_stats", "flashcard_id", "flashcards"), ("module_review_stats", "module_id", "modules")):
+        connection.execute(f'''
+            CREATE TABLE {table} (
+                {key} INTEGER PRIMARY KEY,
+                reviews INTEGER NOT NULL DEFAULT 0,
+                correct INTEGER NOT NULL DEFAULT 0,
+                total_latency_ms INTEGER NOT NULL DEFAULT 0,
+                last_rating INTEGER,
+                last_reviewed_at REAL,
+                FOREIGN KEY ({key}) REFERENCES {parent}(id) ON DELETE CASCADE
+            )
+        ''')
+
+
+def _add_flashcard_content_hash(connection):
+    """
+    Adds a content hash to every flashcard and makes it unique per module.
+
+    The hash of the normalized question and answer is backfilled in batches. Flashcards whose hash
+    already occurs in the same module are then deleted in batches, keeping the oldest copy, before
+    the unique index on ``(module_id, content_hash)`` is created.
+
+    Args:
+        connection (sqlite3.Connection): The connection to migrate.
+    """
+    connection.execute("ALTER TABLE flashcards ADD COLUMN content_hash TEXT")
+
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            "SELECT id, question, answer FROM flashcards WHERE id > ? ORDER BY id LIMIT ?",
+            (last_id, MIGRATION_BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+        connection.executemany(
+            "UPDATE flashcards SET content_hash = ? WHERE id = ?",
+            [(flashcard_content_hash(question, answer), flashcard_id) for flashcard_id, question, answer in rows]
+        )
+        last_id = rows[-1][0]
+
+    duplicate_ids = [row[0] for row in connection.execute('''
+        SELECT id FROM (
+            SELECT id, ROW_NUMBER() OVER (PARTITION BY module_id, content_hash ORDER BY id) AS copy_number
+            FROM flashcards
+        )
+        WHERE copy_number > 1
+    ''')]
+    for start in range(0, len(duplicate_ids), MIGRATION_BATCH_SIZE):
+        chunk = duplicate_ids[start:start + MIGRATION_BATCH_SIZE]
+        connection.execute(f"DELETE FROM flashcards WHERE id IN ({', '.join('?' * len(chunk))})", chunk)
+
+    connection.execute("CREATE UNIQUE INDEX idx_flashcards_module_content_hash ON flashcards (module_id, content_hash)")
+
+
+def _create_generation_jobs(connection):
+    """
+    Adds the queue of flashcard generation jobs.
+
+    A job holds the source text until a worker has generated its flashcards, which are then kept
+    as JSON until the user has reviewed them. The index on ``(status, id)`` lets workers claim the
+    oldest pending job without scanning the table.
+
+    Args:
+        connection (sqlite3.Connection): The connection to migrate.
+    """
+    connection.execute('''
+        CREATE TABLE generation_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            module_id INTEGER NOT NULL,
+            title TEXT NOT NULL,
+            source_text TEXT NOT NULL,
+            use_cache INTEGER NOT NULL DEFAULT 1,
+            status TEXT NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'running', 'done', 'failed')),
+            flashcards TEXT,
+            flashcard_count INTEGER NOT NULL DEFAULT 0,
+            error TEXT,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL,
+            FOREIGN KEY (module_id) REFERENCES modules(id) ON DELETE CASCADE
+        )
+    ''')
+    connection.execute("CREATE INDEX idx_generation_jobs_status_id ON generation_jobs (status, id)")
+
+
+# Ordered list of (version, description, step). New migrations are only ever appended.
+MIGRATIONS = [
+    (1, "create modules and flashcards tables", _create_base_tables),
+    (2, "add index on flashcards.module_id", _add_flashcard_indexes),
+    (3, "add full-text search index on flashcards", _create_flashcard_search_index),
+    (4, "add flashcard change feed", _create_flashcard_change_feed),
+    (5, "add spaced-repetition review state", _create_review_state),
+    (6, "add review log and review statistics", _create_review_history),
+    (7, "add flashcard content hash and remove duplicates", _add_flashcard_content_hash),
+    (8, "add flashcard generation job queue", _create_generation_jobs),
+]
+
+
+def get_schema_version(connection):
+    """
+    Returns the highest migration version applied to the database.
+
+    Args:
+        connection (sqlite3.Connection): The connection to inspect.
+
+    Returns:
+        int: The current schema version, 0 for a fresh database.
+    """
+    row = connection.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+
+def apply_migrations(connection, migrations=MIGRATIONS):
+    """
+    Brings the database schema up to the latest version.
+
+    Each pending migration runs in its own transaction together with its ``schema_version``
+    entry, so an interrupted upgrade never leaves a half-applied step behind.
+
+    Args:
+        connection (sqlite3.Connection): The connection to migrate.
+        migrations (list): The ordered migration steps. Defaults to ``MIGRATIONS``.
+
+    Returns:
+        int: The schema version after all pending migrations have been applied.
+    """
+    connection.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    connection.commit()
+
+    current_version = get_schema_version(connection)
+    for version, description, step in migrations:
+        if version <= current_version:
+            continue
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            step(connection)
+            connection.execute(
+                "INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                (version, description)
+            )
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        current_version = version
+    return current_version
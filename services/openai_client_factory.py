@@ -0,0 +1,107 @@
+import threading
+
+import httpx
+import openai
+
+from services.retry_policy import CircuitBreaker, RetryPolicy
+
+# Timeouts in seconds per kind of request. Connecting is always short, so a dead network fails
+# fast; reading is long enough for a full completion or a spoken answer.
+ENDPOINT_TIMEOUTS = {
+    "chat": httpx.Timeout(60.0, connect=5.0),
+    "chat_stream": httpx.Timeout(30.0, connect=5.0),  # Between two streamed chunks
+    "evaluation": httpx.Timeout(20.0, connect=5.0),
+    "speech": httpx.Timeout(30.0, connect=5.0),
+    "transcription": httpx.Timeout(60.0, connect=5.0, write=30.0),
+    "warm_up": httpx.Timeout(10.0, connect=5.0),
+}
+
+WARM_UP_MODEL = "tts-1"  # Retrieving a model is free and returns a tiny response
+
+
+class OpenAIClientFactory:
+    """
+    Owns the HTTP connection pool shared by all requests to the OpenAI API.
+
+    Every client handed out by ``get_client`` sends its requests through the same ``httpx.Client``,
+    so TCP and TLS connections are kept alive and reused across services, windows and threads.
+    ``warm_up`` opens a connection in the background before the first request needs it.
+
+    The clients do not retry on their own; requests go through ``retry_policy.call``, whose circuit
+    breaker is shared by all of them.
+    """
+
+    def __init__(self, max_connections=10, max_keepalive_connections=5, keepalive_expiry=120.0):
+        """
+        Initializes the factory and its connection pool.
+
+        Args:
+            max_connections (int): The maximum number of open connections.
+            max_keepalive_connections (int): The maximum number of idle connections kept open.
+            keepalive_expiry (float): How long (in seconds) an idle connection is kept open.
+        """
+        self.http_client = httpx.Client(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            timeout=ENDPOINT_TIMEOUTS["chat"],
+        )
+        self.retry_policy = RetryPolicy(circuit_breaker=CircuitBreaker())
+        self._clients = {}  # API key -> openai.OpenAI
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def timeout(endpoint):
+        """
+        Returns the timeout for a kind of request.
+
+        Args:
+            endpoint (str): A key of ``ENDPOINT_TIMEOUTS``, e.g. "chat" or "speech".
+
+        Returns:
+            httpx.Timeout: The timeout to pass to the request.
+        """
+        return ENDPOINT_TIMEOUTS[endpoint]
+
+    def get_client(self, api_key):
+        """
+        Returns the client for an API key, creating it on first use.
+
+        Args:
+            api_key (str): The OpenAI API key.
+
+        Returns:
+            openai.OpenAI: A client that uses the shared connection pool.
+        """
+        with self._lock:
+            client = self._clients.get(api_key)
+            if client is None:
+                client = openai.OpenAI(api_key=api_key, http_client=self.http_client, max_retries=0)
+                self._clients[api_key] = client
+            return client
+
+    def warm_up(self, api_key):
+        """
+        Opens a connection to the API on a background thread, so the next request does not pay
+        for DNS, TCP and TLS setup. Failures are ignored; the real request reports them.
+
+        Args:
+            api_key (str): The OpenAI API key.
+        """
+        def run_warm_up():
+            try:
+                self.get_client(api_key).models.retrieve(
+                    WARM_UP_MODEL, timeout=self.timeout("warm_up")
+                )
+            except Exception as e:
+                print(f"Verbindungsaufbau zur OpenAI API fehlgeschlagen: {e}")
+
+        threading.Thread(target=run_warm_up, name="openai-warm-up", daemon=True).start()
+
+    def close(self):
+        """
+        Closes all pooled connections.
+        """
+        self.http_client.close()
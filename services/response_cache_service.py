@@ -0,0 +1,125 @@
+import hashlib
+import json
+import time
+
+from services.connection_manager import ConnectionManager
+
+
+class ResponseCacheService:
+    """
+    Disk-backed cache for responses of the OpenAI API.
+
+    Responses are stored in their own SQLite file next to ``modules.db`` and keyed by a hash of
+    everything that determines the response: model, prompt template version, sampling parameters
+    and input text. Entries expire after ``ttl_seconds``, and once more than ``max_entries`` are
+    stored the least recently used ones are evicted.
+    """
+
+    def __init__(self, db_name="response_cache.db", max_entries=500, ttl_seconds=30 * 24 * 3600):
+        """
+        Initializes the cache and creates its table if needed.
+
+        Args:
+            db_name (str): The cache database file name.
+            max_entries (int): The maximum number of cached responses.
+            ttl_seconds (float): How long a cached response stays valid.
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.connections = ConnectionManager(db_name, configure=self.configure_connection, max_idle_readers=1)
+        with self.connections.transaction() as connection:
+            connection.execute('''
+                CREATE TABLE IF NOT EXISTS response_cache (
+                    key TEXT PRIMARY KEY,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used_at REAL NOT NULL
+                )
+            ''')
+            connection.execute("CREATE INDEX IF NOT EXISTS idx_response_cache_last_used_at ON response_cache (last_used_at)")
+
+    @staticmethod
+    def configure_connection(connection):
+        """
+        Applies the pragmas of the cache connections.
+
+        Args:
+            connection (sqlite3.Connection): The connection to configure.
+        """
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("PRAGMA synchronous = NORMAL")
+        connection.execute("PRAGMA busy_timeout = 5000")
+
+    @staticmethod
+    def make_key(**request):
+        """
+        Builds the cache key of a request.
+
+        Args:
+            **request: Everything that determines the response, e.g. model, prompt version,
+                temperature and input text. Values must be JSON serializable.
+
+        Returns:
+            str: The SHA-256 hash of the request.
+        """
+        canonical = json.dumps(request, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """
+        Returns a cached response and marks it as recently used.
+
+        Args:
+            key (str): The cache key from ``make_key``.
+
+        Returns:
+            str or None: The cached response, or None if it is missing or expired.
+        """
+        now = time.time()
+        with self.connections.transaction() as connection:
+            row = connection.execute(
+                "SELECT response, created_at FROM response_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            response, created_at = row
+            if now - created_at > self.ttl_seconds:
+                connection.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+                return None
+            connection.execute("UPDATE response_cache SET last_used_at = ? WHERE key = ?", (now, key))
+            return response
+
+    def put(self, key, response):
+        """
+        Stores a response, replacing an older one with the same key, and evicts expired and
+        least recently used entries.
+
+        Args:
+            key (str): The cache key from ``make_key``.
+            response (str): The response to cache.
+        """
+        now = time.time()
+        with self.connections.transaction() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO response_cache (key, response, created_at, last_used_at) VALUES (?, ?, ?, ?)",
+                (key, response, now, now)
+            )
+            connection.execute("DELETE FROM response_cache WHERE created_at < ?", (now - self.ttl_seconds,))
+            connection.execute('''
+                DELETE FROM response_cache WHERE key IN (
+                    SELECT key FROM response_cache ORDER BY last_used_at DESC LIMIT -1 OFFSET ?
+                )
+            ''', (self.max_entries,))
+
+    def clear(self):
+        """
+        Deletes all cached responses.
+        """
+        with self.connections.transaction() as connection:
+            connection.execute("DELETE FROM response_cache")
+
+    def close(self):
+        """
+        Closes the cache database.
+        """
+        self.connections.close()
@@ -0,0 +1,228 @@
+import email.utils
+import logging
+import random
+import threading
+import time
+
+import openai
+
+logger = logging.getLogger(__name__)
+
+# HTTP status codes of errors that usually go away when the request is repeated
+RETRYABLE_STATUS_CODES = (408, 409, 429, 500, 502, 503, 504)
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling the API while the circuit breaker is open.
+    """
+
+    def __init__(self, retry_in):
+        """
+        Initializes the error.
+
+        Args:
+            retry_in (float): Seconds until the breaker lets a trial request through.
+        """
+        super().__init__(
+            f"Die OpenAI API ist vorübergehend nicht erreichbar. "
+            f"Bitte versuchen Sie es in {max(1, round(retry_in))} Sekunden erneut."
+        )
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    Stops calling the API during an outage.
+
+    After ``failure_threshold`` consecutive transient failures the breaker opens, and every call
+    fails immediately with ``CircuitOpenError``. After ``reset_timeout`` seconds a single trial call
+    is let through: if it succeeds the breaker closes, otherwise it stays open for another period.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        """
+        Initializes a closed breaker.
+
+        Args:
+            failure_threshold (int): The number of consecutive failures that opens the breaker.
+            reset_timeout (float): How long (in seconds) the breaker stays open before a trial call.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None  # Monotonic time the breaker opened, None while closed
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """
+        Checks whether a call may be made.
+
+        Raises:
+            CircuitOpenError: If the breaker is open, or a trial call is already running.
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return
+            remaining = self._opened_at + self.reset_timeout - time.monotonic()
+            if remaining > 0 or self._trial_running:
+                raise CircuitOpenError(max(remaining, 0))
+            self._trial_running = True
+
+    def record_success(self):
+        """
+        Closes the breaker after a successful call.
+        """
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        """
+        Counts a transient failure and opens the breaker once the threshold is reached.
+        """
+        with self._lock:
+            self._failures += 1
+            if self._trial_running or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_running = False
+
+    def release_trial(self):
+        """
+        Ends a trial call whose outcome says nothing about the availability of the API, e.g. an
+        authentication error, so the next call can be the trial.
+        """
+        with self._lock:
+            self._trial_running = False
+
+
+class RetryPolicy:
+    """
+    Repeats API calls that failed with a transient error.
+
+    Waits between attempts grow exponentially with full jitter, so concurrent callers do not retry
+    in lockstep. A ``Retry-After`` header of a rate limit response is honored instead. Transient
+    failures are reported to the circuit breaker, which fails fast during outages.
+    """
+
+    def __init__(self, max_attempts=4, base_delay=0.5, max_delay=20.0, circuit_breaker=None):
+        """
+        Initializes the policy.
+
+        Args:
+            max_attempts (int): The maximum number of attempts per call, including the first one.
+            base_delay (float): The upper bound of the first wait, in seconds.
+            max_delay (float): The upper bound of any wait, in seconds. A longer ``Retry-After``
+                gives up instead of blocking the caller.
+            circuit_breaker (CircuitBreaker, optional): The breaker shared by all calls to the API.
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.circuit_breaker = circuit_breaker
+
+    @staticmethod
+    def is_retryable(error):
+        """
+        Checks whether an error is transient.
+
+        Args:
+            error (Exception): The error raised by the API call.
+
+        Returns:
+            bool: True for timeouts, connection errors, rate limits and server errors.
+        """
+        if isinstance(error, openai.APIConnectionError):  # Includes timeouts
+            return True
+        if isinstance(error, openai.APIStatusError):
+            if getattr(error, "code", None) == "insufficient_quota":
+                return False  # A used up quota does not come back by waiting
+            return error.status_code in RETRYABLE_STATUS_CODES
+        return False
+
+    @staticmethod
+    def retry_after(error):
+        """
+        Reads the wait requested by the server from the headers of an error response.
+
+        Args:
+            error (Exception): The error raised by the API call.
+
+        Returns:
+            float or None: The wait in seconds, or None if the server did not request one.
+        """
+        response = getattr(error, "response", None)
+        if response is None:
+            return None
+        headers = response.headers
+        try:
+            if headers.get("retry-after-ms"):
+                return float(headers["retry-after-ms"]) / 1000
+            value = headers.get("retry-after")
+            if not value:
+                return None
+            try:
+                return float(value)
+            except ValueError:
+                retry_at = email.utils.parsedate_to_datetime(value)  # HTTP date
+                return max(0.0, retry_at.timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    def delay(self, attempt, error):
+        """
+        Returns the wait before the next attempt.
+
+        Args:
+            attempt (int): The number of the failed attempt, starting at 1.
+            error (Exception): The error of the failed attempt.
+
+        Returns:
+            float: The wait in seconds.
+        """
+        retry_after = self.retry_after(error)
+        if retry_after is not None:
+            return retry_after
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def call(self, function, *args, **kwargs):
+        """
+        Calls a function and repeats it while it fails with a transient error.
+
+        Args:
+            function (callable): The API call, e.g. ``client.chat.completions.create``.
+            *args: Positional arguments of the call.
+            **kwargs: Keyword arguments of the call.
+
+        Returns:
+            The result of the first successful attempt.
+
+        Raises:
+            CircuitOpenError: If the circuit breaker is open.
+            Exception: The error of the last attempt, or the first error that is not transient.
+        """
+        attempt = 1
+        while True:
+            if self.circuit_breaker:
+                self.circuit_breaker.before_call()
+            try:
+                result = function(*args, **kwargs)
+            except Exception as e:
+                if not self.is_retryable(e):
+                    if self.circuit_breaker:
+                        self.circuit_breaker.release_trial()
+                    raise
+                if self.circuit_breaker:
+                    self.circuit_breaker.record_failure()
+                wait = self.delay(attempt, e)
+                if attempt >= self.max_attempts or wait > self.max_delay:
+                    raise
+                logger.debug("API request failed (%s), retrying in %.1f seconds", e, wait)
+                time.sleep(wait)
+                attempt += 1
+                continue
+            if self.circuit_breaker:
+                self.circuit_breaker.record_success()
+            return result
@@ -0,0 +1,64 @@
+import threading
+import time
+
+from models.module_model import ReviewEvent
+
+# Study modes recorded in the review log
+REVIEW_MODE_NORMAL = "normal"
+REVIEW_MODE_INTERACTIVE = "interactive"
+
+
+class ReviewLogService:
+    """
+    Collects the answers of study sessions and writes them to the review log in batches.
+
+    Answers are buffered in memory and handed to ``DatabaseService.add_review_events`` once
+    ``batch_size`` of them have accumulated, or when a session ends and calls ``flush()``.
+    """
+
+    def __init__(self, db_service, batch_size=50):
+        """
+        Initializes the service with an empty buffer.
+
+        Args:
+            db_service (DatabaseService): The database service that stores the events.
+            batch_size (int): The number of buffered answers that triggers a write.
+        """
+        self.db_service = db_service
+        self.batch_size = batch_size
+        self._events = []
+        self._lock = threading.Lock()
+
+    def log(self, flashcard, mode, rating, latency_ms=None, attempt=1):
+        """
+        Buffers one answer and writes the buffer if it is full.
+
+        Args:
+            flashcard (Flashcard): The answered flashcard.
+            mode (str): The study mode, ``REVIEW_MODE_NORMAL`` or ``REVIEW_MODE_INTERACTIVE``.
+            rating (int): The quality of the answer on the SM-2 scale from 0 to 5.
+            latency_ms (int, optional): The time from showing the question to the answer.
+            attempt (int): The number of the attempt at this flashcard, starting at 1.
+
+        Returns:
+            The result of the write if the buffer was written, otherwise None.
+        """
+        event = ReviewEvent(flashcard.id, flashcard.module_id, mode, rating, latency_ms, attempt, time.time())
+        with self._lock:
+            self._events.append(event)
+            full = len(self._events) >= self.batch_size
+        return self.flush() if full else None
+
+    def flush(self):
+        """
+        Writes all buffered answers.
+
+        Returns:
+            The number of written events (a ``Future`` of it in write-behind mode), or None if
+            nothing was buffered.
+        """
+        with self._lock:
+            events, self._events = self._events, []
+        if not events:
+            return None
+        return self.db_service.add_review_events(events)
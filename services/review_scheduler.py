@@ -0,0 +1,126 @@
+import heapq
+import threading
+import time
+
+from models.module_model import ReviewState
+
+# Ratings on the SM-2 quality scale from 0 to 5; ratings below RATING_HARD count as forgotten
+RATING_AGAIN = 1
+RATING_HARD = 3
+RATING_GOOD = 4
+RATING_EASY = 5
+
+MIN_EASE = 1.3
+SECONDS_PER_DAY = 86400
+RELEARN_DELAY_SECONDS = 600  # A forgotten flashcard comes back after ten minutes
+
+
+def schedule_review(state, rating, now=None):
+    """
+    Computes the review state after a review with the SM-2 algorithm.
+
+    A forgotten flashcard restarts its repetitions and is due again after ``RELEARN_DELAY_SECONDS``.
+    A remembered flashcard is due again after 1 day, then 6 days, then the previous interval
+    multiplied by the ease factor. The ease factor is adjusted by every rating.
+
+    Args:
+        state (ReviewState): The state before the review.
+        rating (int): The quality of the answer, from 0 (blackout) to 5 (perfect).
+        now (float, optional): The time of the review as a Unix timestamp. Defaults to the current time.
+
+    Returns:
+        ReviewState: The new state.
+    """
+    now = time.time() if now is None else now
+    ease = max(MIN_EASE, state.ease + 0.1 - (5 - rating) * (0.08 + (5 - rating) * 0.02))
+
+    if rating < RATING_HARD:
+        lapses = state.lapses + 1 if state.repetitions > 0 else state.lapses
+        return ReviewState(
+            state.flashcard_id, state.module_id, now + RELEARN_DELAY_SECONDS,
+            ease, 0.0, 0, lapses, now
+        )
+
+    if state.repetitions == 0:
+        interval_days = 1.0
+    elif state.repetitions == 1:
+        interval_days = 6.0
+    else:
+        interval_days = float(round(state.interval_days * state.ease))
+    return ReviewState(
+        state.flashcard_id, state.module_id, now + interval_days * SECONDS_PER_DAY,
+        ease, interval_days, state.repetitions + 1, state.lapses, now
+    )
+
+
+class DueQueue:
+    """
+    A min-heap of the flashcards of a module that are due, ordered by due time.
+
+    The heap is filled lazily from the ``(module_id, due_at)`` index in small batches, so a
+    session on a large library only ever reads the flashcards it is about to show. Flashcards
+    that were forgotten can be pushed back with a later due time; they are merged into the order
+    and returned once that time has passed.
+    """
+
+    def __init__(self, db_service, module_id, due_before=None, batch_size=100):
+        """
+        Initializes the queue for a module.
+
+        Args:
+            db_service (DatabaseService): The database service used to read the due flashcards.
+            module_id (int): The ID of the module.
+            due_before (float, optional): Flashcards due up to this Unix timestamp are included.
+                Defaults to the current time.
+            batch_size (int): The number of flashcards read per query.
+        """
+        self.db_service = db_service
+        self.module_id = module_id
+        self.due_before = time.time() if due_before is None else due_before
+        self.batch_size = batch_size
+        self._heap = []  # (due_at, flashcard_id, flashcard) entries
+        self._last_key = (float("-inf"), 0)  # (due_at, flashcard_id) of the last row read
+        self._exhausted = False
+        self._lock = threading.Lock()
+
+    def _fill(self):
+        """
+        Reads batches from the database until the heap's smallest entry precedes all unread rows.
+        """
+        while not self._exhausted and (not self._heap or self._heap[0][:2] > self._last_key):
+            rows = self.db_service.get_due_flashcards(
+                self.module_id, self.due_before, self._last_key[0], self._last_key[1], self.batch_size
+            )
+            for due_at, flashcard in rows:
+                heapq.heappush(self._heap, (due_at, flashcard.id, flashcard))
+            if rows:
+                self._last_key = (rows[-1][0], rows[-1][1].id)
+            self._exhausted = len(rows) < self.batch_size
+
+    def pop(self, now=None):
+        """
+        Removes and returns the flashcard that is due first.
+
+        Args:
+            now (float, optional): The current time as a Unix timestamp. Defaults to the current time.
+
+        Returns:
+            Flashcard or None: The next flashcard, or None if no flashcard is due yet.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            self._fill()
+            if not self._heap or self._heap[0][0] > now:
+                return None  # Pushed-back flashcards wait until their due time
+            return heapq.heappop(self._heap)[2]
+
+    def push(self, flashcard, due_at):
+        """
+        Adds a flashcard back to the queue, e.g. after it was forgotten.
+
+        Args:
+            flashcard (Flashcard): The flashcard.
+            due_at (float): When the flashcard is due again, as a Unix timestamp.
+        """
+        with self._lock:
+            heapq.heappush(self._heap, (due_at, flashcard.id, flashcard))
@@ -0,0 +1,146 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+
+class WriteBehindQueue:
+    """
+    Applies database mutations on a dedicated writer thread.
+
+    Callers submit operations and immediately get a ``Future`` back. The writer thread drains
+    the queue and groups waiting operations into one transaction, so a burst of mutations costs
+    a single commit and never blocks the Tk main thread. Every operation runs inside its own
+    savepoint, so one failing operation does not roll back the rest of its batch.
+    """
+
+    _STOP = object()  # Sentinel that tells the writer thread to exit
+
+    def __init__(self, connections, max_batch_size=256, max_batch_delay=0.01):
+        """
+        Initializes the queue and starts the writer thread.
+
+        Args:
+            connections (ConnectionManager): The connection manager whose writer applies the batches.
+            max_batch_size (int): The maximum number of operations grouped into one transaction.
+            max_batch_delay (float): How long (in seconds) to wait for more operations before committing.
+        """
+        self.connections = connections
+        self.max_batch_size = max_batch_size
+        self.max_batch_delay = max_batch_delay
+        self._queue = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="database-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, operation, callback=None):
+        """
+        Queues a mutation for the writer thread.
+
+        Args:
+            operation (callable): Called with the writer connection inside a transaction; its
+                return value becomes the result of the future.
+            callback (callable, optional): Called with the finished future on the writer thread.
+
+        Returns:
+            Future: Resolves to the operation's result once its batch has been committed.
+        """
+        if self._closed:
+            raise RuntimeError("Die Schreibwarteschlange wurde bereits geschlossen.")
+        future = Future()
+        if callback:
+            future.add_done_callback(callback)
+        self._queue.put((operation, future))
+        return future
+
+    def flush(self, timeout=None):
+        """
+        Blocks until every operation submitted so far has been committed or has failed.
+
+        Args:
+            timeout (float, optional): The maximum time to wait in seconds; waits indefinitely if None.
+
+        Returns:
+            bool: True if all operations were written, False if the timeout expired first.
+        """
+        if self._closed:
+            return True
+        # Operations are applied in submission order, so an empty marker finishes after all of them
+        marker = self.submit(lambda connection: None)
+        try:
+            marker.result(timeout)
+        except FutureTimeoutError:
+            return False
+        return True
+
+    def close(self):
+        """
+        Flushes all pending operations and stops the writer thread.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(self._STOP)
+        self._thread.join()
+
+    def _run(self):
+        """
+        Writer thread loop: collects a batch and applies it until the queue is closed.
+        """
+        while True:
+            item = self._queue.get()
+            if item is self._STOP:
+                self._queue.task_done()
+                return
+
+            batch = [item]
+            stop_requested = False
+            deadline = time.monotonic() + self.max_batch_delay
+            while len(batch) < self.max_batch_size:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if item is self._STOP:
+                    stop_requested = True
+                    break
+                batch.append(item)
+
+            self._apply(batch)
+            for _ in batch:
+                self._queue.task_done()
+
+            if stop_requested:
+                self._queue.task_done()
+                return
+
+    def _apply(self, batch):
+        """
+        Applies a batch of operations in one transaction and resolves their futures.
+
+        Args:
+            batch (list): (operation, future) pairs in submission order.
+        """
+        outcomes = []
+        try:
+            with self.connections.transaction() as connection:
+                for operation, future in batch:
+                    connection.execute("SAVEPOINT write_behind_operation")
+                    try:
+                        outcomes.append((future, operation(connection), None))
+                        connection.execute("RELEASE write_behind_operation")
+                    except Exception as e:
+                        connection.execute("ROLLBACK TO write_behind_operation")
+                        connection.execute("RELEASE write_behind_operation")
+                        outcomes.append((future, None, e))
+        except Exception as e:
+            # The commit itself failed, so nothing in this batch was written
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        for future, result, error in outcomes:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
@@ -0,0 +1,45 @@
+from concurrent.futures import Future
+
+import pytest
+
+from services.database_service import DatabaseService
+
+
+def resolve(result):
+    """
+    Returns the result of a ``DatabaseService`` mutation, waiting for it in write-behind mode.
+
+    Args:
+        result: The value or ``Future`` returned by the mutation.
+
+    Returns:
+        The result of the mutation.
+    """
+    return result.result(timeout=10) if isinstance(result, Future) else result
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """
+    Returns the path of a database file in a fresh temporary directory.
+    """
+    return str(tmp_path / "modules.db")
+
+
+@pytest.fixture(params=[False, True], ids=["direct", "write_behind"])
+def db_service(request, db_path):
+    """
+    Returns a database service on a temporary file, once with direct writes and once in
+    write-behind mode, and closes it after the test.
+    """
+    service = DatabaseService(db_path, write_behind=request.param)
+    yield service
+    service.close_connection()
+
+
+@pytest.fixture
+def module_id(db_service):
+    """
+    Returns the ID of an empty module in the test database.
+    """
+    return resolve(db_service.add_module("Biologie"))
@@ -0,0 +1,55 @@
+import os
+import sqlite3
+import threading
+from contextlib import closing
+
+from services.backup_service import BackupCancelled, BackupService
+from tests.conftest import resolve
+
+
+def test_snapshot_is_a_standalone_copy_of_the_database(db_service, module_id, tmp_path):
+    """The snapshot holds all committed flashcards and does not need a WAL file."""
+    resolve(db_service.add_flashcards(module_id, [("F1", "A1"), ("F2", "A2")]))
+    db_service.flush()
+    backup_service = BackupService(db_service, backup_dir=str(tmp_path / "backups"), step_sleep=0)
+
+    path = backup_service.backup_now()
+
+    assert backup_service.list_backups() == [path]
+    with closing(sqlite3.connect(path)) as connection:
+        assert connection.execute("SELECT question, answer FROM flashcards ORDER BY id").fetchall() == [
+            ("F1", "A1"), ("F2", "A2")
+        ]
+        assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+
+
+def test_only_the_newest_snapshots_are_kept(db_service, tmp_path):
+    """Snapshots beyond the retention count are deleted, oldest first."""
+    backup_service = BackupService(db_service, backup_dir=str(tmp_path / "backups"), keep=2, step_sleep=0)
+    paths = [backup_service.backup_now() for _ in range(4)]
+    assert backup_service.list_backups() == paths[2:]
+
+
+def test_stop_cancels_a_running_snapshot(db_service, module_id, tmp_path):
+    """A snapshot in progress is aborted and leaves no partial file behind."""
+    resolve(db_service.add_flashcards(module_id, [(f"Frage {index}", "A" * 2000) for index in range(200)]))
+    db_service.flush()
+    backup_dir = tmp_path / "backups"
+    backup_service = BackupService(db_service, backup_dir=str(backup_dir), pages_per_step=1, step_sleep=0.01)
+    copying = threading.Event()
+    errors = []
+
+    def run():
+        try:
+            backup_service.backup_now(progress=lambda copied, total: copying.set())
+        except BackupCancelled as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    assert copying.wait(5)
+    backup_service.stop()
+    thread.join(5)
+
+    assert len(errors) == 1
+    assert os.listdir(backup_dir) == []
@@ -0,0 +1,160 @@
+import pytest
+
+from models.module_model import Module
+from services.database_service import ON_DUPLICATE_SKIP, ON_DUPLICATE_UPDATE
+from services.deck_io_service import DeckIOService
+from tests.conftest import resolve
+
+
+def read_views(db_service, module_ids):
+    """
+    Reads everything the module list and the flashcard lists show.
+
+    Returns:
+        tuple: The modules, the flashcard counts and the first preview page of every module.
+    """
+    modules = [(module.id, module.name) for module in db_service.get_all_modules()]
+    previews = {module_id: db_service.get_flashcard_previews(module_id) for module_id in module_ids}
+    return modules, db_service.module_stats(), previews
+
+
+def assert_cache_matches_the_database(db_service, module_ids):
+    """
+    Compares the cached views with a fresh read from the database.
+    """
+    db_service.flush()  # Write-behind callbacks patch the cache after the commit
+    cached = read_views(db_service, module_ids)
+    db_service.cache.clear()
+    assert cached == read_views(db_service, module_ids)
+
+
+def add_module(db_service, module_ids, flashcard_ids, tmp_path):
+    """
+    Adds a third module.
+    """
+    module_ids.append(resolve(db_service.add_module("Physik")))
+
+
+def add_flashcard(db_service, module_ids, flashcard_ids, tmp_path):
+    """
+    Adds a single flashcard to the first module.
+    """
+    resolve(db_service.add_flashcard(module_ids[0], "Neue Frage", "Neue Antwort"))
+
+
+def update_flashcard(db_service, module_ids, flashcard_ids, tmp_path):
+    """
+    Edits a flashcard of the first module.
+    """
+    resolve(db_service.update_flashcard(flashcard_ids[1], "Geänderte Frage", "Geänderte Antwort"))
+
+
+def add_flashcards(db_service, module_ids, flashcard_ids, tmp_path):
+    """
+    Adds new flashcards to the first module in bulk.
+    """
+    resolve(db_service.add_flashcards(module_ids[0], [("Neu 1", "A"), ("Neu 2", "A")]))
+
+
+def add_flashcards_skipping_duplicates(db_service, module_ids, flashcard_ids, tmp_path):
+    """
+    Adds a duplicate and a new flashcard, keeping the existing one.
+    """
+    resolve(db_service.add_flashcards(module_ids[0], [("Frage 0", "Antwort 0"), ("Neu", "A")], ON_DUPLICATE_SKIP))
+
+
+def add_flashcards_updating_duplicates(db_service, module_ids, flashcard_ids, tmp_path):
+    """
+    Adds a duplicate and a new flashcard, overwriting the existing one.
+    """
+    resolve(db_service.add_flashcards(module_ids[0], [("FRAGE 0", "ANTWORT  0"), ("Neu", "A")], ON_DUPLICATE_UPDATE))
+
+
+def delete_flashcard(db_service, module_ids, flashcard_ids, tmp_path):
+    """
+    Deletes a single flashcard.
+    """
+    resolve(db_service.delete_flashcard(flashcard_ids[2]))
+
+
+def delete_flashcards(db_service, module_ids, flashcard_ids, tmp_path):
+    """
+    Deletes a selection of flashcards in bulk.
+    """
+    resolve(db_service.delete_flashcards(flashcard_ids[:3] + flashcard_ids[-1:]))
+
+
+def delete_flashcards_by_module(db_service, module_ids, flashcard_ids, tmp_path):
+    """
+    Deletes all flashcards of the first module.
+    """
+    resolve(db_service.delete_flashcards_by_module(module_ids[0]))
+
+
+def delete_module(db_service, module_ids, flashcard_ids, tmp_path):
+    """
+    Deletes the second module with its flashcards.
+    """
+    resolve(db_service.delete_module_with_flashcards(module_ids[1]))
+
+
+def import_flashcards(db_service, module_ids, flashcard_ids, tmp_path):
+    """
+    Imports a CSV file with a duplicate and a new flashcard into the first module.
+    """
+    path = tmp_path / "deck.csv"
+    path.write_text("question,answer\nFrage 0,Antwort 0\nImportiert,A\n", encoding="utf-8")
+    DeckIOService(db_service).import_module(Module(module_ids[0], "Biologie"), str(path))
+
+
+@pytest.mark.parametrize("mutate", [
+    add_module, add_flashcard, update_flashcard, add_flashcards, add_flashcards_skipping_duplicates,
+    add_flashcards_updating_duplicates, delete_flashcard, delete_flashcards, delete_flashcards_by_module,
+    delete_module, import_flashcards,
+], ids=lambda mutate: mutate.__name__)
+def test_cache_matches_the_database_after(db_service, module_id, tmp_path, mutate):
+    """Every mutation leaves the cached modules, counts and previews equal to a fresh read."""
+    other_module_id = resolve(db_service.add_module("Chemie"))
+    module_ids = [module_id, other_module_id]
+    flashcard_ids = resolve(db_service.add_flashcards(module_id, [(f"Frage {index}", f"Antwort {index}") for index in range(6)]))
+    resolve(db_service.add_flashcards(other_module_id, [("Frage X", "Antwort X")]))
+    assert_cache_matches_the_database(db_service, module_ids)
+
+    read_views(db_service, module_ids)  # Fill the cache before the mutation
+    mutate(db_service, module_ids, flashcard_ids, tmp_path)
+    assert_cache_matches_the_database(db_service, module_ids)
+
+
+def test_switching_between_cached_modules_does_not_query_the_database(db_service, module_id, monkeypatch):
+    """Only the most recently used modules keep their lists; those are served from memory."""
+    db_service.cache.max_modules = 2
+    module_ids = [module_id] + [resolve(db_service.add_module(name)) for name in ("Chemie", "Physik")]
+    for index, current_id in enumerate(module_ids):
+        resolve(db_service.add_flashcard(current_id, f"Frage {index}", "Antwort"))
+    db_service.flush()
+    expected = {current_id: db_service.get_flashcard_previews(current_id) for current_id in module_ids}
+
+    assert db_service.cache.get_previews(module_ids[0], 0, 200, 100, 200) is None  # Evicted by the third module
+    assert db_service.get_flashcard_previews(module_ids[0]) == expected[module_ids[0]]
+    assert db_service.cache.get_previews(module_ids[1], 0, 200, 100, 200) is None
+
+    db_service.module_stats()
+    monkeypatch.setattr(db_service.connections, "read", None)  # Any query would fail from here on
+    for current_id in (module_ids[0], module_ids[2], module_ids[0]):
+        assert db_service.get_flashcard_previews(current_id) == expected[current_id]
+    assert db_service.module_stats() == dict.fromkeys(module_ids, 1)
+
+
+def test_bulk_delete_spans_several_chunks(db_service, module_id):
+    """A selection larger than the IN-clause chunk is deleted completely and leaves the cache exact."""
+    flashcard_ids = resolve(db_service.add_flashcards(module_id, [(f"Frage {index}", "A") for index in range(1203)]))
+    kept_ids = flashcard_ids[::100]
+    deleted_ids = [flashcard_id for flashcard_id in flashcard_ids if flashcard_id not in set(kept_ids)]
+    db_service.flush()
+    db_service.get_flashcard_previews(module_id, page_size=2000)
+    db_service.module_stats()
+
+    assert resolve(db_service.delete_flashcards(deleted_ids + [flashcard_ids[-1] + 1])) == len(deleted_ids)
+    db_service.flush()
+    assert [preview.id for preview in db_service.get_flashcard_previews(module_id, page_size=2000)] == kept_ids
+    assert db_service.module_stats()[module_id] == db_service.count_flashcards(module_id) == len(kept_ids)
@@ -0,0 +1,174 @@
+import threading
+import time
+
+import pytest
+
+from services.connection_manager import ConnectionManager
+from services.write_behind_queue import WriteBehindQueue
+from utils import future_callback_util
+from utils.future_callback_util import run_when_done
+
+
+@pytest.fixture
+def connections(db_path):
+    """
+    Returns a connection manager on a database with one table, and closes it after the test.
+    """
+    manager = ConnectionManager(db_path)
+    with manager.writer() as connection:
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("CREATE TABLE items (name TEXT UNIQUE)")
+    yield manager
+    manager.close()
+
+
+def item_names(connections):
+    """
+    Returns the names of all rows of the test table.
+    """
+    with connections.read() as connection:
+        return [row[0] for row in connection.execute("SELECT name FROM items ORDER BY rowid")]
+
+
+def test_transaction_rolls_back_on_error(connections):
+    """An exception inside the block discards all of its writes."""
+    with pytest.raises(RuntimeError):
+        with connections.transaction() as connection:
+            connection.execute("INSERT INTO items VALUES ('a')")
+            raise RuntimeError("Abbruch")
+    assert item_names(connections) == []
+
+
+def test_nested_transaction_joins_outer_one(connections):
+    """An inner block commits together with the outer block and is rolled back with it."""
+    with pytest.raises(RuntimeError):
+        with connections.transaction() as connection:
+            with connections.transaction() as inner:
+                inner.execute("INSERT INTO items VALUES ('inner')")
+            connection.execute("INSERT INTO items VALUES ('outer')")
+            raise RuntimeError("Abbruch")
+    assert item_names(connections) == []
+
+
+def test_readers_on_several_threads_get_own_connections(connections):
+    """Concurrent read blocks never share a connection."""
+    barrier = threading.Barrier(4)
+    seen = []
+
+    def read():
+        with connections.read() as connection:
+            barrier.wait(timeout=5)  # All threads hold their connection at the same time
+            seen.append(id(connection))
+            connection.execute("SELECT COUNT(*) FROM items").fetchone()
+
+    threads = [threading.Thread(target=read) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(set(seen)) == 4
+
+
+def test_write_behind_groups_waiting_operations_into_batches(connections):
+    """Operations submitted while the writer is busy are committed together."""
+    queue = WriteBehindQueue(connections)
+    batch_sizes = []
+    apply = queue._apply
+    queue._apply = lambda batch: batch_sizes.append(len(batch)) or apply(batch)
+    try:
+        started = threading.Event()
+        queue.submit(lambda connection: started.set() or time.sleep(0.1))
+        started.wait(5)
+        futures = [
+            queue.submit(lambda connection, name=f"item{index}": connection.execute("INSERT INTO items VALUES (?)", (name,)))
+            for index in range(20)
+        ]
+        for future in futures:
+            future.result(5)
+    finally:
+        queue.close()
+    assert item_names(connections) == [f"item{index}" for index in range(20)]
+    assert batch_sizes[0] == 1 and sum(batch_sizes[1:]) == 20 and len(batch_sizes) < 21
+
+
+def test_write_behind_rolls_back_only_the_failing_operation(connections):
+    """A failing operation does not undo the other operations of its batch."""
+    queue = WriteBehindQueue(connections, max_batch_delay=0.1)
+    try:
+        first = queue.submit(lambda connection: connection.execute("INSERT INTO items VALUES ('a')"))
+        failing = queue.submit(lambda connection: (
+            connection.execute("INSERT INTO items VALUES ('b')"),
+            connection.execute("INSERT INTO items VALUES ('a')")  # Violates the unique constraint
+        ))
+        last = queue.submit(lambda connection: connection.execute("INSERT INTO items VALUES ('c')"))
+        first.result(5)
+        last.result(5)
+        assert failing.exception(5) is not None
+    finally:
+        queue.close()
+    assert item_names(connections) == ["a", "c"]
+
+
+def test_flush_returns_false_when_timeout_expires(connections):
+    """flush() with a timeout gives up while the writer is still busy."""
+    queue = WriteBehindQueue(connections)
+    release = threading.Event()
+    try:
+        queue.submit(lambda connection: release.wait(5))
+        assert queue.flush(timeout=0.05) is False
+        release.set()
+        assert queue.flush(timeout=5) is True
+    finally:
+        release.set()
+        queue.close()
+
+
+class FakeRoot:
+    """
+    Stands in for the Tk root window and records which threads schedule callbacks.
+    """
+
+    def __init__(self):
+        """
+        Initializes the fake without scheduled callbacks.
+        """
+        self.scheduled = []
+        self.scheduling_threads = set()
+
+    def nametowidget(self, name):
+        """
+        Returns the fake itself as the root window.
+        """
+        return self
+
+    def after(self, delay_ms, callback, *args):
+        """
+        Records a callback instead of scheduling it on a main loop.
+        """
+        self.scheduling_threads.add(threading.current_thread())
+        self.scheduled.append((callback, args))
+
+    def run_pending(self):
+        """
+        Runs the recorded callbacks like the Tk main loop would.
+        """
+        while self.scheduled:
+            callback, args = self.scheduled.pop(0)
+            callback(*args)
+
+
+def test_run_when_done_never_calls_tk_from_the_writer_thread(connections):
+    """Finished writes are handed to the Tk thread through a queue that it polls."""
+    queue = WriteBehindQueue(connections)
+    root = FakeRoot()
+    results = []
+    try:
+        future = queue.submit(lambda connection: connection.execute("INSERT INTO items VALUES ('a')").rowcount)
+        run_when_done(root, future, results.append)
+        assert queue.flush(timeout=5)
+        root.run_pending()
+    finally:
+        queue.close()
+    assert results == [1]
+    assert root.scheduling_threads == {threading.main_thread()}
+    assert not future_callback_util._polling
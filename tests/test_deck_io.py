@@ -0,0 +1,67 @@
+import zipfile
+
+import pytest
+
+from models.module_model import Module
+from services.deck_io_service import DeckIOService
+from tests.conftest import resolve
+
+FLASHCARDS = [
+    ("Was ist eine Zelle?", "Die kleinste Einheit des Lebens"),
+    ('Was bedeutet "DNA", kurz?', "Desoxyribonukleinsäure\nTräger der Erbinformation"),
+    ("Ist <b>Fett</b> & Öl dasselbe?", "Nein, 5 < 7"),
+]
+
+
+def read_flashcards(db_service, module_id):
+    """
+    Returns the (question, answer) pairs of a module in ID order.
+    """
+    return [(flashcard.question, flashcard.answer) for flashcard in db_service.get_flashcards_by_module(module_id)]
+
+
+@pytest.mark.parametrize("file_format", DeckIOService.FORMATS)
+def test_export_and_import_round_trip(db_service, module_id, tmp_path, file_format):
+    """Quotes, separators, line breaks and markup survive an export and a re-import."""
+    resolve(db_service.add_flashcards(module_id, FLASHCARDS))
+    target_id = resolve(db_service.add_module("Kopie"))
+    path = str(tmp_path / f"deck.{file_format}")
+    service = DeckIOService(db_service, batch_size=2)
+    progress = []
+
+    assert service.export_module(Module(module_id, "Biologie"), path, progress=lambda *args: progress.append(args)) == 3
+    assert progress[-1] == (3, 3)
+    assert service.import_module(Module(target_id, "Kopie"), path) == 3
+    assert read_flashcards(db_service, target_id) == FLASHCARDS
+
+
+def test_malformed_rows_are_skipped(db_service, module_id, tmp_path):
+    """Short rows, empty fields and blank lines do not become flashcards."""
+    csv_path = tmp_path / "deck.csv"
+    csv_path.write_text("Frage,Antwort\nnur eine Spalte\n,leere Frage\n Gültig , Ja \n", encoding="utf-8")
+    jsonl_path = tmp_path / "deck.jsonl"
+    jsonl_path.write_text('\n{"question": "", "answer": "leer"}\n{"answer": "ohne Frage"}\n{"question": "Auch gültig", "answer": 1}\n',
+                          encoding="utf-8")
+    service = DeckIOService(db_service)
+
+    assert service.import_module(Module(module_id, "Biologie"), str(csv_path)) == 1
+    assert service.import_module(Module(module_id, "Biologie"), str(jsonl_path)) == 1
+    assert read_flashcards(db_service, module_id) == [("Gültig", "Ja"), ("Auch gültig", "1")]
+
+
+def test_unreadable_files_are_rejected(db_service, module_id, tmp_path):
+    """Invalid JSON, archives without a collection and unknown formats raise a ValueError."""
+    jsonl_path = tmp_path / "deck.jsonl"
+    jsonl_path.write_text('{"question": "A", "answer": "B"}\n{kaputt\n', encoding="utf-8")
+    apkg_path = tmp_path / "deck.apkg"
+    with zipfile.ZipFile(apkg_path, "w") as archive:
+        archive.writestr("media", "{}")
+    service = DeckIOService(db_service)
+    module = Module(module_id, "Biologie")
+
+    with pytest.raises(ValueError, match="Zeile 2"):
+        service.import_module(module, str(jsonl_path))
+    with pytest.raises(ValueError, match="Anki-Sammlung"):
+        service.import_module(module, str(apkg_path))
+    with pytest.raises(ValueError, match="Dateiformat"):
+        service.import_module(module, str(tmp_path / "deck.txt"))
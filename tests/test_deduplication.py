@@ -0,0 +1,80 @@
+import sqlite3
+
+import pytest
+
+from models.module_model import Module
+from services.database_service import ON_DUPLICATE_ERROR, ON_DUPLICATE_UPDATE
+from services.deck_io_service import DeckIOService
+from tests.conftest import resolve
+from utils.text_normalization import flashcard_content_hash, normalize_text
+
+
+def test_normalization_ignores_case_spacing_and_unicode_forms():
+    """Texts that only differ in case, whitespace or Unicode composition hash equally."""
+    assert normalize_text("  Was  ist\nDNA? ") == "was ist dna?"
+    assert flashcard_content_hash("Straße", "Ａntwort") == flashcard_content_hash("STRASSE", "antwort")
+    assert flashcard_content_hash("Frage", "Antwort") != flashcard_content_hash("Antwort", "Frage")
+
+
+def test_bulk_insert_skips_existing_and_repeated_flashcards(db_service, module_id):
+    """Duplicates of stored flashcards and duplicates within the batch are skipped."""
+    [existing_id] = resolve(db_service.add_flashcards(module_id, [("Was ist DNA?", "Erbgut")]))
+
+    inserted_ids = resolve(db_service.add_flashcards(module_id, [
+        ("was ist  dna?", "ERBGUT"),
+        ("Was ist RNA?", "Botenstoff"),
+        ("Was ist RNA?", "Botenstoff"),
+    ]))
+
+    flashcards = db_service.get_flashcards_by_module(module_id)
+    assert len(inserted_ids) == 1
+    assert [flashcard.id for flashcard in flashcards] == [existing_id] + inserted_ids
+
+
+def test_duplicates_are_allowed_in_other_modules(db_service, module_id):
+    """The content hash is unique per module only."""
+    other_module_id = resolve(db_service.add_module("Chemie"))
+    resolve(db_service.add_flashcard(module_id, "Was ist pH?", "Säuregrad"))
+    assert resolve(db_service.add_flashcards(other_module_id, [("Was ist pH?", "Säuregrad")]))
+
+
+def test_single_insert_returns_existing_id_or_raises(db_service, module_id):
+    """add_flashcard returns the ID of the existing copy, or raises on request."""
+    flashcard_id = resolve(db_service.add_flashcard(module_id, "Was ist ATP?", "Energieträger"))
+    assert resolve(db_service.add_flashcard(module_id, "was ist atp?", "energieträger")) == flashcard_id
+
+    with pytest.raises(sqlite3.IntegrityError):
+        resolve(db_service.add_flashcard(module_id, "Was ist ATP?", "Energieträger", on_duplicate=ON_DUPLICATE_ERROR))
+
+
+def test_update_mode_overwrites_the_existing_texts(db_service, module_id):
+    """ON_DUPLICATE_UPDATE keeps the flashcard ID and stores the new spelling."""
+    flashcard_id = resolve(db_service.add_flashcard(module_id, "was ist atp?", "energieträger"))
+    assert resolve(db_service.add_flashcard(
+        module_id, "Was ist ATP?", "Energieträger", on_duplicate=ON_DUPLICATE_UPDATE
+    )) == flashcard_id
+
+    flashcard = db_service.get_flashcard(flashcard_id)
+    assert (flashcard.question, flashcard.answer) == ("Was ist ATP?", "Energieträger")
+
+
+def test_edit_into_a_duplicate_is_rejected(db_service, module_id):
+    """Editing a flashcard into the texts of another one raises instead of merging them."""
+    resolve(db_service.add_flashcard(module_id, "Was ist ATP?", "Energieträger"))
+    other_id = resolve(db_service.add_flashcard(module_id, "Was ist ADP?", "Entladen"))
+
+    with pytest.raises(sqlite3.IntegrityError):
+        resolve(db_service.update_flashcard(other_id, "Was ist ATP?", "Energieträger"))
+    assert db_service.get_flashcard(other_id).question == "Was ist ADP?"
+
+
+def test_reimporting_an_export_adds_nothing(db_service, module_id, tmp_path):
+    """Importing a deck into the module it came from skips every flashcard."""
+    resolve(db_service.add_flashcards(module_id, [("Was ist DNA?", "Erbgut"), ("Was ist RNA?", "Botenstoff")]))
+    module = Module(module_id, "Biologie")
+    service = DeckIOService(db_service)
+    for file_format in DeckIOService.FORMATS:
+        path = str(tmp_path / f"deck.{file_format}")
+        service.export_module(module, path)
+        assert service.import_module(module, path) == 0
+    assert db_service.count_flashcards(module_id) == 2
@@ -0,0 +1,102 @@
+import json
+
+import pytest
+
+from services.chatgpt_service import (
+    ChatGPTService, FlashcardStreamParser, JsonFlashcardStreamParser, parse_json_flashcards
+)
+from services.config_service import ConfigService
+
+TEXT_RESPONSE = (
+    "Frage: Was ist eine Zelle?\nAntwort: Die kleinste Einheit des Lebens.\n\n"
+    "Einleitung ohne Karteikarte\n\n"
+    "Frage: Was ist ein Gen?\nAntwort:\n- Abschnitt der DNA\n- Bauanleitung für ein Protein\n\n"
+    "Frage: Was ist ein Ribosom?\nAntwort: Ort der Proteinsynthese"
+)
+
+JSON_RESPONSE = json.dumps({"flashcards": [
+    {"question": "Was ist {JSON}?", "answer": "Ein \"Format\" mit [Klammern]", "example": "{\"a\": 1}"},
+    {"question": "Was ist ein Backslash?", "answer": "Das Zeichen \\", "example": ""},
+    {"question": "Was ist Unicode?", "answer": "Ein Zeichensatz für ü und €", "example": "ü"},
+]}, ensure_ascii=False)
+
+
+def feed_in_pieces(parser, text, size):
+    """
+    Feeds a text to a stream parser in pieces of a fixed size and closes it.
+
+    Args:
+        parser: A ``FlashcardStreamParser`` or ``JsonFlashcardStreamParser``.
+        text (str): The complete response.
+        size (int): The length of the pieces.
+
+    Returns:
+        list: All flashcards returned by the parser.
+    """
+    flashcards = []
+    for start in range(0, len(text), size):
+        flashcards.extend(parser.feed(text[start:start + size]))
+    return flashcards + parser.close()
+
+
+@pytest.fixture
+def chatgpt_service(tmp_path):
+    """
+    Returns a service with a dummy API key that never calls the API.
+    """
+    service = ChatGPTService(config_service=ConfigService(str(tmp_path / "config.json")), api_key="sk-test")
+    yield service
+    service.client_factory.close()
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, 64, len(TEXT_RESPONSE)])
+def test_text_stream_parser_matches_parsing_the_whole_text(chatgpt_service, size):
+    """Any split of the stream yields the flashcards of the complete text."""
+    expected = chatgpt_service.parse_flashcards(TEXT_RESPONSE)
+    assert [flashcard['question'] for flashcard in expected] == [
+        "Was ist eine Zelle?", "Was ist ein Gen?", "Was ist ein Ribosom?"
+    ]
+    assert feed_in_pieces(FlashcardStreamParser(), TEXT_RESPONSE, size) == expected
+
+
+def test_text_stream_parser_emits_flashcards_as_soon_as_they_are_complete():
+    """A flashcard is returned once the blank line after it arrives."""
+    parser = FlashcardStreamParser()
+    assert parser.feed("Frage: A?\nAntwort: B") == []
+    assert parser.feed("\n\nFrage: C?") == [{'question': "A?", 'answer': "B"}]
+
+
+@pytest.mark.parametrize("size", [1, 3, 16, len(JSON_RESPONSE)])
+def test_json_stream_parser_matches_decoding_the_whole_response(size):
+    """Quotes, braces and escapes inside strings do not confuse the incremental scan."""
+    expected = parse_json_flashcards(JSON_RESPONSE)
+    assert expected[0] == {'question': "Was ist {JSON}?", 'answer': "Ein \"Format\" mit [Klammern]\nBeispiel: {\"a\": 1}"}
+    assert expected[1]['answer'] == "Das Zeichen \\"
+    assert feed_in_pieces(JsonFlashcardStreamParser(), JSON_RESPONSE, size) == expected
+
+
+def test_json_stream_parser_drops_an_unfinished_flashcard():
+    """A response cut off by the token limit keeps its complete flashcards."""
+    truncated = JSON_RESPONSE[:JSON_RESPONSE.index("Was ist Unicode")]
+    flashcards = feed_in_pieces(JsonFlashcardStreamParser(), truncated, 5)
+    assert [flashcard['question'] for flashcard in flashcards] == ["Was ist {JSON}?", "Was ist ein Backslash?"]
+
+
+def test_invalid_json_items_are_skipped():
+    """Items that miss a field or have the wrong types are ignored."""
+    response = json.dumps({"flashcards": [
+        {"question": "Gültig?", "answer": "Ja", "example": ""},
+        {"question": "", "answer": "Leere Frage", "example": ""},
+        {"question": "Zahl?", "answer": 42, "example": ""},
+        "kein Objekt",
+    ]})
+    assert parse_json_flashcards(response) == [{'question': "Gültig?", 'answer': "Ja"}]
+    assert parse_json_flashcards("Frage: A?\nAntwort: B") is None
+
+
+def test_parse_response_falls_back_to_the_text_format(chatgpt_service):
+    """Structured mode still reads truncated JSON and older text responses from the cache."""
+    assert chatgpt_service.parse_response(JSON_RESPONSE) == parse_json_flashcards(JSON_RESPONSE)
+    truncated = JSON_RESPONSE[:JSON_RESPONSE.index("Was ist Unicode")]
+    assert len(chatgpt_service.parse_response(truncated)) == 2
+    assert chatgpt_service.parse_response(TEXT_RESPONSE) == chatgpt_service.parse_flashcards(TEXT_RESPONSE)
@@ -0,0 +1,131 @@
+import threading
+
+import pytest
+
+from models.module_model import Flashcard, FlashcardPreview
+from services.flashcard_deck import FlashcardDeck
+from services.identity_map import IdentityMap
+from tests.conftest import resolve
+
+
+def add_numbered_flashcards(db_service, module_id, count):
+    """
+    Adds flashcards with distinct texts to a module.
+
+    Returns:
+        List[int]: The IDs of the new flashcards in insertion order.
+    """
+    return resolve(db_service.add_flashcards(module_id, [(f"Frage {index}", f"Antwort {index}") for index in range(count)]))
+
+
+class PageRecorder:
+    """
+    Wraps a database service and signals when a page after the first one is requested.
+    """
+
+    def __init__(self, db_service):
+        """
+        Initializes the recorder.
+
+        Args:
+            db_service (DatabaseService): The service that serves the pages.
+        """
+        self.db_service = db_service
+        self.next_page_requested = threading.Event()
+
+    def get_flashcard_page(self, module_id, after_id=0, page_size=500):
+        """
+        Records the request and returns the page from the wrapped service.
+        """
+        if after_id:
+            self.next_page_requested.set()
+        return self.db_service.get_flashcard_page(module_id, after_id, page_size)
+
+
+def test_pages_follow_the_id_keyset(db_service, module_id):
+    """Each page continues after the last ID of the previous one and skips other modules."""
+    other_module_id = resolve(db_service.add_module("Chemie"))
+    ids = add_numbered_flashcards(db_service, module_id, 4)
+    add_numbered_flashcards(db_service, other_module_id, 3)  # IDs between the pages of the first module
+    ids += resolve(db_service.add_flashcards(module_id, [("Frage 4", "Antwort 4"), ("Frage 5", "Antwort 5")]))
+
+    assert [flashcard.id for flashcard in db_service.get_flashcard_page(module_id, page_size=4)] == ids[:4]
+    assert [flashcard.id for flashcard in db_service.get_flashcard_page(module_id, ids[3], page_size=4)] == ids[4:]
+    assert [flashcard.id for flashcard in db_service.iter_flashcards(module_id, page_size=2)] == ids
+
+
+@pytest.mark.parametrize("prefetch", [True, False], ids=["prefetch", "no_prefetch"])
+def test_deck_walks_every_page(db_service, module_id, prefetch):
+    """The deck yields all flashcards page by page and in shuffled order."""
+    ids = add_numbered_flashcards(db_service, module_id, 7)
+    deck = FlashcardDeck(db_service, module_id, page_size=3, prefetch=prefetch)
+
+    assert [[flashcard.id for flashcard in page] for page in deck.pages()] == [ids[:3], ids[3:6], ids[6:]]
+    assert [flashcard.id for flashcard in deck] == ids
+    assert sorted(flashcard.id for flashcard in deck.shuffled(buffer_size=2)) == ids
+
+
+def test_deck_fetches_the_next_page_while_the_current_one_is_used(db_service, module_id):
+    """The second page is requested before the caller asks for it."""
+    add_numbered_flashcards(db_service, module_id, 4)
+    recorder = PageRecorder(db_service)
+    pages = FlashcardDeck(recorder, module_id, page_size=2).pages()
+
+    assert len(next(pages)) == 2
+    assert recorder.next_page_requested.wait(5)
+    assert len(next(pages)) == 2
+
+
+def test_existence_counts_and_module_stats(db_service, module_id):
+    """Empty modules report no flashcards and appear in the statistics with zero."""
+    empty_module_id = resolve(db_service.add_module("Leer"))
+    add_numbered_flashcards(db_service, module_id, 3)
+    db_service.flush()
+
+    assert db_service.has_flashcards(module_id) and not db_service.has_flashcards(empty_module_id)
+    assert (db_service.count_flashcards(module_id), db_service.count_flashcards(empty_module_id)) == (3, 0)
+    assert db_service.module_stats() == {module_id: 3, empty_module_id: 0}
+
+
+def test_flashcard_lookups_are_served_from_the_identity_map(db_service, module_id):
+    """Repeated lookups return the same object until the flashcard changes."""
+    [flashcard_id] = add_numbered_flashcards(db_service, module_id, 1)
+    flashcard = db_service.get_flashcard(flashcard_id)
+    assert db_service.get_flashcard(flashcard_id) is flashcard
+
+    resolve(db_service.update_flashcard(flashcard_id, "Neue Frage", "Neue Antwort"))
+    db_service.flush()
+    updated = db_service.get_flashcard(flashcard_id)
+    assert updated is not flashcard and updated.question == "Neue Frage"
+
+    resolve(db_service.delete_flashcard(flashcard_id))
+    db_service.flush()
+    assert db_service.get_flashcard(flashcard_id) is None
+
+
+def test_identity_map_rejects_stale_loads_and_evicts_the_least_recently_used():
+    """A load that raced with an invalidation is not stored; the oldest entry makes room."""
+    identity_map = IdentityMap(max_size=2)
+    generation = identity_map.generation
+    identity_map.discard(1)
+    identity_map.put(1, "veraltet", generation)
+    assert identity_map.get(1) is None
+
+    for key in (1, 2):
+        identity_map.put(key, f"Karte {key}", identity_map.generation)
+    identity_map.get(1)
+    identity_map.put(3, "Karte 3", identity_map.generation)
+    assert [identity_map.get(key) for key in (1, 2, 3)] == ["Karte 1", None, "Karte 3"]
+
+
+def test_row_factories_build_slotted_models_and_previews(db_service, module_id):
+    """Full rows become slotted models; previews only carry the leading characters."""
+    flashcard_id = resolve(db_service.add_flashcard(module_id, "F" * 50, "A" * 80))
+
+    [flashcard] = db_service.get_flashcard_page(module_id)
+    assert isinstance(flashcard, Flashcard) and not hasattr(flashcard, "__dict__")
+    assert (flashcard.id, flashcard.module_id, flashcard.answer) == (flashcard_id, module_id, "A" * 80)
+    assert db_service.get_flashcard_previews(module_id, question_length=10, answer_length=20) == [
+        FlashcardPreview(flashcard_id, "F" * 10, "A" * 20)
+    ]
+    assert [(module.id, module.name) for module in db_service.get_all_modules()] == [(module_id, "Biologie")]
@@ -0,0 +1,130 @@
+import time
+
+from services.database_service import DatabaseService, JOB_DONE, JOB_FAILED, JOB_PENDING, JOB_RUNNING
+from services.generation_job_service import GenerationJobService
+from services.generation_pipeline import GenerationPipeline
+from services.retry_policy import CircuitOpenError
+from tests.conftest import resolve
+
+
+class FakeChatGPTService:
+    """
+    Generates one flashcard per chunk without calling the API.
+    """
+
+    def __init__(self, failing_texts=(), unavailable_texts=()):
+        """
+        Initializes the fake.
+
+        Args:
+            failing_texts (Iterable[str]): Chunks whose generation fails.
+            unavailable_texts (Iterable[str]): Chunks whose generation finds the circuit breaker open.
+        """
+        self.failing_texts = set(failing_texts)
+        self.unavailable_texts = set(unavailable_texts)
+        self.calls = []
+
+    def generate_flashcards(self, text_section, use_cache=True, card_count=10):
+        """
+        Returns a flashcard for the chunk, or raises the configured error.
+        """
+        self.calls.append(text_section)
+        if text_section in self.failing_texts:
+            raise RuntimeError("kaputt")
+        if text_section in self.unavailable_texts:
+            raise CircuitOpenError(60.0)
+        return [{'question': f"Frage zu {text_section}?", 'answer': "Antwort"}]
+
+
+def start_service(db_service, chatgpt_service):
+    """
+    Starts a job service whose pipeline is not slowed down by the rate limit.
+
+    Returns:
+        GenerationJobService: The running service.
+    """
+    service = GenerationJobService(db_service, chatgpt_service, max_workers=2, poll_interval=0.05)
+    service._pipeline = GenerationPipeline(chatgpt_service, requests_per_minute=60000)
+    service.start()
+    return service
+
+
+def wait_for(condition, timeout=5.0):
+    """
+    Polls a condition until it holds.
+
+    Raises:
+        AssertionError: If the condition does not hold within the timeout.
+    """
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("Zeitüberschreitung beim Warten auf die Aufträge")
+        time.sleep(0.02)
+
+
+def test_jobs_are_claimed_oldest_first_and_only_once(db_service, module_id):
+    """Each claim takes the oldest pending job and marks it running."""
+    first_id, second_id = resolve(db_service.add_generation_jobs(module_id, [("A", "Text A"), ("B", "Text B")]))
+
+    assert resolve(db_service.claim_generation_job()) == (first_id, module_id, "Text A", True)
+    assert resolve(db_service.claim_generation_job())[0] == second_id
+    assert resolve(db_service.claim_generation_job()) is None
+    assert db_service.count_generation_jobs() == {JOB_RUNNING: 2}
+
+
+def test_running_jobs_are_requeued_after_a_restart(db_path):
+    """Jobs that were running when the application closed are resumed by the next start."""
+    db_service = DatabaseService(db_path)
+    module_id = db_service.add_module("Biologie")
+    db_service.add_generation_jobs(module_id, [("A", "Text A"), ("B", "Text B")])
+    db_service.claim_generation_job()
+    db_service.close_connection()  # Closed while job A was running
+
+    db_service = DatabaseService(db_path)
+    chatgpt_service = FakeChatGPTService()
+    service = start_service(db_service, chatgpt_service)
+    try:
+        wait_for(lambda: db_service.count_generation_jobs() == {JOB_DONE: 2})
+    finally:
+        service.stop()
+        db_service.close_connection()
+    assert sorted(chatgpt_service.calls) == ["Text A", "Text B"]
+
+
+def test_workers_store_results_and_failures(db_service, module_id):
+    """Finished jobs keep their flashcards for review; failed jobs can be retried."""
+    chatgpt_service = FakeChatGPTService(failing_texts={"Text B"})
+    service = start_service(db_service, chatgpt_service)
+    try:
+        done_id, failed_id = resolve(service.submit(module_id, [("A", "Text A"), ("B", "Text B")]))
+        wait_for(lambda: db_service.count_generation_jobs() == {JOB_DONE: 1, JOB_FAILED: 1})
+
+        jobs = {job.id: job for job in db_service.get_generation_jobs()}
+        assert jobs[done_id].flashcard_count == 1
+        assert "kaputt" in jobs[failed_id].error
+        assert db_service.get_generation_job_flashcards(done_id) == [{'question': "Frage zu Text A?", 'answer': "Antwort"}]
+
+        chatgpt_service.failing_texts.clear()
+        assert resolve(service.retry([failed_id])) == 1
+        wait_for(lambda: db_service.count_generation_jobs() == {JOB_DONE: 2})
+    finally:
+        service.stop()
+
+
+def test_outage_puts_the_job_back_into_the_queue(db_service, module_id):
+    """An open circuit breaker does not fail the job; it waits as pending."""
+    chatgpt_service = FakeChatGPTService(unavailable_texts={"Text A"})
+    service = start_service(db_service, chatgpt_service)
+    try:
+        resolve(service.submit(module_id, [("A", "Text A")]))
+        wait_for(lambda: chatgpt_service.calls and db_service.count_generation_jobs() == {JOB_PENDING: 1})
+    finally:
+        service.stop()
+
+
+def test_deleting_the_module_deletes_its_jobs(db_service, module_id):
+    """Jobs of a deleted module are removed by the foreign key."""
+    resolve(db_service.add_generation_jobs(module_id, [("A", "Text A")]))
+    resolve(db_service.delete_module_with_flashcards(module_id))
+    assert db_service.count_generation_jobs() == {}
@@ -0,0 +1,106 @@
+import sqlite3
+
+import pytest
+
+from services.database_service import DatabaseService
+from services.migrations import MIGRATIONS, apply_migrations, get_schema_version
+from utils.text_normalization import flashcard_content_hash
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def create_unversioned_database(path):
+    """
+    Creates a database with the schema the application used before migrations existed.
+
+    Args:
+        path (str): The database file.
+    """
+    connection = sqlite3.connect(path)
+    connection.execute("CREATE TABLE modules (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL)")
+    connection.execute('''
+        CREATE TABLE flashcards (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            module_id INTEGER NOT NULL,
+            question TEXT NOT NULL,
+            answer TEXT NOT NULL,
+            FOREIGN KEY (module_id) REFERENCES modules(id) ON DELETE CASCADE
+        )
+    ''')
+    connection.execute("INSERT INTO modules (name) VALUES ('Chemie')")
+    connection.executemany(
+        "INSERT INTO flashcards (module_id, question, answer) VALUES (1, ?, ?)",
+        [
+            ("Was ist Wasser?", "H2O"),
+            ("Was ist  wasser?", "h2o"),  # Duplicate of the first after normalization
+            ("Was ist Salz?", "NaCl"),
+        ]
+    )
+    connection.commit()
+    connection.close()
+
+
+def test_fresh_database_is_migrated_to_latest_version(db_path):
+    """A new database file gets every migration."""
+    service = DatabaseService(db_path)
+    try:
+        with service.connections.read() as connection:
+            assert get_schema_version(connection) == LATEST_VERSION
+    finally:
+        service.close_connection()
+
+
+def test_unversioned_database_is_upgraded_without_losing_flashcards(db_path):
+    """A database of the old schema keeps its data and gains the new tables and columns."""
+    create_unversioned_database(db_path)
+
+    service = DatabaseService(db_path)
+    try:
+        with service.connections.read() as connection:
+            assert get_schema_version(connection) == LATEST_VERSION
+            rows = connection.execute("SELECT id, question, answer, content_hash FROM flashcards ORDER BY id").fetchall()
+            review_states = connection.execute("SELECT COUNT(*) FROM review_state").fetchone()[0]
+            indexes = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+
+        # The duplicate is removed, the oldest copy is kept, and hashes are backfilled
+        assert [(flashcard_id, question) for flashcard_id, question, _, _ in rows] == [
+            (1, "Was ist Wasser?"), (3, "Was ist Salz?")
+        ]
+        assert all(content_hash == flashcard_content_hash(question, answer) for _, question, answer, content_hash in rows)
+        assert review_states == 2  # Existing flashcards are due right away
+        assert {"idx_flashcards_module_id", "idx_flashcards_module_content_hash"} <= indexes
+        assert [result.id for result in service.search("Salz")] == [3]  # Existing flashcards are indexed
+    finally:
+        service.close_connection()
+
+
+def test_migrations_run_once(db_path):
+    """Reopening a migrated database does not run any step again."""
+    calls = []
+    migrations = [(1, "create table", lambda connection: calls.append(1) or connection.execute("CREATE TABLE t (x)"))]
+
+    connection = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        assert apply_migrations(connection, migrations) == 1
+        assert apply_migrations(connection, migrations) == 1
+    finally:
+        connection.close()
+    assert calls == [1]
+
+
+def test_failed_migration_is_rolled_back(db_path):
+    """A failing step leaves neither its changes nor its version entry behind."""
+    def failing_step(connection):
+        connection.execute("CREATE TABLE half_done (x)")
+        raise RuntimeError("Abbruch")
+
+    migrations = [(1, "create table", lambda connection: connection.execute("CREATE TABLE t (x)")), (2, "fails", failing_step)]
+    connection = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        with pytest.raises(RuntimeError):
+            apply_migrations(connection, migrations)
+        assert get_schema_version(connection) == 1
+        tables = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    finally:
+        connection.close()
+    assert "t" in tables and "half_done" not in tables
@@ -0,0 +1,30 @@
+from services.openai_client_factory import OpenAIClientFactory
+
+
+def test_clients_are_reused_and_share_one_connection_pool():
+    """Each API key gets one client; all clients send through the factory's httpx client."""
+    factory = OpenAIClientFactory()
+    try:
+        client = factory.get_client("sk-eins")
+        assert factory.get_client("sk-eins") is client
+        other_client = factory.get_client("sk-zwei")
+        assert other_client is not client
+        assert client._client is other_client._client is factory.http_client
+        assert client.max_retries == 0
+    finally:
+        factory.close()
+
+
+def test_close_closes_the_pool():
+    """Closing the factory closes the pooled connections."""
+    factory = OpenAIClientFactory()
+    factory.get_client("sk-eins")
+    factory.close()
+    assert factory.http_client.is_closed
+
+
+def test_endpoints_have_their_own_timeouts():
+    """Streaming waits less per chunk than a full completion; connecting is always short."""
+    assert OpenAIClientFactory.timeout("chat").read == 60.0
+    assert OpenAIClientFactory.timeout("chat_stream").read == 30.0
+    assert OpenAIClientFactory.timeout("warm_up").connect == 5.0
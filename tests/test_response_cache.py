@@ -0,0 +1,82 @@
+import pytest
+
+from services import response_cache_service
+from services.response_cache_service import ResponseCacheService
+
+
+class FakeTime:
+    """
+    Replaces ``time.time`` of the cache module with a manual clock.
+    """
+
+    def __init__(self):
+        """
+        Initializes the clock at a fixed timestamp.
+        """
+        self.now = 1_700_000_000.0
+
+    def time(self):
+        """
+        Returns the current time of the clock.
+        """
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """
+    Returns the fake clock used by the cache module during the test.
+    """
+    fake = FakeTime()
+    monkeypatch.setattr(response_cache_service.time, "time", fake.time)
+    return fake
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    """
+    Returns the path of a cache database in a fresh temporary directory.
+    """
+    return str(tmp_path / "response_cache.db")
+
+
+def test_make_key_is_stable_and_covers_every_field():
+    """The key ignores the argument order but changes with any value."""
+    key = ResponseCacheService.make_key(model="gpt-4o-mini", prompt_version=2, temperature=0.2, text="Zelle")
+    assert key == ResponseCacheService.make_key(text="Zelle", temperature=0.2, prompt_version=2, model="gpt-4o-mini")
+    assert key != ResponseCacheService.make_key(model="gpt-4o-mini", prompt_version=2, temperature=0.3, text="Zelle")
+    assert key != ResponseCacheService.make_key(model="gpt-4o-mini", prompt_version=3, temperature=0.2, text="Zelle")
+    assert len(key) == 64
+
+
+def test_entries_expire_after_the_ttl(clock, cache_path):
+    """A response is served until its TTL has passed and then removed."""
+    cache = ResponseCacheService(cache_path, ttl_seconds=60)
+    try:
+        cache.put("a", "Antwort")
+        clock.now += 60
+        assert cache.get("a") == "Antwort"
+        clock.now += 1
+        assert cache.get("a") is None
+        assert cache.get("unbekannt") is None
+    finally:
+        cache.close()
+
+
+def test_least_recently_used_entries_are_evicted_and_the_rest_persists(clock, cache_path):
+    """Beyond max_entries the entry read longest ago goes; the others survive a restart."""
+    cache = ResponseCacheService(cache_path, max_entries=3)
+    for key in ("a", "b", "c"):
+        clock.now += 1
+        cache.put(key, f"Antwort {key}")
+    clock.now += 1
+    cache.get("a")
+    clock.now += 1
+    cache.put("d", "Antwort d")
+    cache.close()
+
+    cache = ResponseCacheService(cache_path, max_entries=3)
+    try:
+        assert [cache.get(key) for key in ("a", "b", "c", "d")] == ["Antwort a", None, "Antwort c", "Antwort d"]
+    finally:
+        cache.close()
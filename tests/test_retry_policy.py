@@ -0,0 +1,164 @@
+import httpx
+import openai
+import pytest
+
+from services import retry_policy
+from services.retry_policy import CircuitBreaker, CircuitOpenError, RetryPolicy
+
+REQUEST = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+
+
+def status_error(status_code, headers=None, code=None):
+    """
+    Builds the error the OpenAI client raises for an error response.
+
+    Args:
+        status_code (int): The HTTP status code.
+        headers (dict, optional): The response headers.
+        code (str, optional): The error code in the response body.
+
+    Returns:
+        openai.APIStatusError: The error.
+    """
+    response = httpx.Response(status_code, headers=headers, request=REQUEST)
+    body = {"code": code} if code else None
+    return openai.APIStatusError(f"Status {status_code}", response=response, body=body)
+
+
+class FakeClock:
+    """
+    Replaces ``time.sleep`` and ``time.monotonic`` of the retry module with a manual clock.
+    """
+
+    def __init__(self):
+        """
+        Initializes the clock at zero without sleeps.
+        """
+        self.now = 0.0
+        self.sleeps = []
+
+    def sleep(self, seconds):
+        """
+        Records a wait and advances the clock instead of blocking.
+        """
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    def monotonic(self):
+        """
+        Returns the current time of the clock.
+        """
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """
+    Returns the fake clock used by the retry module during the test.
+    """
+    fake = FakeClock()
+    monkeypatch.setattr(retry_policy.time, "sleep", fake.sleep)
+    monkeypatch.setattr(retry_policy.time, "monotonic", fake.monotonic)
+    return fake
+
+
+def failing_call(*errors, result="ok"):
+    """
+    Returns a function that raises the given errors in turn and then returns a result.
+    """
+    remaining = list(errors)
+    calls = []
+
+    def call():
+        calls.append(1)
+        if remaining:
+            raise remaining.pop(0)
+        return result
+
+    call.calls = calls
+    return call
+
+
+def test_transient_errors_are_retried_with_growing_jitter(clock):
+    """Connection errors and server errors are repeated; waits stay below the exponential bound."""
+    call = failing_call(openai.APIConnectionError(request=REQUEST), status_error(503), status_error(500))
+    policy = RetryPolicy(max_attempts=4, base_delay=0.5)
+
+    assert policy.call(call) == "ok"
+    assert len(call.calls) == 4
+    assert [wait <= 0.5 * 2 ** attempt for attempt, wait in enumerate(clock.sleeps)] == [True, True, True]
+
+
+def test_permanent_errors_are_raised_at_once(clock):
+    """Client errors and a used up quota are not repeated."""
+    for error in (status_error(400), status_error(401), status_error(429, code="insufficient_quota"), ValueError()):
+        call = failing_call(error)
+        with pytest.raises(type(error)):
+            RetryPolicy().call(call)
+        assert len(call.calls) == 1
+    assert clock.sleeps == []
+
+
+def test_gives_up_after_the_last_attempt(clock):
+    """The error of the last attempt is raised once max_attempts is reached."""
+    call = failing_call(*[status_error(502)] * 5)
+    with pytest.raises(openai.APIStatusError):
+        RetryPolicy(max_attempts=3).call(call)
+    assert len(call.calls) == 3
+    assert len(clock.sleeps) == 2
+
+
+@pytest.mark.parametrize("headers, expected", [
+    ({"retry-after-ms": "1500"}, 1.5),
+    ({"retry-after": "2"}, 2.0),
+])
+def test_retry_after_header_is_honoured(clock, headers, expected):
+    """A rate limit response's requested wait replaces the backoff."""
+    call = failing_call(status_error(429, headers))
+    RetryPolicy().call(call)
+    assert clock.sleeps == [expected]
+
+
+def test_too_long_retry_after_gives_up(clock):
+    """A wait beyond max_delay raises instead of blocking the caller."""
+    call = failing_call(status_error(429, {"retry-after": "120"}))
+    with pytest.raises(openai.APIStatusError):
+        RetryPolicy(max_delay=20.0).call(call)
+    assert clock.sleeps == []
+
+
+def test_breaker_opens_after_consecutive_failures_and_lets_one_trial_through(clock):
+    """The open breaker fails fast until the reset timeout, then a successful trial closes it."""
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30.0)
+    policy = RetryPolicy(max_attempts=1, circuit_breaker=breaker)
+
+    for _ in range(3):
+        with pytest.raises(openai.APIStatusError):
+            policy.call(failing_call(status_error(503)))
+
+    call = failing_call()
+    with pytest.raises(CircuitOpenError) as error:
+        policy.call(call)
+    assert call.calls == [] and error.value.retry_in == 30.0
+
+    clock.now += 30.0
+    breaker.before_call()  # The trial call
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # Only one trial at a time
+    breaker.record_success()
+    assert policy.call(call) == "ok"
+
+
+def test_failed_trial_reopens_the_breaker(clock):
+    """A trial that fails keeps the breaker open for another period."""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10.0)
+    policy = RetryPolicy(max_attempts=1, circuit_breaker=breaker)
+    with pytest.raises(openai.APIStatusError):
+        policy.call(failing_call(status_error(503)))
+
+    clock.now += 10.0
+    with pytest.raises(openai.APIStatusError):
+        policy.call(failing_call(status_error(503)))
+    with pytest.raises(CircuitOpenError) as error:
+        policy.call(failing_call())
+    assert error.value.retry_in == 10.0
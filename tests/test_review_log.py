@@ -0,0 +1,94 @@
+from models.module_model import ReviewEvent, ReviewStats
+from services.review_log_service import REVIEW_MODE_INTERACTIVE, REVIEW_MODE_NORMAL, ReviewLogService
+from services.review_scheduler import RATING_AGAIN, RATING_EASY, RATING_GOOD, RATING_HARD
+from tests.conftest import resolve
+
+NOW = 1_700_000_000.0
+
+
+def count_log_rows(db_service):
+    """
+    Returns the number of rows in the review log.
+    """
+    with db_service.connections.read() as connection:
+        return connection.execute("SELECT COUNT(*) FROM review_log").fetchone()[0]
+
+
+def test_answers_are_buffered_until_the_batch_is_full(db_service, module_id):
+    """Nothing is written before batch_size answers; flush() writes the rest."""
+    flashcard_id = resolve(db_service.add_flashcard(module_id, "F1", "A1"))
+    flashcard = db_service.get_flashcard(flashcard_id)
+    review_log = ReviewLogService(db_service, batch_size=3)
+
+    assert review_log.log(flashcard, REVIEW_MODE_NORMAL, RATING_GOOD) is None
+    assert review_log.log(flashcard, REVIEW_MODE_INTERACTIVE, RATING_AGAIN, latency_ms=800) is None
+    assert count_log_rows(db_service) == 0
+
+    assert resolve(review_log.log(flashcard, REVIEW_MODE_NORMAL, RATING_EASY, latency_ms=200)) == 3
+    assert resolve(review_log.log(flashcard, REVIEW_MODE_NORMAL, RATING_GOOD)) is None
+    assert resolve(review_log.flush()) == 1
+    assert review_log.flush() is None
+    assert count_log_rows(db_service) == 4
+
+    stats = db_service.get_card_review_stats(flashcard_id)
+    assert (stats.reviews, stats.correct, stats.total_latency_ms) == (4, 3, 1000)
+    assert db_service.get_module_review_stats(module_id).reviews == 4
+
+
+def test_statistics_are_running_sums_across_batches(db_service, module_id):
+    """Each batch is added to the stored totals, and the latest answer decides last_rating."""
+    first_id, second_id = resolve(db_service.add_flashcards(module_id, [("F1", "A1"), ("F2", "A2")]))
+    resolve(db_service.add_review_events([
+        ReviewEvent(first_id, module_id, REVIEW_MODE_NORMAL, RATING_GOOD, 100, 1, NOW + 10),
+        ReviewEvent(first_id, module_id, REVIEW_MODE_NORMAL, RATING_AGAIN, 300, 1, NOW),  # Older, logged later
+        ReviewEvent(second_id, module_id, REVIEW_MODE_NORMAL, RATING_HARD, None, 1, NOW + 5),
+    ]))
+    resolve(db_service.add_review_events([
+        ReviewEvent(first_id, module_id, REVIEW_MODE_INTERACTIVE, RATING_EASY, 50, 2, NOW + 1),  # Still older
+    ]))
+
+    assert db_service.get_card_review_stats(first_id) == ReviewStats(3, 2, 450, RATING_GOOD, NOW + 10)
+    assert db_service.get_card_review_stats(second_id) == ReviewStats(1, 1, 0, RATING_HARD, NOW + 5)
+    assert db_service.get_module_review_stats(module_id) == ReviewStats(4, 3, 450, RATING_GOOD, NOW + 10)
+
+    resolve(db_service.add_review_events([
+        ReviewEvent(second_id, module_id, REVIEW_MODE_NORMAL, RATING_AGAIN, 20, 1, NOW + 20),
+    ]))
+    assert db_service.get_module_review_stats(module_id) == ReviewStats(5, 3, 470, RATING_AGAIN, NOW + 20)
+
+
+def test_deleting_flashcards_and_modules_removes_their_statistics(db_service, module_id):
+    """The statistics and the log follow their flashcard and module by cascade."""
+    first_id, second_id = resolve(db_service.add_flashcards(module_id, [("F1", "A1"), ("F2", "A2")]))
+    resolve(db_service.add_review_events([
+        ReviewEvent(first_id, module_id, REVIEW_MODE_NORMAL, RATING_GOOD, 100, 1, NOW),
+        ReviewEvent(second_id, module_id, REVIEW_MODE_NORMAL, RATING_GOOD, 100, 1, NOW),
+    ]))
+
+    resolve(db_service.delete_flashcard(first_id))
+    assert db_service.get_card_review_stats(first_id) == ReviewStats(0, 0, 0, None, None)
+    assert db_service.get_card_review_stats(second_id).reviews == 1
+    assert db_service.get_module_review_stats(module_id).reviews == 2  # Past answers still count for the module
+
+    resolve(db_service.delete_module_with_flashcards(module_id))
+    assert db_service.get_card_review_stats(second_id).reviews == 0
+    assert db_service.get_module_review_stats(module_id).reviews == 0
+    assert count_log_rows(db_service) == 0
+
+
+def test_answers_of_a_module_deleted_before_the_flush_are_dropped(db_service, module_id):
+    """A buffered answer whose module is gone does not fail the other answers of the batch."""
+    kept_module_id = resolve(db_service.add_module("Chemie"))
+    deleted_id = resolve(db_service.add_flashcard(module_id, "F1", "A1"))
+    kept_id = resolve(db_service.add_flashcard(kept_module_id, "F2", "A2"))
+    review_log = ReviewLogService(db_service)
+    review_log.log(db_service.get_flashcard(deleted_id), REVIEW_MODE_NORMAL, RATING_GOOD)
+    review_log.log(db_service.get_flashcard(kept_id), REVIEW_MODE_NORMAL, RATING_GOOD)
+
+    resolve(db_service.delete_module_with_flashcards(module_id))
+
+    assert resolve(review_log.flush()) == 1
+    assert count_log_rows(db_service) == 1
+    assert db_service.get_card_review_stats(kept_id).reviews == 1
+    assert db_service.get_module_review_stats(kept_module_id).reviews == 1
+    assert db_service.get_module_review_stats(module_id).reviews == 0
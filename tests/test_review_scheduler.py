@@ -0,0 +1,118 @@
+import pytest
+
+from models.module_model import Flashcard, ReviewState
+from services.review_scheduler import (
+    DueQueue, MIN_EASE, RATING_AGAIN, RATING_EASY, RATING_GOOD, RELEARN_DELAY_SECONDS, SECONDS_PER_DAY,
+    schedule_review
+)
+from tests.conftest import resolve
+
+NOW = 1_700_000_000.0
+
+
+def test_remembered_flashcard_intervals_grow():
+    """Intervals are 1 day, 6 days and then multiplied by the ease factor."""
+    state = ReviewState(1, 1, NOW)
+    intervals = []
+    for _ in range(4):
+        state = schedule_review(state, RATING_GOOD, now=NOW)
+        intervals.append(state.interval_days)
+    assert intervals == [1.0, 6.0, 15.0, 38.0]
+    assert state.repetitions == 4
+    assert state.due_at == NOW + 38.0 * SECONDS_PER_DAY
+
+
+def test_forgotten_flashcard_is_relearned_and_counts_a_lapse():
+    """A forgotten flashcard restarts its repetitions and comes back after the relearn delay."""
+    learned = ReviewState(1, 1, NOW, ease=2.5, interval_days=6.0, repetitions=2)
+    state = schedule_review(learned, RATING_AGAIN, now=NOW)
+    assert (state.repetitions, state.lapses, state.interval_days) == (0, 1, 0.0)
+    assert state.due_at == NOW + RELEARN_DELAY_SECONDS
+    assert state.ease < learned.ease
+
+    # Forgetting a flashcard that was never learned is no lapse
+    assert schedule_review(ReviewState(1, 1, NOW), RATING_AGAIN, now=NOW).lapses == 0
+
+
+def test_ease_is_adjusted_and_bounded():
+    """Easy answers raise the ease factor, failures lower it down to the minimum."""
+    assert schedule_review(ReviewState(1, 1, NOW), RATING_EASY, now=NOW).ease == pytest.approx(2.6)
+    state = ReviewState(1, 1, NOW)
+    for _ in range(10):
+        state = schedule_review(state, RATING_AGAIN, now=NOW)
+    assert state.ease == MIN_EASE
+
+
+class FakeDueSource:
+    """
+    Serves due flashcards from a list like ``DatabaseService.get_due_flashcards``.
+    """
+
+    def __init__(self, due):
+        """
+        Initializes the source.
+
+        Args:
+            due (list): (due_at, flashcard_id) pairs.
+        """
+        self.rows = [(due_at, Flashcard(flashcard_id, 1, f"F{flashcard_id}", "A")) for due_at, flashcard_id in sorted(due)]
+        self.queries = 0
+
+    def get_due_flashcards(self, module_id, due_before, after_due_at, after_id, limit):
+        """
+        Returns one keyset page of the rows.
+        """
+        self.queries += 1
+        rows = [row for row in self.rows if row[0] <= due_before and (row[0], row[1].id) > (after_due_at, after_id)]
+        return rows[:limit]
+
+
+def test_due_queue_pops_in_due_order_across_batches():
+    """The heap is filled page by page and yields flashcards in order of due time and ID."""
+    source = FakeDueSource([(NOW - 10, 3), (NOW - 30, 1), (NOW - 20, 2), (NOW - 20, 5), (NOW + 10, 4)])
+    queue = DueQueue(source, 1, due_before=NOW, batch_size=2)
+
+    popped = []
+    while (flashcard := queue.pop(now=NOW)) is not None:
+        popped.append(flashcard.id)
+    assert popped == [1, 2, 5, 3]  # Flashcard 4 is not due yet
+    assert source.queries == 3
+
+
+def test_due_queue_merges_pushed_flashcards_into_the_order():
+    """A pushed-back flashcard comes after the flashcards that are due before it."""
+    source = FakeDueSource([(NOW - 10, 1), (NOW - 5, 2)])
+    queue = DueQueue(source, 1, due_before=NOW)
+    forgotten = Flashcard(9, 1, "F9", "A")
+    queue.push(forgotten, NOW - 7)
+
+    assert [queue.pop().id for _ in range(3)] == [1, 9, 2]
+    assert queue.pop() is None
+
+
+def test_due_queue_returns_pushed_flashcards_once_they_are_due():
+    """A pushed-back flashcard is merged into the order and waits until its due time."""
+    source = FakeDueSource([(NOW - 10, 1), (NOW + 5, 2)])
+    queue = DueQueue(source, 1, due_before=NOW + 5)
+    forgotten = Flashcard(9, 1, "F9", "A")
+    queue.push(forgotten, NOW + RELEARN_DELAY_SECONDS)
+
+    assert queue.pop(now=NOW).id == 1
+    assert queue.pop(now=NOW) is None  # Flashcard 2 is due in 5 seconds
+    assert queue.pop(now=NOW + 5).id == 2
+    assert queue.pop(now=NOW + 5) is None
+    assert queue.pop(now=NOW + RELEARN_DELAY_SECONDS) is forgotten
+
+
+def test_reviewed_flashcards_leave_the_due_queue(db_service, module_id):
+    """New flashcards are due right away; a remembered one is not due again until later."""
+    remembered_id, forgotten_id = resolve(db_service.add_flashcards(module_id, [("F1", "A1"), ("F2", "A2")]))
+    now = db_service.get_review_state(remembered_id).due_at
+
+    resolve(db_service.record_review(remembered_id, RATING_GOOD, reviewed_at=now))
+    resolve(db_service.record_review(forgotten_id, RATING_AGAIN, reviewed_at=now))
+
+    assert DueQueue(db_service, module_id, due_before=now).pop(now=now) is None
+    later = now + RELEARN_DELAY_SECONDS
+    assert DueQueue(db_service, module_id, due_before=later).pop(now=later).id == forgotten_id
+    assert db_service.count_due_flashcards(module_id, now + SECONDS_PER_DAY) == 2
@@ -0,0 +1,105 @@
+from services.database_service import DatabaseService
+from tests.conftest import resolve
+
+
+def test_search_follows_inserts_updates_and_deletes(db_service, module_id):
+    """The full-text index is kept in sync by triggers."""
+    [kept_id, changed_id] = resolve(db_service.add_flashcards(module_id, [
+        ("Was ist Photosynthese?", "Umwandlung von Lichtenergie"),
+        ("Was ist Osmose?", "Diffusion durch eine Membran"),
+    ]))
+    assert [result.id for result in db_service.search("photo")] == [kept_id]  # Prefix match, any case
+
+    resolve(db_service.update_flashcard(changed_id, "Was ist Zellatmung?", "Abbau von Glukose"))
+    assert db_service.search("Osmose") == []
+    assert [result.id for result in db_service.search("Glukose")] == [changed_id]
+
+    resolve(db_service.delete_flashcard(kept_id))
+    assert db_service.search("Photosynthese") == []
+
+
+def test_search_highlights_matches_and_filters_by_module(db_service, module_id):
+    """Results mark the matched terms and can be restricted to one module."""
+    other_module_id = resolve(db_service.add_module("Physik"))
+    resolve(db_service.add_flashcard(module_id, "Was ist Energie?", "Biologische Energie"))
+    resolve(db_service.add_flashcard(other_module_id, "Was ist Energie?", "Physikalische Energie"))
+
+    results = db_service.search("Energie", module_id=module_id)
+    assert [result.module_id for result in results] == [module_id]
+    assert results[0].question == "Was ist [Energie]?"
+
+
+def test_search_treats_query_syntax_literally(db_service, module_id):
+    """Characters with a meaning in FTS5 do not break the query."""
+    resolve(db_service.add_flashcard(module_id, "C++ oder C#?", "Beides"))
+    assert db_service.search('C++ "OR* NEAR(') == []
+    assert db_service.search("") == []
+
+
+def test_change_feed_collapses_changes_per_flashcard(db_service, module_id):
+    """Changes since a sequence number come back as the current state of each flashcard."""
+    [first_id, second_id] = resolve(db_service.add_flashcards(module_id, [("F1", "A1"), ("F2", "A2")]))
+    since = db_service.get_change_seq()
+
+    resolve(db_service.update_flashcard(first_id, "F1 neu", "A1"))
+    resolve(db_service.update_flashcard(first_id, "F1 neuer", "A1"))
+    resolve(db_service.delete_flashcards([second_id]))
+    [third_id] = resolve(db_service.add_flashcards(module_id, [("F3", "A3")]))
+    db_service.flush()  # Write-behind callbacks record the sequence number after the commit
+
+    latest, changes = db_service.get_flashcard_changes(module_id, since)
+    assert latest == db_service.get_change_seq() > since
+    assert [(change.id, change.question, change.deleted) for change in changes] == [
+        (first_id, "F1 neuer", False), (second_id, None, True), (third_id, "F3", False)
+    ]
+    assert db_service.get_flashcard_changes(module_id, latest) == (latest, [])
+
+
+def test_change_feed_asks_for_reload_after_pruning(db_service, module_id):
+    """A reader whose position was pruned from the feed gets None and has to reload."""
+    since = db_service.get_change_seq()
+    resolve(db_service.add_flashcards(module_id, [(f"F{index}", "A") for index in range(5)]))
+    db_service.flush()
+    db_service.prune_flashcard_changes(keep=2)
+
+    assert db_service.get_flashcard_changes(module_id, since) is None
+    latest = db_service.get_change_seq()
+    assert len(db_service.get_flashcard_changes(module_id, latest - 2)[1]) == 2
+
+
+def test_bulk_delete_is_reported_by_the_change_feed(db_service, module_id):
+    """Every flashcard of a bulk delete spanning several chunks shows up as deleted."""
+    flashcard_ids = resolve(db_service.add_flashcards(module_id, [(f"F{index}", "A") for index in range(600)]))
+    db_service.flush()
+    since = db_service.get_change_seq()
+
+    assert resolve(db_service.delete_flashcards(flashcard_ids[:550])) == 550
+    latest, changes = db_service.get_flashcard_changes(module_id, since, limit=1000)
+    assert [change.id for change in changes] == flashcard_ids[:550]
+    assert all(change.deleted for change in changes)
+    assert db_service.get_flashcard_changes(module_id, latest) == (latest, [])
+
+def test_change_seq_is_kept_in_memory(db_service, module_id, monkeypatch):
+    """Writes record the latest sequence number, so reading it does not query the database."""
+    resolve(db_service.add_flashcards(module_id, [("F1", "A1"), ("F2", "A2")]))
+    db_service.flush()
+    with db_service.connections.read() as connection:
+        stored = connection.execute("SELECT seq FROM sqlite_sequence WHERE name = 'flashcard_changes'").fetchone()[0]
+
+    monkeypatch.setattr(db_service.connections, "read", None)  # Any query would fail from here on
+    assert db_service.get_change_seq() == stored == 2
+
+
+def test_change_seq_is_restored_at_startup(db_path):
+    """A new service continues from the sequence number stored in the database."""
+    db_service = DatabaseService(db_path)
+    module_id = db_service.add_module("Biologie")
+    db_service.add_flashcards(module_id, [("F1", "A1")])
+    db_service.close_connection()
+
+    db_service = DatabaseService(db_path)
+    try:
+        assert db_service.get_change_seq() == 1
+    finally:
+        db_service.close_connection()
+
@@ -0,0 +1,55 @@
+import pytest
+
+from utils.text_chunking import split_text
+from utils.token_estimation import TOKENS_PER_MESSAGE, TOKENS_PER_REPLY, estimate_message_tokens, estimate_tokens
+
+
+def test_estimate_tokens_follows_the_piece_rules():
+    """Words, digits, punctuation and whitespace are counted with the tokenizer's splits."""
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("Zelle") == 1  # Short ASCII word
+    assert estimate_tokens("Photosynthese") == 3  # Split every five characters
+    assert estimate_tokens("Größe") == 2  # Non-ASCII words split more often
+    assert estimate_tokens("12345") == 2  # Groups of up to three digits
+    assert estimate_tokens("Hallo Welt") == 2  # A single space merges into the next word
+    assert estimate_tokens("Hallo\n\nWelt") == 3
+    assert estimate_tokens("?!") == 1
+
+
+def test_estimate_message_tokens_adds_the_chat_overhead():
+    """Every message costs its content plus the role and delimiters."""
+    messages = [{"role": "system", "content": "Du bist ein Prof."}, {"role": "user", "content": "Hallo"}]
+    assert estimate_message_tokens(messages) == (
+        estimate_tokens("Du bist ein Prof.") + estimate_tokens("Hallo") + 2 * TOKENS_PER_MESSAGE + TOKENS_PER_REPLY
+    )
+
+
+def test_blank_text_has_no_chunks():
+    """Whitespace only produces no requests."""
+    assert split_text(" \n\n \t", 100) == []
+
+
+def test_short_paragraphs_are_packed_into_one_chunk():
+    """Paragraphs that fit the budget together stay in one chunk, separated by blank lines."""
+    assert split_text("Erster Absatz.\n\n\nZweiter Absatz.", 100) == ["Erster Absatz.\n\nZweiter Absatz."]
+
+
+@pytest.mark.parametrize("max_tokens", [5, 20, 80])
+def test_chunks_fit_the_budget_and_keep_the_order(max_tokens):
+    """Long paragraphs are split on sentences and overlong sentences on words."""
+    paragraphs = [
+        " ".join(f"Satz {number} von Absatz {paragraph} erklärt Mitochondrien." for number in range(6))
+        for paragraph in range(4)
+    ]
+    paragraphs.append(" ".join(["Endlosesatzohnepunkt"] * 40))
+    text = "\n\n".join(paragraphs)
+
+    chunks = split_text(text, max_tokens)
+
+    assert all(estimate_tokens(chunk) <= max_tokens for chunk in chunks)
+    assert " ".join(" ".join(chunks).split()) == " ".join(text.split())  # No word lost or reordered
+
+
+def test_word_longer_than_the_budget_becomes_its_own_chunk():
+    """A single word over the budget cannot be split further and is kept whole."""
+    assert split_text("kurz " + "x" * 100 + " kurz", 3) == ["kurz", "x" * 100, "kurz"]
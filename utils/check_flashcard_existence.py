@@ -9,5 +9,4 @@ def check_flashcard_existence(db_service, module_id):
     Returns:
         bool: True if flashcards exist for the module, otherwise False.
     """
-    flashcards = db_service.get_flashcards_by_module(module_id)  # Retrieve flashcards for the module
-    return len(flashcards) > 0  # Check if the flashcard list is not empty
+    return db_service.has_flashcards(module_id)  # Single EXISTS lookup instead of loading the module
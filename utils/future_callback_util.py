@@ -0,0 +1,74 @@
+import queue
+import sys
+from concurrent.futures import Future
+
+POLL_INTERVAL_MS = 20  # How often the Tk thread looks for finished writes
+
+_completed = queue.Queue()  # (future, on_success, on_error) of finished writes, filled by the writer thread
+_pending = 0  # Futures handed to run_when_done whose callbacks have not run yet; only touched on the Tk thread
+_polling = False  # Whether a drain of _completed is scheduled on the Tk main loop
+
+
+def _drain(root):
+    """
+    Runs the callbacks of all finished writes on the Tk thread and schedules the next poll while
+    writes are still outstanding.
+
+    Args:
+        root (tk.Tk): The application's root window.
+    """
+    global _pending, _polling
+    finished = []
+    while True:
+        try:
+            finished.append(_completed.get_nowait())
+        except queue.Empty:
+            break
+
+    _pending -= len(finished)
+    if _pending:
+        root.after(POLL_INTERVAL_MS, _drain, root)
+    else:
+        _polling = False
+
+    for future, on_success, on_error in finished:
+        try:
+            error = future.exception()
+            if error is None:
+                on_success(future.result())
+            elif on_error:
+                on_error(error)
+        except Exception:
+            # Report like any other Tk callback without dropping the remaining ones
+            root.report_callback_exception(*sys.exc_info())
+
+
+def run_when_done(widget, result, on_success, on_error=None):
+    """
+    Runs a callback on the Tk main loop once a database result is available.
+
+    Mutations return their result directly or, in write-behind mode, a ``Future``. This helper
+    hides the difference: plain results are handled immediately, futures are handled as soon as
+    the writer thread has committed them.
+
+    The writer thread never calls into Tk: it only puts the finished future on a queue that the
+    Tk thread polls, so a Tk thread waiting for the writer cannot deadlock with it.
+
+    Args:
+        widget (tk.Widget): Any widget of the application, used to schedule the callback.
+        result (object): The value or ``Future`` returned by a ``DatabaseService`` mutation.
+        on_success (function): Called with the result of the mutation.
+        on_error (function, optional): Called with the exception if the mutation failed.
+    """
+    global _pending, _polling
+    if not isinstance(result, Future):
+        on_success(result)
+        return
+
+    _pending += 1
+    result.add_done_callback(lambda future: _completed.put((future, on_success, on_error)))
+    if not _polling:
+        _polling = True
+        # Poll on the root window, which outlives popups that may be closed before the write finishes
+        root = widget.nametowidget(".")
+        root.after(POLL_INTERVAL_MS, _drain, root)
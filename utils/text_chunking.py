@@ -0,0 +1,75 @@
+import re
+
+from utils.token_estimation import estimate_tokens
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_SENTENCE_END = re.compile(r"(?<=[.!?…])\s+")
+
+
+def _split_oversized(text, max_tokens):
+    """
+    Splits a single sentence that exceeds the budget on word boundaries.
+
+    Args:
+        text (str): The sentence.
+        max_tokens (int): The token budget of a piece.
+
+    Returns:
+        list: The pieces of the sentence.
+    """
+    pieces = []
+    words = []
+    tokens = 0
+    for word in text.split():
+        word_tokens = estimate_tokens(word) + 1
+        if words and tokens + word_tokens > max_tokens:
+            pieces.append(" ".join(words))
+            words, tokens = [], 0
+        words.append(word)
+        tokens += word_tokens
+    if words:
+        pieces.append(" ".join(words))
+    return pieces
+
+
+def split_text(text, max_tokens):
+    """
+    Splits a text into chunks that fit a token budget.
+
+    Paragraphs are packed into chunks whole. A paragraph that exceeds the budget on its own is
+    split on sentence boundaries, and a sentence that still exceeds it on word boundaries.
+
+    Args:
+        text (str): The text to split.
+        max_tokens (int): The token budget of a chunk.
+
+    Returns:
+        list: The chunks in the order of the text. Empty if the text is blank.
+    """
+    units = []  # Paragraphs, or the sentences of paragraphs that are too long
+    for paragraph in _PARAGRAPH_BREAK.split(text.strip()):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if estimate_tokens(paragraph) <= max_tokens:
+            units.append(paragraph)
+            continue
+        for sentence in _SENTENCE_END.split(paragraph):
+            if estimate_tokens(sentence) <= max_tokens:
+                units.append(sentence)
+            else:
+                units.extend(_split_oversized(sentence, max_tokens))
+
+    chunks = []
+    current = []
+    tokens = 0
+    for unit in units:
+        unit_tokens = estimate_tokens(unit) + 1  # The separator
+        if current and tokens + unit_tokens > max_tokens:
+            chunks.append("\n\n".join(current))
+            current, tokens = [], 0
+        current.append(unit)
+        tokens += unit_tokens
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
@@ -0,0 +1,36 @@
+import hashlib
+import unicodedata
+
+
+def normalize_text(text):
+    """
+    Normalizes a text for duplicate detection.
+
+    Applies Unicode NFKC normalization, case folding and whitespace collapsing, so texts that
+    only differ in letter case, spacing or line breaks compare equal.
+
+    Args:
+        text (str): The text to normalize.
+
+    Returns:
+        str: The normalized text.
+    """
+    return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+
+def flashcard_content_hash(question, answer):
+    """
+    Computes the content hash that identifies duplicate flashcards within a module.
+
+    Changing the normalization changes every hash, which requires a migration that recomputes
+    the stored ``content_hash`` values.
+
+    Args:
+        question (str): The question of the flashcard.
+        answer (str): The answer of the flashcard.
+
+    Returns:
+        str: A 32-character hexadecimal hash of the normalized question and answer.
+    """
+    content = normalize_text(question) + "\x1f" + normalize_text(answer)
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
@@ -0,0 +1,52 @@
+import re
+
+# Pieces the OpenAI tokenizers never merge across: runs of letters, groups of up to three digits,
+# runs of punctuation and runs of whitespace
+_PIECE = re.compile(r"[^\W\d_]+|\d{1,3}|[^\w\s]+|\s+")
+
+TOKENS_PER_MESSAGE = 4  # Role and delimiters of every chat message
+TOKENS_PER_REPLY = 3  # Priming of the assistant reply
+
+
+def estimate_tokens(text):
+    """
+    Estimates the number of tokens of a text for the GPT-4o tokenizer without a vocabulary or
+    network access.
+
+    The text is split into the pieces the tokenizer splits on. Short words are usually a single
+    token, longer ones are split every few characters, and words with umlauts or other non-ASCII
+    letters more often. A single space is merged into the following word. The rules err on the
+    high side, so budgets computed from them hold.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        int: The estimated number of tokens.
+    """
+    tokens = 0
+    for match in _PIECE.finditer(text):
+        piece = match.group()
+        length = len(piece)
+        if piece[0].isalpha():
+            tokens += 1 + (length - 1) // (5 if piece.isascii() else 4)
+        elif piece[0].isdigit():
+            tokens += 1
+        elif piece[0].isspace():
+            tokens += 0 if piece == " " else 1
+        else:
+            tokens += 1 + (length - 1) // 3
+    return tokens
+
+
+def estimate_message_tokens(messages):
+    """
+    Estimates the prompt tokens of a chat completion request.
+
+    Args:
+        messages (list): The chat messages, each a dictionary with 'role' and 'content'.
+
+    Returns:
+        int: The estimated number of prompt tokens.
+    """
+    return sum(estimate_tokens(message["content"]) + TOKENS_PER_MESSAGE for message in messages) + TOKENS_PER_REPLY
@@ -2,7 +2,6 @@ import tkinter as tk
 from tkinter import scrolledtext, messagebox
 import threading
 
-import openai
 import json
 import os
 import time
@@ -15,11 +14,14 @@ import subprocess
 import tempfile
 import shutil
 
-from services import config_service
-from services.config_service import ConfigService
 from controller.interactive_mode_controller import InteractiveModeController
+from services.review_scheduler import RATING_AGAIN, RATING_HARD, RATING_GOOD
+from utils.token_estimation import estimate_tokens
 from utils.window_utils import center_window
 
+EVALUATION_MAX_TOKENS = 10  # The rating is a single word such as 'mittel' or 'gar nicht'
+HINT_MAX_TOKENS = 400
+
 
 class InteractiveModeView(tk.Toplevel):
     """
@@ -46,9 +48,14 @@ class InteractiveModeView(tk.Toplevel):
         self.controller = controller or InteractiveModeController(main_window, module)
 
         # Services and configuration
-        self.config_service = config_service or ConfigService()
-        self.api_key = openai.api_key or self.config_service.get_api_key()
-        openai.api_key = self.api_key
+        self.config_service = self.main_window.config_service
+        self.api_key = self.config_service.get_api_key()
+        self.client_factory = self.main_window.openai_clients
+        self.client = None
+        if self.api_key:
+            self.client = self.client_factory.get_client(self.api_key)
+            # Open the connection now, so the first spoken question does not wait for the handshakes
+            self.client_factory.warm_up(self.api_key)
 
         # Session state management
         self.session_data = []
@@ -166,6 +173,7 @@ class InteractiveModeView(tk.Toplevel):
                 self.playback_process = None
 
         self.start_button.config(state=tk.NORMAL)
+        self.controller.end_session()
         self.generate_summary()
         self.destroy()
         self.main_window.after(100, self.show_summary_popup)
@@ -245,11 +253,13 @@ class InteractiveModeView(tk.Toplevel):
                 return
             try:
                 self.is_speaking = True
-                response = openai.audio.speech.create(
+                response = self.client_factory.retry_policy.call(
+                    self.client.audio.speech.create,
                     model="tts-1",
                     voice="nova",
                     input=text,
-                    speed=1.1
+                    speed=1.1,
+                    timeout=self.client_factory.timeout("speech")
                 )
                 audio_data = response.content
 
@@ -354,12 +364,16 @@ class InteractiveModeView(tk.Toplevel):
                     assert wf.getsampwidth() == 2, "Audio hat nicht die richtige Bit-Tiefe."
                 print("Audio-Datei validiert.")
 
-                # Transcribe with Whisper
-                with open(self.recorded_audio_path, "rb") as audio_file:
-                    transcription = openai.audio.transcriptions.create(
-                        model="whisper-1",
-                        file=audio_file
-                    )
+                # Transcribe with Whisper; every attempt reopens the file, so a retry uploads it in full
+                def transcribe():
+                    with open(self.recorded_audio_path, "rb") as audio_file:
+                        return self.client.audio.transcriptions.create(
+                            model="whisper-1",
+                            file=audio_file,
+                            timeout=self.client_factory.timeout("transcription")
+                        )
+
+                transcription = self.client_factory.retry_policy.call(transcribe)
                 user_response = transcription.text.strip()
                 self.safe_display_message(f"Transkription: {user_response}", "Nutzer")
 
@@ -416,6 +430,7 @@ class InteractiveModeView(tk.Toplevel):
                 "KI-Lernpartner"
             )
             self.summary["schlecht"].append(self.current_flashcard.question)
+            self.controller.record_rating(RATING_AGAIN, self.current_attempt)
 
             def after_feedback():
                 self.ask_next_question()
@@ -443,13 +458,15 @@ class InteractiveModeView(tk.Toplevel):
             if self.window_closed:
                 return
             try:
-                response = openai.chat.completions.create(
+                response = self.client_factory.retry_policy.call(
+                    self.client.chat.completions.create,
                     model="gpt-4o-mini",
                     messages=[
                         {"role": "system", "content": "Du bist ein hilfreicher KI-Lernpartner für Karteikarten."},
                         {"role": "user", "content": prompt}
                     ],
-                    max_tokens=150
+                    max_tokens=EVALUATION_MAX_TOKENS,
+                    timeout=self.client_factory.timeout("evaluation")
                 )
                 evaluation = response.choices[0].message.content.strip().lower()
                 print(f"Bewertung von ChatGPT: {evaluation}")
@@ -457,6 +474,10 @@ class InteractiveModeView(tk.Toplevel):
                 if "ganz" in evaluation:
                     self.safe_display_message("Das ist korrekt! Gut gemacht.", "KI-Lernpartner")
                     self.summary["gut"].append(self.current_flashcard.question)
+                    # Needing a hint still counts as remembered, but the flashcard comes back sooner
+                    self.controller.record_rating(
+                        RATING_GOOD if self.current_attempt == 1 else RATING_HARD, self.current_attempt
+                    )
 
                     def after_feedback():
                         self.ask_next_question()
@@ -470,6 +491,7 @@ class InteractiveModeView(tk.Toplevel):
                             "KI-Lernpartner"
                         )
                         self.summary["mittel"].append(self.current_flashcard.question)
+                        self.controller.log_answer(RATING_HARD, self.current_attempt)
 
                         second_prompt = (
                             f"Als KI-Lernpartner möchtest du dem Nutzer helfen, die richtige Antwort zu finden.\n"
@@ -480,13 +502,16 @@ class InteractiveModeView(tk.Toplevel):
                             f"Bitte formuliere die ursprüngliche Frage um, um dem Nutzer einen Hinweis zu geben. "
                             f"Gib **nur** die umformulierte Frage aus."
                         )
-                        correction_response = openai.chat.completions.create(
+                        correction_response = self.client_factory.retry_policy.call(
+                            self.client.chat.completions.create,
                             model="gpt-4o-mini",
                             messages=[
                                 {"role": "system", "content": "Du bist ein hilfreicher KI-Lernpartner."},
                                 {"role": "user", "content": second_prompt}
                             ],
-                            max_tokens=150
+                            # A rephrased question is about as long as the original one
+                            max_tokens=min(HINT_MAX_TOKENS, 2 * estimate_tokens(self.current_flashcard.question) + 60),
+                            timeout=self.client_factory.timeout("evaluation")
                         )
                         corrected_question = correction_response.choices[0].message.content.strip()
                         self.current_attempt += 1
@@ -498,6 +523,7 @@ class InteractiveModeView(tk.Toplevel):
                             "KI-Lernpartner"
                         )
                         self.summary["schlecht"].append(self.current_flashcard.question)
+                        self.controller.record_rating(RATING_AGAIN, self.current_attempt)
 
                         def after_feedback():
                             self.ask_next_question()
@@ -514,6 +540,7 @@ class InteractiveModeView(tk.Toplevel):
                             "KI-Lernpartner"
                         )
                         self.summary["schlecht"].append(self.current_flashcard.question)
+                        self.controller.log_answer(RATING_AGAIN, self.current_attempt)
 
                         third_prompt = (
                             f"Als KI-Lernpartner möchtest du dem Nutzer helfen, die richtige Antwort zu finden.\n"
@@ -524,13 +551,16 @@ class InteractiveModeView(tk.Toplevel):
                             f"Bitte formuliere die ursprüngliche Frage um und gib dem Nutzer einen Tipp. "
                             f"Gib **nur** die umformulierte Frage und den Tipp aus."
                         )
-                        correction_response = openai.chat.completions.create(
+                        correction_response = self.client_factory.retry_policy.call(
+                            self.client.chat.completions.create,
                             model="gpt-4o-mini",
                             messages=[
                                 {"role": "system", "content": "Du bist ein hilfreicher KI-Lernpartner."},
                                 {"role": "user", "content": third_prompt}
                             ],
-                            max_tokens=150
+                            # The rephrased question plus a tip
+                            max_tokens=min(HINT_MAX_TOKENS, 2 * estimate_tokens(self.current_flashcard.question) + 120),
+                            timeout=self.client_factory.timeout("evaluation")
                         )
                         tip_corrected_question = correction_response.choices[0].message.content.strip()
                         self.current_attempt += 1
@@ -542,6 +572,7 @@ class InteractiveModeView(tk.Toplevel):
                             "KI-Lernpartner"
                         )
                         self.summary["schlecht"].append(self.current_flashcard.question)
+                        self.controller.record_rating(RATING_AGAIN, self.current_attempt)
 
                         def after_feedback():
                             self.ask_next_question()
@@ -557,6 +588,7 @@ class InteractiveModeView(tk.Toplevel):
                         "KI-Lernpartner"
                     )
                     self.summary["schlecht"].append(self.current_flashcard.question)
+                    self.controller.record_rating(RATING_AGAIN, self.current_attempt)
 
                     def after_feedback():
                         self.ask_next_question()
@@ -566,6 +598,7 @@ class InteractiveModeView(tk.Toplevel):
                 else:
                     self.safe_display_message(f"Die richtige Antwort lautet: {correct_answer}", "KI-Lernpartner")
                     self.summary["schlecht"].append(self.current_flashcard.question)
+                    self.controller.record_rating(RATING_AGAIN, self.current_attempt)
 
                     def after_feedback():
                         self.ask_next_question()
@@ -575,6 +608,15 @@ class InteractiveModeView(tk.Toplevel):
             except Exception as e:
                 self.safe_display_message(f"Fehler bei der Bewertung: {str(e)}", "System")
                 print(f"Fehler bei der Bewertung: {str(e)}")
+                if self.window_closed:
+                    return
+                # Keep the session going: reveal the answer without rating it and move on
+                self.safe_display_message(f"Die richtige Antwort lautet: {correct_answer}", "KI-Lernpartner")
+
+                def after_feedback():
+                    self.ask_next_question()
+
+                self.speak_text(f"Die richtige Antwort lautet: {correct_answer}", callback=after_feedback)
 
         threading.Thread(target=run_evaluation, daemon=True).start()
 
@@ -1,6 +1,8 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from controller.add_module_controller import AddModuleController
+from controller.deck_io_controller import DeckIOController
+from utils.future_callback_util import run_when_done
 from utils.mousewheel_scroll_util import bind_mousewheel
 from utils.right_click_util import bind_right_click
 from controller import add_module_controller
@@ -36,6 +38,9 @@ class MainView(tk.Frame):
         add_module_button = ttk.Button(self, text="Modul hinzufügen", command=self.add_module_controller.on_click, width=30)
         add_module_button.pack(pady=10, anchor="center", fill=tk.X)
 
+        # Controller for importing and exporting modules
+        self.deck_io_controller = DeckIOController(self.controller, self)
+
         # Scrollable canvas for displaying modules
         canvas = tk.Canvas(self)
         scrollbar = ttk.Scrollbar(self, orient="vertical", command=canvas.yview)
@@ -73,12 +78,14 @@ class MainView(tk.Frame):
             widget.destroy()  # Clear the frame before displaying modules
 
         modules = self.db_service.get_all_modules()  # Fetch all modules
+        flashcard_counts = self.db_service.module_stats()  # Flashcard count per module in one query
         if modules:
             for module in modules:
                 # Create a button for each module
+                module_name = module.name if len(module.name) <= 20 else module.name[:17] + '...'
                 module_button = ttk.Button(
                     self.modules_frame,
-                    text=(module.name if len(module.name) <= 20 else module.name[:17] + '...'),
+                    text=f"{module_name} ({flashcard_counts.get(module.id, 0)})",
                     command=lambda m=module: self.controller.open_module_view(m)
                 )
                 module_button.pack(anchor="center", pady=5, ipadx=10, ipady=5, fill=tk.X)
@@ -106,6 +113,9 @@ class MainView(tk.Frame):
 
         context_menu.add_command(label="Modul löschen", command=delete_module)
         context_menu.add_command(label="Karteikarten löschen", command=delete_flashcards)
+        context_menu.add_separator()
+        context_menu.add_command(label="Karteikarten importieren...", command=lambda: self.deck_io_controller.import_flashcards(module))
+        context_menu.add_command(label="Modul exportieren...", command=lambda: self.deck_io_controller.export_flashcards(module))
 
         def show_context_menu(event):
             """
@@ -128,13 +138,19 @@ class MainView(tk.Frame):
         """
         confirm = messagebox.askyesno("Modul löschen", f"Möchten Sie das Modul '{module.name}' und alle zugehörigen Karteikarten wirklich löschen?")
         if confirm:
-            try:
-                self.db_service.delete_module_with_flashcards(module.id)
+            def on_deleted(_):
                 messagebox.showinfo("Erfolg", f"Das Modul '{module.name}' wurde erfolgreich gelöscht.")
                 self.display_modules()  # Refresh the module list
-            except Exception as e:
+
+            def on_error(e):
                 messagebox.showerror("Fehler", f"Fehler beim Löschen des Moduls: {e}")
 
+            try:
+                result = self.db_service.delete_module_with_flashcards(module.id)
+                run_when_done(self, result, on_deleted, on_error)
+            except Exception as e:
+                on_error(e)
+
     def delete_flashcards(self, module):
         """
         Deletes all flashcards in a module after confirmation.
@@ -144,8 +160,15 @@ class MainView(tk.Frame):
         """
         confirm = messagebox.askyesno("Karteikarten löschen", f"Möchten Sie alle Karteikarten im Modul '{module.name}' wirklich löschen?")
         if confirm:
-            try:
-                self.db_service.delete_flashcards_by_module(module.id)
+            def on_deleted(_):
                 messagebox.showinfo("Erfolg", f"Alle Karteikarten im Modul '{module.name}' wurden gelöscht.")
-            except Exception as e:
+                self.display_modules()  # Refresh the flashcard counts
+
+            def on_error(e):
                 messagebox.showerror("Fehler", f"Fehler beim Löschen der Karteikarten: {e}")
+
+            try:
+                result = self.db_service.delete_flashcards_by_module(module.id)
+                run_when_done(self, result, on_deleted, on_error)
+            except Exception as e:
+                on_error(e)
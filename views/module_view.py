@@ -2,11 +2,13 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from PIL import Image, ImageTk
 import os
+from bisect import bisect_left
 
 from controller.interactive_mode_controller import InteractiveModeController
 from controller.module_controller import ModuleController
 from controller.generate_flashcards_controller import GenerateFlashcardsController
 from utils.check_flashcard_existence import check_flashcard_existence
+from utils.future_callback_util import run_when_done
 from utils.mousewheel_scroll_util import bind_mousewheel
 from utils.right_click_util import bind_right_click
 from controller.normal_mode_controller import NormalModeController
@@ -36,6 +38,12 @@ class ModuleView(tk.Frame):
         self.module_controller = ModuleController(controller, self, self.module)
         self.max_frage_length = 50
         self.max_antwort_length = 100
+        self.page_size = 200  # Flashcards loaded into the treeview per page
+        self.last_loaded_id = 0  # ID of the last flashcard shown, used as the keyset for the next page
+        self.all_flashcards_loaded = True
+        self.change_seq = 0  # Last change-feed sequence number reflected in the treeview
+        self.search_delay_ms = 250  # Debounce delay between the last keystroke and the search
+        self.search_after_id = None
         self.create_widgets()
 
     def truncate_text(self, text, max_length):
@@ -122,6 +130,17 @@ class ModuleView(tk.Frame):
         )
         self.flashcards_label.pack(anchor="w", padx=10)
 
+        search_frame = tk.Frame(self.flashcards_display_frame)
+        search_frame.pack(fill="x", padx=10, pady=5)
+
+        search_label = tk.Label(search_frame, text="Suche:", font=("Arial", 12))
+        search_label.pack(side="left")
+
+        self.search_var = tk.StringVar()
+        self.search_var.trace_add("write", self.on_search_changed)
+        search_entry = ttk.Entry(search_frame, textvariable=self.search_var)
+        search_entry.pack(side="left", fill="x", expand=True, padx=5)
+
         self.flashcards_tree = ttk.Treeview(
             self.flashcards_display_frame,
             columns=("Frage", "Antwort"),
@@ -135,13 +154,13 @@ class ModuleView(tk.Frame):
         self.flashcards_tree.column("Antwort", width=500, anchor="w")
         self.flashcards_tree.pack(fill="both", expand=True, padx=10, pady=5)
 
-        scrollbar = ttk.Scrollbar(
+        self.flashcards_scrollbar = ttk.Scrollbar(
             self.flashcards_display_frame,
             orient="vertical",
             command=self.flashcards_tree.yview
         )
-        self.flashcards_tree.configure(yscrollcommand=scrollbar.set)
-        scrollbar.pack(side="right", fill="y")
+        self.flashcards_tree.configure(yscrollcommand=self.on_flashcards_scroll)
+        self.flashcards_scrollbar.pack(side="right", fill="y")
         bind_mousewheel(self.flashcards_tree, self.flashcards_tree)
 
         self.flashcards_tree.bind("<Double-1>", self.on_double_click)
@@ -155,9 +174,15 @@ class ModuleView(tk.Frame):
         Args:
             module (object): The module to be set.
         """
+        same_module = self.module is not None and module is not None and self.module.id == module.id
         self.module = module
         self.module_controller.set_module(module)
         self.update_module_label()
+        if self.search_var.get():
+            self.search_var.set("")  # The module starts without a search filter
+        elif same_module:
+            self.refresh_flashcards()  # Keep the loaded rows and only apply what changed meanwhile
+            return
         self.display_flashcards()
 
     def update_module_label(self):
@@ -256,29 +281,156 @@ class ModuleView(tk.Frame):
                 "Bitte wählen Sie ein Modul aus und stellen Sie sicher, dass der API Key gesetzt ist."
             )
 
+    def on_search_changed(self, *args):
+        """
+        Restarts the debounce timer whenever the search text changes.
+        """
+        if self.search_after_id:
+            self.after_cancel(self.search_after_id)
+        self.search_after_id = self.after(self.search_delay_ms, self.display_flashcards)
+
+    def display_search_results(self, query):
+        """
+        Displays the best full-text matches for the query within the current module.
+
+        Args:
+            query (str): The search text.
+        """
+        results = self.db_service.search(query, module_id=self.module.id, limit=self.page_size)
+        for result in results:
+            truncated_frage = self.truncate_text(result.question, self.max_frage_length)
+            truncated_antwort = self.truncate_text(result.answer, self.max_antwort_length)
+            self.flashcards_tree.insert(
+                "", tk.END, iid=result.id, values=(truncated_frage, truncated_antwort))
+        if not results:
+            self.flashcards_tree.insert(
+                "", tk.END, iid="no_flashcards", values=("Keine passenden Karteikarten gefunden.", ""))
+
     def display_flashcards(self):
         """
-        Displays all flashcards for the current module in the treeview.
+        Displays the first page of flashcards for the current module in the treeview.
+        Further pages are loaded when the user scrolls towards the end of the list.
+        If a search text is entered, the matching flashcards are displayed instead.
         """
-        for item in self.flashcards_tree.get_children():
-            self.flashcards_tree.delete(item)
+        if self.search_after_id:
+            self.after_cancel(self.search_after_id)  # This refresh already covers a pending search
+            self.search_after_id = None
+        self.flashcards_tree.delete(*self.flashcards_tree.get_children())
+        self.last_loaded_id = 0
+        self.all_flashcards_loaded = True
 
         if not self.module:
             print("Module ist nicht gesetzt!")
             return
 
-        flashcards = self.db_service.get_flashcards_by_module(self.module.id)
+        # Taken before the rows, so a change committed in between is applied by the next refresh.
+        # The sequence number is kept in memory, so switching modules still does not query SQLite.
+        self.change_seq = self.db_service.get_change_seq()
 
-        if flashcards:
-            for fc in flashcards:
-                truncated_frage = self.truncate_text(fc.question, self.max_frage_length)
-                truncated_antwort = self.truncate_text(fc.answer, self.max_antwort_length)
-                self.flashcards_tree.insert(
-                    "", tk.END, iid=fc.id, values=(truncated_frage, truncated_antwort))
-        else:
+        query = self.search_var.get().strip()
+        if query:
+            self.display_search_results(query)
+            return
+
+        self.all_flashcards_loaded = False
+        self.load_next_flashcards_page()
+
+        if not self.flashcards_tree.get_children():
             self.flashcards_tree.insert(
                 "", tk.END, iid="no_flashcards", values=("Keine Karteikarten vorhanden.", ""))
 
+    def refresh_flashcards(self):
+        """
+        Brings the treeview up to date by applying only the flashcards that changed since it was
+        last synchronized. Falls back to a full reload for search results or large changes.
+        """
+        if not self.module or self.search_var.get().strip():
+            self.display_flashcards()
+            return
+
+        result = self.db_service.get_flashcard_changes(
+            self.module.id,
+            self.change_seq,
+            limit=self.page_size,
+            question_length=self.max_frage_length * 2,
+            answer_length=self.max_antwort_length * 2
+        )
+        if result is None:
+            self.display_flashcards()  # The change feed does not reach back far enough
+            return
+
+        self.change_seq, changes = result
+        if not changes:
+            return
+
+        if self.flashcards_tree.exists("no_flashcards"):
+            self.flashcards_tree.delete("no_flashcards")
+        loaded_ids = [int(item_id) for item_id in self.flashcards_tree.get_children()]
+
+        deleted_items = []
+        for change in changes:
+            item_id = str(change.id)
+            if change.deleted:
+                if self.flashcards_tree.exists(item_id):
+                    deleted_items.append(item_id)
+                continue
+
+            values = (
+                self.truncate_text(change.question, self.max_frage_length),
+                self.truncate_text(change.answer, self.max_antwort_length)
+            )
+            if self.flashcards_tree.exists(item_id):
+                self.flashcards_tree.item(item_id, values=values)
+            elif self.all_flashcards_loaded or change.id <= self.last_loaded_id:
+                # Rows are ordered by ID; rows beyond the loaded pages arrive with the next page
+                index = bisect_left(loaded_ids, change.id)
+                loaded_ids.insert(index, change.id)
+                self.flashcards_tree.insert("", index, iid=change.id, values=values)
+                self.last_loaded_id = max(self.last_loaded_id, change.id)
+
+        if deleted_items:
+            self.flashcards_tree.delete(*deleted_items)
+        if not self.flashcards_tree.get_children():
+            self.flashcards_tree.insert(
+                "", tk.END, iid="no_flashcards", values=("Keine Karteikarten vorhanden.", ""))
+
+    def load_next_flashcards_page(self):
+        """
+        Appends the next page of flashcards to the treeview, continuing after the last loaded ID.
+        """
+        if self.all_flashcards_loaded or not self.module:
+            return
+
+        # Fetch twice the displayed length, as truncate_text collapses whitespace before cutting
+        flashcards = self.db_service.get_flashcard_previews(
+            self.module.id,
+            self.last_loaded_id,
+            self.page_size,
+            question_length=self.max_frage_length * 2,
+            answer_length=self.max_antwort_length * 2
+        )
+        for fc in flashcards:
+            truncated_frage = self.truncate_text(fc.question, self.max_frage_length)
+            truncated_antwort = self.truncate_text(fc.answer, self.max_antwort_length)
+            self.flashcards_tree.insert(
+                "", tk.END, iid=fc.id, values=(truncated_frage, truncated_antwort))
+
+        if flashcards:
+            self.last_loaded_id = flashcards[-1].id
+        self.all_flashcards_loaded = len(flashcards) < self.page_size
+
+    def on_flashcards_scroll(self, first, last):
+        """
+        Updates the scrollbar and loads the next page once the end of the list comes into view.
+
+        Args:
+            first (str): The top of the visible area as a fraction of the list.
+            last (str): The bottom of the visible area as a fraction of the list.
+        """
+        self.flashcards_scrollbar.set(first, last)
+        if float(last) >= 0.9 and not self.all_flashcards_loaded:
+            self.after_idle(self.load_next_flashcards_page)
+
     def on_right_click(self, event):
         """
         Displays the right-click context menu for deleting selected flashcards.
@@ -303,16 +455,23 @@ class ModuleView(tk.Frame):
                 f"Möchten Sie die ausgewählten Karteikarten wirklich löschen?"
             )
             if confirm:
-                for item_id in selected_items:
-                    try:
-                        flashcard_id = int(item_id)
-                        self.db_service.delete_flashcard(flashcard_id)
-                        self.flashcards_tree.delete(item_id)
-                    except Exception as e:
-                        messagebox.showerror(
-                            "Fehler", f"Fehler beim Löschen der Karteikarte: {e}")
-                messagebox.showinfo(
-                    "Erfolg", "Die ausgewählten Karteikarten wurden gelöscht.")
+                flashcard_items = [item_id for item_id in selected_items if item_id.isdigit()]
+
+                def on_deleted(_):
+                    messagebox.showinfo(
+                        "Erfolg", "Die ausgewählten Karteikarten wurden gelöscht.")
+
+                def on_error(e):
+                    messagebox.showerror(
+                        "Fehler", f"Fehler beim Löschen der Karteikarten: {e}")
+                    self.display_flashcards()  # Restore the rows that were not deleted
+
+                try:
+                    result = self.db_service.delete_flashcards(int(item_id) for item_id in flashcard_items)
+                    self.flashcards_tree.delete(*flashcard_items)  # One widget call for the whole selection
+                    run_when_done(self, result, on_deleted, on_error)
+                except Exception as e:
+                    on_error(e)
         else:
             messagebox.showwarning(
                 "Warnung", "Keine Karteikarten ausgewählt.")
@@ -330,11 +489,7 @@ class ModuleView(tk.Frame):
 
             try:
                 flashcard_id = int(selected_item_id)
-                flashcard = next(
-                    (fc for fc in self.db_service.get_flashcards_by_module(
-                        self.module.id) if fc.id == flashcard_id),
-                    None
-                )
+                flashcard = self.db_service.get_flashcard(flashcard_id)
                 if flashcard:
                     self.module_controller.edit_flashcard(flashcard)
             except ValueError:
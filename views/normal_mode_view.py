@@ -210,12 +210,13 @@ class NormalModeView(tk.Toplevel):
 
         self.summary_widgets.extend([repeat_button, finish_button])
 
-    def show_final_results(self, results_per_round):
+    def show_final_results(self, results_per_round, module_stats=None):
         """
         Displays the final results of the learning session.
 
         Args:
             results_per_round (list): List of results from each round.
+            module_stats (ReviewStats, optional): The module's review totals across all sessions.
         """
         self.question_label.pack_forget()
         self.answer_label.pack_forget()
@@ -227,6 +228,16 @@ class NormalModeView(tk.Toplevel):
         title_label.pack(pady=20)
         self.summary_widgets.append(title_label)
 
+        if module_stats and module_stats.reviews:
+            total_label = tk.Label(
+                self,
+                text=(f"Insgesamt: {module_stats.reviews} Antworten, Erfolgsquote: {module_stats.success_rate:.2f}%, "
+                      f"Ø Antwortzeit: {module_stats.average_latency_ms / 1000:.1f} s"),
+                font=("Arial", 14)
+            )
+            total_label.pack(pady=5)
+            self.summary_widgets.append(total_label)
+
         canvas = tk.Canvas(self)
         scrollbar = ttk.Scrollbar(self, orient="vertical", command=canvas.yview)
         scrollable_frame = tk.Frame(canvas)